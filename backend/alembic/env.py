@@ -13,6 +13,17 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 from app.core.config import settings
 from app.db.base import Base
 from app.models.user import User  # Import all models here
+from app.models.auth_event import AuthEvent
+from app.models.group import Group, GroupMember
+from app.models.expense import Expense, ExpenseShare
+from app.models.settlement import Settlement
+from app.models.group_balance import GroupBalance
+from app.models.exchange_rate import ExchangeRate
+from app.models.ledger import LedgerEvent, LedgerSnapshot
+from app.models.activity_feed import ActivityFeedItem
+from app.models.recurring_expense import RecurringExpense
+from app.models.spend_rollup import SpendRollup
+from app.models.sync import ChangeCounter, SyncTombstone
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
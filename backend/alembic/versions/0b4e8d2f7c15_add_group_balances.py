@@ -0,0 +1,47 @@
+"""Add group balances
+
+Revision ID: 0b4e8d2f7c15
+Revises: f1b7c3d9a6e2
+Create Date: 2026-10-19 17:03:44.918265
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b4e8d2f7c15'
+down_revision: Union[str, None] = 'f1b7c3d9a6e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('group_balances',
+    sa.Column('group_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('net_minor', sa.BigInteger(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['group_id'], ['groups.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('group_id', 'user_id')
+    )
+    # Backfill from existing expenses, shares and settlements
+    op.execute("""
+        INSERT INTO group_balances (group_id, user_id, net_minor)
+        SELECT group_id, user_id, SUM(amount) FROM (
+            SELECT group_id, paid_by AS user_id, amount_minor AS amount FROM expenses
+            UNION ALL SELECT group_id, user_id, -amount_minor FROM expense_shares
+            UNION ALL SELECT group_id, from_user_id, amount_minor FROM settlements
+            UNION ALL SELECT group_id, to_user_id, -amount_minor FROM settlements
+        ) AS movements
+        GROUP BY group_id, user_id
+        HAVING SUM(amount) <> 0
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('group_balances')
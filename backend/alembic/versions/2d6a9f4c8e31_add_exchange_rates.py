@@ -0,0 +1,39 @@
+"""Add exchange rates and expense conversion columns
+
+Revision ID: 2d6a9f4c8e31
+Revises: 0b4e8d2f7c15
+Create Date: 2026-10-19 18:21:15.630482
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2d6a9f4c8e31'
+down_revision: Union[str, None] = '0b4e8d2f7c15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('exchange_rates',
+    sa.Column('rate_date', sa.Date(), nullable=False),
+    sa.Column('currency', sa.String(length=3), nullable=False),
+    sa.Column('rate', sa.Numeric(precision=24, scale=10), nullable=False),
+    sa.PrimaryKeyConstraint('rate_date', 'currency')
+    )
+    op.add_column('expenses', sa.Column('original_amount_minor', sa.BigInteger(), nullable=True))
+    op.add_column('expenses', sa.Column('original_currency', sa.String(length=3), nullable=True))
+    op.add_column('expenses', sa.Column('fx_rate', sa.Numeric(precision=24, scale=12), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('expenses', 'fx_rate')
+    op.drop_column('expenses', 'original_currency')
+    op.drop_column('expenses', 'original_amount_minor')
+    op.drop_table('exchange_rates')
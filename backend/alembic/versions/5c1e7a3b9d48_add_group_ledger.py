@@ -0,0 +1,68 @@
+"""Add group ledger events and snapshots
+
+Revision ID: 5c1e7a3b9d48
+Revises: 2d6a9f4c8e31
+Create Date: 2026-10-19 19:40:52.107334
+
+"""
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e7a3b9d48'
+down_revision: Union[str, None] = '2d6a9f4c8e31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('groups', sa.Column('ledger_version', sa.Integer(), server_default='0', nullable=False))
+    op.create_table('ledger_events',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('group_id', sa.Integer(), nullable=False),
+    sa.Column('seq', sa.Integer(), nullable=False),
+    sa.Column('occurred_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('event_type', sa.String(), nullable=False),
+    sa.Column('actor_id', sa.Integer(), nullable=False),
+    sa.Column('entity_id', sa.BigInteger(), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('deltas', sa.JSON(), nullable=False),
+    sa.ForeignKeyConstraint(['actor_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['group_id'], ['groups.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('group_id', 'seq', name='uq_ledger_events_group_id_seq')
+    )
+    snapshots = op.create_table('ledger_snapshots',
+    sa.Column('group_id', sa.Integer(), nullable=False),
+    sa.Column('seq', sa.Integer(), nullable=False),
+    sa.Column('taken_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('balances', sa.JSON(), nullable=False),
+    sa.ForeignKeyConstraint(['group_id'], ['groups.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('group_id', 'seq')
+    )
+
+    # Existing balances become each group's opening snapshot at seq 0
+    opening = defaultdict(dict)
+    for group_id, user_id, net_minor in op.get_bind().execute(
+        sa.text("SELECT group_id, user_id, net_minor FROM group_balances WHERE net_minor <> 0")
+    ):
+        opening[group_id][str(user_id)] = net_minor
+    taken_at = datetime.now(timezone.utc)
+    if opening:
+        op.bulk_insert(snapshots, [
+            {"group_id": group_id, "seq": 0, "taken_at": taken_at, "balances": balances}
+            for group_id, balances in opening.items()
+        ])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('ledger_snapshots')
+    op.drop_table('ledger_events')
+    op.drop_column('groups', 'ledger_version')
@@ -0,0 +1,64 @@
+"""Add activity feed
+
+Revision ID: 7a2f4d1c6b90
+Revises: 5c1e7a3b9d48
+Create Date: 2026-10-19 21:12:37.480215
+
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a2f4d1c6b90'
+down_revision: Union[str, None] = '5c1e7a3b9d48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Defaults of FEED_FANOUT_MAX_MEMBERS and FEED_RETENTION_DAYS when this was written
+FANOUT_MAX_MEMBERS = 50
+RETENTION_DAYS = 90
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('groups', sa.Column('feed_pull_from_seq', sa.Integer(), nullable=True))
+    op.create_table('activity_feed',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('occurred_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('group_id', sa.Integer(), nullable=False),
+    sa.Column('seq', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['group_id'], ['groups.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'occurred_at', 'group_id', 'seq')
+    )
+    op.create_index('ix_ledger_events_group_id_occurred_at', 'ledger_events', ['group_id', 'occurred_at'], unique=False)
+
+    # Large groups read their whole ledger at feed time; small ones get
+    # their recent history fanned out
+    op.execute(sa.text(
+        "UPDATE groups SET feed_pull_from_seq = 1 "
+        "WHERE (SELECT count(*) FROM group_members WHERE group_members.group_id = groups.id) > :max_members"
+    ).bindparams(max_members=FANOUT_MAX_MEMBERS))
+    op.execute(sa.text(
+        "INSERT INTO activity_feed (user_id, occurred_at, group_id, seq) "
+        "SELECT group_members.user_id, ledger_events.occurred_at, ledger_events.group_id, ledger_events.seq "
+        "FROM ledger_events "
+        "JOIN groups ON groups.id = ledger_events.group_id "
+        "JOIN group_members ON group_members.group_id = ledger_events.group_id "
+        "WHERE groups.feed_pull_from_seq IS NULL "
+        "AND ledger_events.occurred_at >= group_members.joined_at "
+        "AND ledger_events.occurred_at >= :since"
+    ).bindparams(sa.bindparam(
+        'since', datetime.now(timezone.utc) - timedelta(days=RETENTION_DAYS), type_=sa.DateTime(timezone=True)
+    )))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_ledger_events_group_id_occurred_at', table_name='ledger_events')
+    op.drop_table('activity_feed')
+    op.drop_column('groups', 'feed_pull_from_seq')
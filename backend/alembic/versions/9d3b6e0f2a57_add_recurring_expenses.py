@@ -0,0 +1,66 @@
+"""Add recurring expenses
+
+Revision ID: 9d3b6e0f2a57
+Revises: 7a2f4d1c6b90
+Create Date: 2026-10-19 22:05:14.913507
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d3b6e0f2a57'
+down_revision: Union[str, None] = '7a2f4d1c6b90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('recurring_expenses',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('group_id', sa.Integer(), nullable=False),
+    sa.Column('created_by', sa.Integer(), nullable=False),
+    sa.Column('description', sa.String(), nullable=False),
+    sa.Column('amount_minor', sa.BigInteger(), nullable=False),
+    sa.Column('currency', sa.String(length=3), nullable=True),
+    sa.Column('paid_by', sa.Integer(), nullable=False),
+    sa.Column('shares', sa.JSON(), nullable=True),
+    sa.Column('interval_unit', sa.String(), nullable=False),
+    sa.Column('interval_count', sa.Integer(), server_default='1', nullable=False),
+    sa.Column('start_on', sa.Date(), nullable=False),
+    sa.Column('ends_on', sa.Date(), nullable=True),
+    sa.Column('next_index', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('next_run_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('active', sa.Boolean(), server_default=sa.true(), nullable=False),
+    sa.Column('last_error', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['group_id'], ['groups.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['paid_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_recurring_expenses_group_id'), 'recurring_expenses', ['group_id'], unique=False)
+    op.create_index('ix_recurring_expenses_next_run_at', 'recurring_expenses', ['next_run_at'], unique=False)
+    op.add_column('expenses', sa.Column('recurring_id', sa.Integer(), nullable=True))
+    op.add_column('expenses', sa.Column('occurrence_on', sa.Date(), nullable=True))
+    op.create_foreign_key(
+        'fk_expenses_recurring_id', 'expenses', 'recurring_expenses', ['recurring_id'], ['id'], ondelete='SET NULL'
+    )
+    op.create_unique_constraint(
+        'uq_expenses_recurring_id_occurrence_on', 'expenses', ['recurring_id', 'occurrence_on']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_expenses_recurring_id_occurrence_on', 'expenses', type_='unique')
+    op.drop_constraint('fk_expenses_recurring_id', 'expenses', type_='foreignkey')
+    op.drop_column('expenses', 'occurrence_on')
+    op.drop_column('expenses', 'recurring_id')
+    op.drop_index('ix_recurring_expenses_next_run_at', table_name='recurring_expenses')
+    op.drop_index(op.f('ix_recurring_expenses_group_id'), table_name='recurring_expenses')
+    op.drop_table('recurring_expenses')
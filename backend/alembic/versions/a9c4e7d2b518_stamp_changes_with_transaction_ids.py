@@ -0,0 +1,89 @@
+"""Stamp change sequence numbers with transaction ids
+
+Taking the next value of the change_counter row serialized every synced
+write, logins included, on that one row lock. Changes are now stamped
+with the writing transaction's id plus a fixed offset, chosen here so
+that new numbers stay above every number handed out by the counter.
+stable_change_seq() is the highest number no transaction still in
+progress can use; sync serves changes up to it.
+
+Revision ID: a9c4e7d2b518
+Revises: d4f8a2c61e93
+Create Date: 2026-10-21 09:37:52.604113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9c4e7d2b518'
+down_revision: Union[str, None] = 'd4f8a2c61e93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def functions(next_number: str) -> list:
+    """The trigger functions of d4f8a2c61e93, stamping with `next_number`"""
+    return [
+        f"""CREATE OR REPLACE FUNCTION stamp_change_seq() RETURNS trigger AS $$
+BEGIN
+    NEW.change_seq := {next_number};
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql""",
+        f"""CREATE OR REPLACE FUNCTION record_sync_tombstone() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO sync_tombstones (entity, entity_id, group_id, change_seq)
+    VALUES (TG_ARGV[0], OLD.id, OLD.group_id, {next_number});
+    RETURN OLD;
+END
+$$ LANGUAGE plpgsql""",
+        f"""CREATE OR REPLACE FUNCTION touch_share_expense() RETURNS trigger AS $$
+BEGIN
+    UPDATE expenses SET change_seq = {next_number} WHERE id = OLD.expense_id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql""",
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    # Already installed by metadata.create_all: keep its offset
+    if bind.scalar(sa.text("SELECT to_regprocedure('stable_change_seq()') IS NOT NULL")):
+        op.execute("DROP FUNCTION IF EXISTS next_change_seq()")
+        return
+    offset = bind.scalar(sa.text(
+        "SELECT greatest(0, value + 1 - pg_current_xact_id()::text::bigint) FROM change_counter WHERE id = 1"
+    ))
+    op.execute(f"""CREATE OR REPLACE FUNCTION current_change_seq() RETURNS bigint AS $$
+    SELECT pg_current_xact_id()::text::bigint + {offset}
+$$ LANGUAGE sql VOLATILE""")
+    # Every transaction with a lower id has committed or rolled back
+    op.execute(f"""CREATE OR REPLACE FUNCTION stable_change_seq() RETURNS bigint AS $$
+    SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint + {offset} - 1
+$$ LANGUAGE sql STABLE""")
+    for statement in functions("current_change_seq()"):
+        op.execute(statement)
+    op.execute("DROP FUNCTION IF EXISTS next_change_seq()")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    # Continue the counter above every number stamped since
+    op.execute("UPDATE change_counter SET value = greatest(value, current_change_seq()) WHERE id = 1")
+    op.execute("""CREATE OR REPLACE FUNCTION next_change_seq() RETURNS bigint AS $$
+    UPDATE change_counter SET value = value + 1 WHERE id = 1 RETURNING value
+$$ LANGUAGE sql""")
+    for statement in functions("next_change_seq()"):
+        op.execute(statement)
+    op.execute("DROP FUNCTION IF EXISTS stable_change_seq()")
+    op.execute("DROP FUNCTION IF EXISTS current_change_seq()")
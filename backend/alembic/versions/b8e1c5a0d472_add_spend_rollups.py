@@ -0,0 +1,50 @@
+"""Add expense categories and spend rollups
+
+Fill the rollups afterwards with `python -m app.services.analytics backfill`.
+
+Revision ID: b8e1c5a0d472
+Revises: 9d3b6e0f2a57
+Create Date: 2026-10-19 23:01:48.662930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e1c5a0d472'
+down_revision: Union[str, None] = '9d3b6e0f2a57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('expenses', sa.Column('category', sa.String(length=32), server_default='other', nullable=False))
+    op.add_column(
+        'recurring_expenses', sa.Column('category', sa.String(length=32), server_default='other', nullable=False)
+    )
+    op.create_table('spend_rollups',
+    sa.Column('group_id', sa.Integer(), nullable=False),
+    sa.Column('period', sa.String(length=5), nullable=False),
+    sa.Column('period_start', sa.Date(), nullable=False),
+    sa.Column('category', sa.String(length=32), nullable=False),
+    sa.Column('paid_by', sa.Integer(), nullable=False),
+    sa.Column('currency', sa.String(length=3), nullable=False),
+    sa.Column('amount_minor', sa.BigInteger(), nullable=False),
+    sa.Column('expense_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['group_id'], ['groups.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['paid_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('group_id', 'period', 'period_start', 'category', 'paid_by')
+    )
+    op.create_index('ix_spend_rollups_paid_by_period', 'spend_rollups', ['paid_by', 'period', 'period_start'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_spend_rollups_paid_by_period', table_name='spend_rollups')
+    op.drop_table('spend_rollups')
+    op.drop_column('recurring_expenses', 'category')
+    op.drop_column('expenses', 'category')
@@ -0,0 +1,32 @@
+"""Add user activity columns
+
+Revision ID: c5e2f0a8b7d3
+Revises: a41c7d9e2b10
+Create Date: 2026-10-19 11:40:12.904152
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e2f0a8b7d3'
+down_revision: Union[str, None] = 'a41c7d9e2b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('last_login_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('users', sa.Column('last_seen_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(op.f('ix_users_last_seen_at'), 'users', ['last_seen_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_users_last_seen_at'), table_name='users')
+    op.drop_column('users', 'last_seen_at')
+    op.drop_column('users', 'last_login_at')
@@ -0,0 +1,139 @@
+"""Add change sequence numbers and tombstones for delta sync
+
+Existing rows are numbered table by table; the triggers stamping new
+changes are the PostgreSQL ones from app.db.change_tracking as of this
+revision.
+
+Revision ID: d4f8a2c61e93
+Revises: b8e1c5a0d472
+Create Date: 2026-10-20 00:14:09.318562
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4f8a2c61e93'
+down_revision: Union[str, None] = 'b8e1c5a0d472'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SYNCED_COLUMNS = {
+    "users": (
+        "username", "email", "phone_number", "full_name", "avatar_url",
+        "is_active", "is_verified", "profile_completed", "auth_providers",
+    ),
+    "groups": ("name", "currency"),
+    "group_members": ("role",),
+    "expenses": (
+        "paid_by", "description", "category", "amount_minor", "currency",
+        "original_amount_minor", "original_currency", "fx_rate",
+    ),
+    "settlements": ("from_user_id", "to_user_id", "amount_minor", "currency"),
+}
+TOMBSTONED = {"group_members": "group_member", "expenses": "expense", "settlements": "settlement"}
+INDEXES = {
+    "users": ("ix_users_change_seq", ["change_seq"]),
+    "groups": ("ix_groups_change_seq", ["change_seq"]),
+    "group_members": ("ix_group_members_group_id_change_seq", ["group_id", "change_seq"]),
+    "expenses": ("ix_expenses_group_id_change_seq", ["group_id", "change_seq"]),
+    "settlements": ("ix_settlements_group_id_change_seq", ["group_id", "change_seq"]),
+}
+
+FUNCTIONS = [
+    """CREATE OR REPLACE FUNCTION next_change_seq() RETURNS bigint AS $$
+    UPDATE change_counter SET value = value + 1 WHERE id = 1 RETURNING value
+$$ LANGUAGE sql""",
+    """CREATE OR REPLACE FUNCTION stamp_change_seq() RETURNS trigger AS $$
+BEGIN
+    NEW.change_seq := next_change_seq();
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql""",
+    """CREATE OR REPLACE FUNCTION record_sync_tombstone() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO sync_tombstones (entity, entity_id, group_id, change_seq)
+    VALUES (TG_ARGV[0], OLD.id, OLD.group_id, next_change_seq());
+    RETURN OLD;
+END
+$$ LANGUAGE plpgsql""",
+    """CREATE OR REPLACE FUNCTION touch_share_expense() RETURNS trigger AS $$
+BEGIN
+    UPDATE expenses SET change_seq = next_change_seq() WHERE id = OLD.expense_id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql""",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('change_counter',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('value', sa.BigInteger(), nullable=False),
+    sa.Column('tombstones_pruned_through', sa.BigInteger(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('sync_tombstones',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('entity', sa.String(length=16), nullable=False),
+    sa.Column('entity_id', sa.BigInteger(), nullable=False),
+    sa.Column('group_id', sa.Integer(), nullable=False),
+    sa.Column('change_seq', sa.BigInteger(), nullable=False),
+    sa.Column('occurred_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_sync_tombstones_group_id_change_seq', 'sync_tombstones', ['group_id', 'change_seq'], unique=False
+    )
+    op.execute("INSERT INTO change_counter (id, value, tombstones_pruned_through) VALUES (1, 0, 0)")
+
+    for table in SYNCED_COLUMNS:
+        op.add_column(table, sa.Column('change_seq', sa.BigInteger(), server_default='0', nullable=False))
+        # Give every existing row its own number, after those of the tables before it
+        op.execute(f"UPDATE {table} SET change_seq = id + (SELECT value FROM change_counter WHERE id = 1)")
+        op.execute(
+            f"UPDATE change_counter SET value = value + (SELECT coalesce(max(id), 0) FROM {table}) WHERE id = 1"
+        )
+        name, columns = INDEXES[table]
+        op.create_index(name, table, columns, unique=False)
+
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for statement in FUNCTIONS:
+        op.execute(statement)
+    for table, columns in SYNCED_COLUMNS.items():
+        op.execute(
+            f"CREATE OR REPLACE TRIGGER {table}_change_seq BEFORE INSERT OR UPDATE OF {', '.join(columns)} "
+            f"ON {table} FOR EACH ROW EXECUTE FUNCTION stamp_change_seq()"
+        )
+    for table, entity in TOMBSTONED.items():
+        op.execute(
+            f"CREATE OR REPLACE TRIGGER {table}_tombstone AFTER DELETE "
+            f"ON {table} FOR EACH ROW EXECUTE FUNCTION record_sync_tombstone('{entity}')"
+        )
+    op.execute(
+        "CREATE OR REPLACE TRIGGER expense_shares_change_seq AFTER UPDATE OR DELETE "
+        "ON expense_shares FOR EACH ROW EXECUTE FUNCTION touch_share_expense()"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP TRIGGER IF EXISTS expense_shares_change_seq ON expense_shares")
+        for table in TOMBSTONED:
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_tombstone ON {table}")
+        for table in SYNCED_COLUMNS:
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_change_seq ON {table}")
+        for function in ("touch_share_expense", "record_sync_tombstone", "stamp_change_seq", "next_change_seq"):
+            op.execute(f"DROP FUNCTION IF EXISTS {function}()")
+    for table, (name, _) in INDEXES.items():
+        op.drop_index(name, table_name=table)
+        op.drop_column(table, 'change_seq')
+    op.drop_index('ix_sync_tombstones_group_id_change_seq', table_name='sync_tombstones')
+    op.drop_table('sync_tombstones')
+    op.drop_table('change_counter')
@@ -0,0 +1,42 @@
+"""Add auth events table
+
+Revision ID: e83b1f6c9a24
+Revises: c5e2f0a8b7d3
+Create Date: 2026-10-19 14:05:37.552910
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e83b1f6c9a24'
+down_revision: Union[str, None] = 'c5e2f0a8b7d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('auth_events',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('occurred_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('event_type', sa.String(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('provider', sa.String(), nullable=True),
+    sa.Column('identifier', sa.String(), nullable=True),
+    sa.Column('ip_address', sa.String(), nullable=True),
+    sa.Column('details', sa.JSON(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_auth_events_occurred_at', 'auth_events', ['occurred_at'], unique=False, postgresql_using='brin')
+    op.create_index('ix_auth_events_user_id_occurred_at', 'auth_events', ['user_id', 'occurred_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_auth_events_user_id_occurred_at', table_name='auth_events')
+    op.drop_index('ix_auth_events_occurred_at', table_name='auth_events')
+    op.drop_table('auth_events')
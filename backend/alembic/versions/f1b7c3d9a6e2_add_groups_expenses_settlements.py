@@ -0,0 +1,103 @@
+"""Add groups, expenses and settlements
+
+Revision ID: f1b7c3d9a6e2
+Revises: e83b1f6c9a24
+Create Date: 2026-10-19 16:12:08.204117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1b7c3d9a6e2'
+down_revision: Union[str, None] = 'e83b1f6c9a24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('groups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('currency', sa.String(length=3), server_default='USD', nullable=False),
+    sa.Column('created_by', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('group_members',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('group_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('role', sa.String(), server_default='member', nullable=False),
+    sa.Column('joined_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['group_id'], ['groups.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('group_id', 'user_id', name='uq_group_members_group_id_user_id')
+    )
+    op.create_index(op.f('ix_group_members_user_id'), 'group_members', ['user_id'], unique=False)
+    op.create_table('expenses',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('group_id', sa.Integer(), nullable=False),
+    sa.Column('paid_by', sa.Integer(), nullable=False),
+    sa.Column('created_by', sa.Integer(), nullable=False),
+    sa.Column('description', sa.String(), nullable=False),
+    sa.Column('amount_minor', sa.BigInteger(), nullable=False),
+    sa.Column('currency', sa.String(length=3), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['group_id'], ['groups.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['paid_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_expenses_group_id_created_at', 'expenses', ['group_id', 'created_at'], unique=False)
+    op.create_index('ix_expenses_group_id_paid_by', 'expenses', ['group_id', 'paid_by'], unique=False)
+    op.create_table('expense_shares',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('expense_id', sa.BigInteger(), nullable=False),
+    sa.Column('group_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('amount_minor', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['expense_id'], ['expenses.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['group_id'], ['groups.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('expense_id', 'user_id', name='uq_expense_shares_expense_id_user_id')
+    )
+    op.create_index('ix_expense_shares_group_id_user_id', 'expense_shares', ['group_id', 'user_id'], unique=False)
+    op.create_table('settlements',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('group_id', sa.Integer(), nullable=False),
+    sa.Column('from_user_id', sa.Integer(), nullable=False),
+    sa.Column('to_user_id', sa.Integer(), nullable=False),
+    sa.Column('amount_minor', sa.BigInteger(), nullable=False),
+    sa.Column('currency', sa.String(length=3), nullable=False),
+    sa.Column('created_by', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['from_user_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['group_id'], ['groups.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['to_user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_settlements_group_id_created_at', 'settlements', ['group_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_settlements_group_id_created_at', table_name='settlements')
+    op.drop_table('settlements')
+    op.drop_index('ix_expense_shares_group_id_user_id', table_name='expense_shares')
+    op.drop_table('expense_shares')
+    op.drop_index('ix_expenses_group_id_paid_by', table_name='expenses')
+    op.drop_index('ix_expenses_group_id_created_at', table_name='expenses')
+    op.drop_table('expenses')
+    op.drop_index(op.f('ix_group_members_user_id'), table_name='group_members')
+    op.drop_table('group_members')
+    op.drop_table('groups')
@@ -0,0 +1,73 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, List, Literal, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session as DbSession
+
+from app.core.auth import get_current_user
+from app.db.session import get_read_db
+from app.models.user import User
+from app.schemas.analytics import GroupSpend, GroupTrend, UserSpendRow
+from app.services.analytics import get_group_spend, get_group_trend, get_user_spend
+from app.services.group import get_group_for_member
+
+router = APIRouter()
+
+# Longest range one request may cover, so a chart never reads unbounded rollups
+MAX_RANGE_DAYS = {"day": 366, "month": 3660}
+
+def _date_range(period: str, start: Optional[date], end: Optional[date]) -> Tuple[date, date]:
+    end = end or datetime.now(timezone.utc).date()
+    start = start or end - timedelta(days=30 if period == "day" else 365)
+    if start > end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start must not be after end")
+    if (end - start).days > MAX_RANGE_DAYS[period]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A {period} range may cover at most {MAX_RANGE_DAYS[period]} days"
+        )
+    return start, end
+
+@router.get("/groups/{group_id}/spend", response_model=GroupSpend)
+def read_group_spend(
+    group_id: int,
+    period: Literal["day", "month"] = "month",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    group_by: List[Literal["category", "paid_by"]] = Query(["category"]),
+    db: DbSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Group spend per day or month (default: the last year by month), split by category and/or payer"""
+    group = get_group_for_member(db, group_id, current_user.id)
+    start, end = _date_range(period, start, end)
+    return {
+        "group_id": group.id,
+        "currency": group.currency,
+        "period": period,
+        "rows": get_group_spend(db, group.id, period, start, end, by=group_by),
+    }
+
+@router.get("/groups/{group_id}/trend", response_model=GroupTrend)
+def read_group_trend(
+    group_id: int,
+    months: int = Query(12, ge=2, le=120),
+    db: DbSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Monthly totals up to the current month, with month-over-month change"""
+    group = get_group_for_member(db, group_id, current_user.id)
+    end = datetime.now(timezone.utc).date()
+    return {"group_id": group.id, "currency": group.currency, "months": get_group_trend(db, group.id, months, end)}
+
+@router.get("/me/spend", response_model=List[UserSpendRow])
+def read_my_spend(
+    period: Literal["day", "month"] = "month",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: DbSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """What the current user paid across all groups, per period, currency and category"""
+    start, end = _date_range(period, start, end)
+    return get_user_spend(db, current_user.id, period, start, end)
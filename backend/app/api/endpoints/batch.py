@@ -0,0 +1,31 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.orm import Session as DbSession
+
+from app.core.auth import get_current_user
+from app.db.session import get_db
+from app.models.user import User
+from app.schemas.batch import BatchRequest, BatchResponse
+from app.services.batch import run_batch
+
+router = APIRouter()
+
+@router.post("/", response_model=BatchResponse)
+async def batch_requests(
+    batch_in: BatchRequest,
+    request: Request,
+    db: DbSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Several API calls in one round trip, answered in order.
+
+    Every sub-request runs as the current user; reads between writes run
+    concurrently, writes one at a time in the order given. A failing
+    sub-request does not stop the others.
+    """
+    # Paths are relative to the API root this router is mounted under
+    api_root = request.scope["path"].rstrip("/").rsplit("/batch", 1)[0]
+    responses = await run_batch(request.app, request.scope, api_root, batch_in.requests, current_user, db)
+    return {"responses": responses}
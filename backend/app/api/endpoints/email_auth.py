@@ -1,6 +1,6 @@
 from typing import Any, Optional
 from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session as DbSession
 from pydantic import BaseModel, EmailStr
@@ -14,6 +14,7 @@ from app.schemas.token import Token
 # Update imports to use the new modular services
 from app.services.auth_service import authenticate_user
 from app.services.user import create_user
+from app.services.audit_log import audit_log, client_ip
 
 router = APIRouter()
 
@@ -26,6 +27,7 @@ class EmailSignupRequest(BaseModel):
 @router.post("/signup", response_model=Token)
 def signup_with_email(
     signup_data: EmailSignupRequest,
+    request: Request,
     db: DbSession = Depends(get_db)
 ) -> Any:
     """Register a new user with email/password authentication"""
@@ -37,6 +39,7 @@ def signup_with_email(
     )
     
     user = create_user(db, user_create)
+    audit_log.record("register", user_id=user.id, provider="email", ip_address=client_ip(request))
     
     # Generate JWT token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -49,16 +52,22 @@ def signup_with_email(
 
 @router.post("/login", response_model=Token)
 def login_with_email(
+    request: Request,
     db: DbSession = Depends(get_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     """Login with email/username and password"""
     user = authenticate_user(db, form_data.username, form_data.password, provider="email")
     if not user:
+        audit_log.record(
+            "login_failed", provider="email",
+            identifier=form_data.username, ip_address=client_ip(request)
+        )
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email/username or password",
         )
+    audit_log.record("login", user_id=user.id, provider="email", ip_address=client_ip(request))
     
     # Generate JWT token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
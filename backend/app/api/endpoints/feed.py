@@ -0,0 +1,29 @@
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session as DbSession
+
+from app.core.auth import get_current_user
+from app.db.session import get_read_db
+from app.models.user import User
+from app.schemas.feed import FeedPage
+from app.services.activity_feed import decode_cursor, encode_cursor, get_feed
+
+router = APIRouter()
+
+@router.get("/", response_model=FeedPage)
+def read_feed(
+    before: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: DbSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Activity across all of the current user's groups, newest first; page with `before`"""
+    cursor = None
+    if before is not None:
+        try:
+            cursor = decode_cursor(before)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    items, next_cursor = get_feed(db, current_user.id, before=cursor, limit=limit)
+    return {"items": items, "next_cursor": encode_cursor(next_cursor) if next_cursor else None}
@@ -0,0 +1,370 @@
+from datetime import datetime
+from typing import Any, List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from sqlalchemy.orm import Session as DbSession
+
+from app.core.auth import get_current_user, get_stream_user_id, load_active_user
+from app.core.compression import compression
+from app.core.http_cache import etag_matches, not_modified, resource_etag, set_cache_headers
+from app.db.session import get_db, get_read_db
+from app.models.user import User
+from app.schemas.group import (
+    Group as GroupSchema, GroupCreate, GroupMember as GroupMemberSchema, GroupMemberAdd,
+    Expense as ExpenseSchema, ExpenseCreate, ExpenseBatchCreate, Settlement as SettlementSchema, SettlementCreate,
+    GroupSummary, SettleUp, LedgerEvent as LedgerEventSchema, BalancesAt,
+    RecurringExpense as RecurringExpenseSchema, RecurringExpenseCreate,
+)
+from app.services.balances import get_group_balances
+from app.services.expense import (
+    create_expense, create_expenses, get_expenses, update_expense, delete_expense, create_settlement, get_settlements,
+    get_group_summary
+)
+from app.services.export import (
+    cached_export, csv_chunks, export_renderer, open_snapshot, snapshot_version
+)
+from app.services.group_events import group_event_stream, publish_group_event
+from app.services.ledger import balances_at, get_ledger_events
+from app.services.recurring import (
+    create_recurring_expense, get_recurring_expenses, recurring_scheduler, stop_recurring_expense
+)
+from app.services.settlement import EXACT_SOLVER_MAX_MEMBERS, simplify_debts
+from app.services.group import (
+    create_group, get_group_for_member, get_groups_for_user, get_group_members, add_group_member
+)
+
+router = APIRouter()
+
+@router.post("/", response_model=GroupSchema, status_code=status.HTTP_201_CREATED)
+def create_new_group(
+    group_in: GroupCreate,
+    current_user: User = Depends(get_current_user),
+    db: DbSession = Depends(get_db),
+) -> Any:
+    """Create a group owned by the current user"""
+    return create_group(db, group_in, current_user.id)
+
+@router.get("/", response_model=List[GroupSchema])
+def read_my_groups(
+    db: DbSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Groups the current user belongs to"""
+    return get_groups_for_user(db, current_user.id)
+
+@router.get("/{group_id}", response_model=GroupSchema)
+def read_group(
+    group_id: int,
+    db: DbSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    return get_group_for_member(db, group_id, current_user.id)
+
+@router.get("/{group_id}/members", response_model=List[GroupMemberSchema])
+def read_group_members(
+    group_id: int,
+    db: DbSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    get_group_for_member(db, group_id, current_user.id)
+    return get_group_members(db, group_id)
+
+@router.post("/{group_id}/members", response_model=GroupMemberSchema, status_code=status.HTTP_201_CREATED)
+def add_member(
+    group_id: int,
+    member_in: GroupMemberAdd,
+    current_user: User = Depends(get_current_user),
+    db: DbSession = Depends(get_db),
+) -> Any:
+    """Add an existing user to a group; any member can invite"""
+    get_group_for_member(db, group_id, current_user.id)
+    member = add_group_member(db, group_id, member_in.user_id)
+    publish_group_event(db, group_id, "member_joined", GroupMemberSchema.model_validate(member))
+    return member
+
+@router.post("/{group_id}/expenses", response_model=ExpenseSchema, status_code=status.HTTP_201_CREATED)
+def add_expense(
+    group_id: int,
+    expense_in: ExpenseCreate,
+    current_user: User = Depends(get_current_user),
+    db: DbSession = Depends(get_db),
+) -> Any:
+    group = get_group_for_member(db, group_id, current_user.id)
+    expense = create_expense(db, group, expense_in, current_user.id)
+    publish_group_event(db, group_id, "expense_added", ExpenseSchema.model_validate(expense), include_balances=True)
+    return expense
+
+@router.post("/{group_id}/expenses/batch", response_model=List[ExpenseSchema], status_code=status.HTTP_201_CREATED)
+def add_expenses(
+    group_id: int,
+    batch_in: ExpenseBatchCreate,
+    current_user: User = Depends(get_current_user),
+    db: DbSession = Depends(get_db),
+) -> Any:
+    """Add up to 500 expenses at once, e.g. a trip imported from a spreadsheet; all or nothing"""
+    group = get_group_for_member(db, group_id, current_user.id)
+    expenses = create_expenses(db, group, batch_in.expenses, current_user.id)
+    publish_group_event(
+        db, group_id, "expenses_added", [ExpenseSchema.model_validate(expense) for expense in expenses],
+        include_balances=True
+    )
+    return expenses
+
+@router.get("/{group_id}/expenses", response_model=List[ExpenseSchema])
+def read_expenses(
+    group_id: int,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    db: DbSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Expenses with their shares, newest first"""
+    get_group_for_member(db, group_id, current_user.id)
+    return get_expenses(db, group_id, skip=skip, limit=limit)
+
+@router.put("/{group_id}/expenses/{expense_id}", response_model=ExpenseSchema)
+def edit_expense(
+    group_id: int,
+    expense_id: int,
+    expense_in: ExpenseCreate,
+    current_user: User = Depends(get_current_user),
+    db: DbSession = Depends(get_db),
+) -> Any:
+    """Replace an expense; `paid_by` defaults to the current payer"""
+    group = get_group_for_member(db, group_id, current_user.id)
+    expense = update_expense(db, group, expense_id, expense_in, current_user.id)
+    publish_group_event(db, group_id, "expense_updated", ExpenseSchema.model_validate(expense), include_balances=True)
+    return expense
+
+@router.delete("/{group_id}/expenses/{expense_id}", response_model=ExpenseSchema)
+def remove_expense(
+    group_id: int,
+    expense_id: int,
+    current_user: User = Depends(get_current_user),
+    db: DbSession = Depends(get_db),
+) -> Any:
+    get_group_for_member(db, group_id, current_user.id)
+    expense = delete_expense(db, group_id, expense_id, current_user.id)
+    publish_group_event(db, group_id, "expense_deleted", {"id": expense_id}, include_balances=True)
+    return expense
+
+@router.post(
+    "/{group_id}/recurring-expenses", response_model=RecurringExpenseSchema, status_code=status.HTTP_201_CREATED
+)
+def add_recurring_expense(
+    group_id: int,
+    recurring_in: RecurringExpenseCreate,
+    db: DbSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Post an expense automatically on a schedule, e.g. monthly rent"""
+    group = get_group_for_member(db, group_id, current_user.id)
+    template = create_recurring_expense(db, group, recurring_in, current_user.id)
+    recurring_scheduler.schedule(template.id, template.next_run_at)
+    return template
+
+@router.get("/{group_id}/recurring-expenses", response_model=List[RecurringExpenseSchema])
+def read_recurring_expenses(
+    group_id: int,
+    db: DbSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    get_group_for_member(db, group_id, current_user.id)
+    return get_recurring_expenses(db, group_id)
+
+@router.delete("/{group_id}/recurring-expenses/{template_id}", response_model=RecurringExpenseSchema)
+def remove_recurring_expense(
+    group_id: int,
+    template_id: int,
+    db: DbSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Stop a recurring expense; what it already posted stays"""
+    get_group_for_member(db, group_id, current_user.id)
+    return stop_recurring_expense(db, group_id, template_id, current_user.id)
+
+@router.post("/{group_id}/settlements", response_model=SettlementSchema, status_code=status.HTTP_201_CREATED)
+def add_settlement(
+    group_id: int,
+    settlement_in: SettlementCreate,
+    current_user: User = Depends(get_current_user),
+    db: DbSession = Depends(get_db),
+) -> Any:
+    group = get_group_for_member(db, group_id, current_user.id)
+    settlement = create_settlement(db, group, settlement_in, current_user.id)
+    publish_group_event(
+        db, group_id, "settlement_recorded", SettlementSchema.model_validate(settlement), include_balances=True
+    )
+    return settlement
+
+@router.get("/{group_id}/settlements", response_model=List[SettlementSchema])
+def read_settlements(
+    group_id: int,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    db: DbSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    get_group_for_member(db, group_id, current_user.id)
+    return get_settlements(db, group_id, skip=skip, limit=limit)
+
+@router.get("/{group_id}/summary", response_model=GroupSummary)
+def read_group_summary(
+    group_id: int,
+    db: DbSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Expense count, total spent and every member's net balance"""
+    group = get_group_for_member(db, group_id, current_user.id)
+    return get_group_summary(db, group)
+
+@router.get("/{group_id}/settle-up", response_model=SettleUp)
+def read_settle_up(
+    group_id: int,
+    exact: bool = True,
+    db: DbSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Who pays whom to settle the group.
+
+    Uses the minimum number of transfers for groups with up to
+    EXACT_SOLVER_MAX_MEMBERS non-zero balances (unless `exact` is false),
+    and a greedy pass with at most n - 1 transfers above that.
+    """
+    group = get_group_for_member(db, group_id, current_user.id)
+    balances = get_group_balances(db, group_id)
+    debtors_and_creditors = sum(1 for amount in balances.values() if amount)
+    return {
+        "group_id": group.id,
+        "currency": group.currency,
+        "exact": exact and debtors_and_creditors <= EXACT_SOLVER_MAX_MEMBERS,
+        "transfers": [transfer._asdict() for transfer in simplify_debts(balances, exact=exact)],
+    }
+
+@router.get("/{group_id}/ledger", response_model=List[LedgerEventSchema])
+def read_ledger(
+    group_id: int,
+    after_seq: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: DbSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Every expense and settlement change, oldest first; page with `after_seq`"""
+    get_group_for_member(db, group_id, current_user.id)
+    return get_ledger_events(db, group_id, after_seq=after_seq, limit=limit)
+
+@router.get("/{group_id}/balances", response_model=BalancesAt)
+def read_balances_at(
+    group_id: int,
+    at: Optional[datetime] = None,
+    db: DbSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Balances as they were at `at` (default: now), replayed from the ledger"""
+    get_group_for_member(db, group_id, current_user.id)
+    seq, balances = balances_at(db, group_id, at)
+    return {
+        "group_id": group_id,
+        "at": at,
+        "seq": seq,
+        "balances": [
+            {"user_id": user_id, "balance_minor": balance}
+            for user_id, balance in sorted(balances.items())
+        ],
+    }
+
+@router.get("/{group_id}/events")
+def stream_group_events(
+    group_id: int,
+    request: Request,
+    user_id: int = Depends(get_stream_user_id),
+    db: DbSession = Depends(get_read_db),
+) -> Any:
+    """
+    Server-sent events for expenses, settlements and new members, with the
+    updated balances. EventSource clients can authenticate with `?access_token=`.
+    """
+    user = load_active_user(db, user_id)
+    get_group_for_member(db, group_id, user.id)
+    # Give the connection back before the stream holds this request open
+    db.close()
+    return StreamingResponse(
+        group_event_stream(request, group_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# Streamed as it is read: cheap levels keep up with the rows
+@router.get("/{group_id}/export.csv", dependencies=[Depends(compression(gzip=1, br=1, zstd=1))])
+def export_group_csv(
+    group_id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: DbSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Every expense and settlement of the group as CSV, oldest first.
+
+    Streamed row by row from one database snapshot and cached per ledger
+    version, so downloading again before the next change reads no rows.
+    """
+    get_group_for_member(db, group_id, current_user.id)
+    snapshot = open_snapshot(db.get_bind())
+    db.close()
+    version = snapshot_version(snapshot, group_id)
+    if version is None:
+        snapshot.close()
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Group not found")
+    etag = resource_etag("group-export", group_id, version)
+    if etag_matches(if_none_match, etag):
+        snapshot.close()
+        return not_modified(etag)
+
+    filename = f"group-{group_id}-statement.csv"
+    path = cached_export(group_id, version, "csv")
+    if path is not None:
+        snapshot.close()
+        response = FileResponse(path, media_type="text/csv", filename=filename)
+    else:
+        response = StreamingResponse(
+            csv_chunks(snapshot, group_id, version),
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+            background=BackgroundTask(snapshot.close),
+        )
+    set_cache_headers(response, etag)
+    return response
+
+# Compressed once per ledger version (ETag cache), so spend more on size
+@router.get("/{group_id}/export.pdf", dependencies=[Depends(compression(gzip=9, br=9, zstd=12))])
+def export_group_pdf(
+    group_id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: DbSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    The group statement as a paginated PDF.
+
+    Rendered in the background: until the PDF for the current ledger
+    version exists the response is 202 with Retry-After, then the file.
+    """
+    group = get_group_for_member(db, group_id, current_user.id)
+    etag = resource_etag("group-export", group_id, group.ledger_version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    path = cached_export(group_id, group.ledger_version, "pdf")
+    if path is None:
+        export_renderer.submit(db.get_bind(), group_id)
+        return JSONResponse(
+            {"detail": "Statement is being rendered"},
+            status_code=status.HTTP_202_ACCEPTED,
+            headers={"Retry-After": "2"},
+        )
+    response = FileResponse(path, media_type="application/pdf", filename=f"group-{group_id}-statement.pdf")
+    set_cache_headers(response, etag)
+    return response
@@ -0,0 +1,88 @@
+from typing import Any, List, Optional
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from sqlalchemy.orm import Session as DbSession
+
+from app.core.auth import get_current_admin
+from app.core.compression import compression_cache
+from app.core.profiling import create_profile_token
+from app.db.session import get_db, get_read_db, engine, compiled_cache_stats, slow_query_log
+from app.models.user import User
+from app.schemas.auth_event import AuthEvent as AuthEventSchema
+from app.services.activity_tracker import activity_buffer
+from app.services.audit_log import audit_log, query_auth_events
+from app.services.currency import load_rates_file, rate_cache
+from app.services.event_broker import broker
+from app.services.export import export_renderer
+from app.services.recurring import recurring_scheduler
+
+router = APIRouter()
+
+@router.get("/metrics")
+def read_metrics(
+    admin: User = Depends(get_current_admin)
+) -> Any:
+    """Operational metrics for in-process background writers"""
+    return {
+        "activity_buffer": activity_buffer.stats(),
+        "audit_log": audit_log.stats(),
+        "compiled_cache": compiled_cache_stats(engine),
+        "compression_cache": compression_cache.stats(),
+        "event_broker": broker.stats(),
+        "exchange_rate_cache": rate_cache.stats(),
+        "exports": export_renderer.stats(),
+        "recurring_scheduler": recurring_scheduler.stats(),
+    }
+
+@router.get("/auth-events", response_model=List[AuthEventSchema])
+def read_auth_events(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    user_id: Optional[int] = None,
+    event_type: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: DbSession = Depends(get_read_db),
+    admin: User = Depends(get_current_admin),
+) -> Any:
+    """Query the authentication audit log; defaults to the last 24 hours"""
+    end = end or datetime.now(timezone.utc)
+    start = start or end - timedelta(days=1)
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be before end"
+        )
+    return query_auth_events(db, start, end, user_id=user_id, event_type=event_type, limit=limit)
+
+@router.post("/profile-token")
+def issue_profile_token(
+    expires_minutes: int = Query(15, ge=1, le=240),
+    admin: User = Depends(get_current_admin)
+) -> Any:
+    """Issue a token that enables profiling for requests sending it as X-Profile-Token"""
+    return {"profile_token": create_profile_token(expires_minutes), "header": "X-Profile-Token"}
+
+@router.get("/slow-queries")
+def read_slow_queries(
+    limit: int = Query(50, ge=1, le=1000),
+    admin: User = Depends(get_current_admin)
+) -> Any:
+    """Most recent statements over SLOW_QUERY_THRESHOLD_MS, newest first"""
+    return {
+        "threshold_ms": slow_query_log.threshold_ms,
+        "queries": slow_query_log.recent(limit),
+    }
+
+@router.post("/exchange-rates")
+def upload_exchange_rates(
+    file: UploadFile = File(...),
+    db: DbSession = Depends(get_db),
+    admin: User = Depends(get_current_admin),
+) -> Any:
+    """Load a `date,currency,rate` CSV (rates per FX_BASE_CURRENCY), replacing existing days"""
+    content = file.file.read().decode("utf-8")
+    try:
+        written = load_rates_file(db, content)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return {"loaded": written}
@@ -1,5 +1,5 @@
 from typing import Any, Optional
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session as DbSession
 from pydantic import BaseModel
 
@@ -10,6 +10,8 @@ from app.services.phone_auth import (
     find_or_create_user,
     generate_auth_response
 )
+from app.services.activity_tracker import activity_buffer
+from app.services.audit_log import audit_log, client_ip
 
 router = APIRouter()
 
@@ -28,6 +30,7 @@ class PhoneVerifyResponse(BaseModel):
 @router.post("/verify", response_model=PhoneVerifyResponse)
 def verify_phone_otp(
     auth_request: PhoneAuthRequest,
+    request: Request,
     db: DbSession = Depends(get_db)
 ) -> Any:
     """Verify Firebase phone OTP token and get or create a user"""
@@ -53,6 +56,12 @@ def verify_phone_otp(
             "phone_number": phone_number
         }
     
+    activity_buffer.record_login(user.id)
+    audit_log.record(
+        "login" if user_existed else "register",
+        user_id=user.id, provider="phone", ip_address=client_ip(request)
+    )
+    
     # Step 3: Generate the authentication response
     return generate_auth_response(
         user=user,
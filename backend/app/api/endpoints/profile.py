@@ -1,5 +1,5 @@
 from typing import Any
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session as DbSession
 from pydantic import BaseModel
 
@@ -9,17 +9,23 @@ from app.models.user import User
 from app.schemas.user import User as UserSchema, ProfileComplete
 from app.services.profile_service import complete_profile
 from app.services.auth_provider import link_auth_method, unlink_auth_method
+from app.services.audit_log import audit_log, client_ip
 
 router = APIRouter()
 
 @router.post("/complete", response_model=UserSchema)
 def complete_user_profile(
     profile_data: ProfileComplete,
+    request: Request,
     current_user: User = Depends(get_current_user),
     db: DbSession = Depends(get_db)
 ) -> Any:
     """Complete user profile after initial registration"""
     updated_user = complete_profile(db, current_user.id, profile_data)
+    audit_log.record(
+        "profile_update", user_id=current_user.id, ip_address=client_ip(request),
+        details={"fields": sorted(profile_data.model_dump(exclude_unset=True))}
+    )
     return updated_user
 
 class AuthMethodLink(BaseModel):
@@ -29,6 +35,7 @@ class AuthMethodLink(BaseModel):
 @router.post("/link", response_model=UserSchema)
 def link_authentication_method(
     link_data: AuthMethodLink,
+    request: Request,
     current_user: User = Depends(get_current_user),
     db: DbSession = Depends(get_db)
 ) -> Any:
@@ -46,14 +53,20 @@ def link_authentication_method(
     # Debug logging
     print(f"Updated user auth_providers: {updated_user.auth_providers}")
     
+    audit_log.record(
+        "link", user_id=current_user.id, provider=link_data.provider, ip_address=client_ip(request)
+    )
+    
     return updated_user
 
 @router.post("/unlink/{provider}", response_model=UserSchema)
 def unlink_authentication_method(
     provider: str,
+    request: Request,
     current_user: User = Depends(get_current_user),
     db: DbSession = Depends(get_db)
 ) -> Any:
     """Unlink an authentication method from the current user"""
     updated_user = unlink_auth_method(db, current_user.id, provider)
+    audit_log.record("unlink", user_id=current_user.id, provider=provider, ip_address=client_ip(request))
     return updated_user
\ No newline at end of file
@@ -5,7 +5,14 @@ from app.api.endpoints import (
     social_auth,
     profile, 
     session,
-    users
+    users,
+    groups,
+    feed,
+    analytics,
+    sync,
+    batch,
+    splits,
+    internal
 )
 from app.core.config import settings
 
@@ -54,6 +61,55 @@ router.include_router(
     tags=["user-management"]
 )
 
+# Groups, expenses and settlements
+router.include_router(
+    groups.router,
+    prefix="/groups",
+    tags=["groups"]
+)
+
+# Activity across all of a user's groups
+router.include_router(
+    feed.router,
+    prefix="/feed",
+    tags=["groups"]
+)
+
+# Spending charts, served from precomputed rollups
+router.include_router(
+    analytics.router,
+    prefix="/analytics",
+    tags=["analytics"]
+)
+
+# Delta sync for offline-first clients
+router.include_router(
+    sync.router,
+    prefix="/sync",
+    tags=["sync"]
+)
+
+# Several API calls per round trip
+router.include_router(
+    batch.router,
+    prefix="/batch",
+    tags=["batch"]
+)
+
+# Stateless receipt split calculator
+router.include_router(
+    splits.router,
+    prefix="/splits",
+    tags=["splits"]
+)
+
+# Internal operational endpoints (admin only)
+router.include_router(
+    internal.router,
+    prefix="/internal",
+    tags=["internal"]
+)
+
 @router.get("/")
 async def read_root():
     return {"message": "Welcome to the FastAPI backend!"}
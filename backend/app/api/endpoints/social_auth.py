@@ -1,17 +1,16 @@
 from typing import Any, Optional
 from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session as DbSession
 from pydantic import BaseModel
 
 from app.core.config import settings
 from app.core.security import create_access_token
 from app.db.session import get_db
-from app.schemas.user import UserCreate
 from app.schemas.token import Token
-from app.services.user import create_user
-from app.services.auth_service import authenticate_user
-from app.services.google_auth import verify_google_token
+from app.services.activity_tracker import activity_buffer
+from app.services.google_auth import verify_google_token, find_or_create_google_user
+from app.services.audit_log import audit_log, client_ip
 
 router = APIRouter()
 
@@ -23,6 +22,7 @@ class GoogleAuthRequest(BaseModel):
 @router.post("/google", response_model=Token)
 def login_with_google(
     auth_data: GoogleAuthRequest,
+    request: Request,
     db: DbSession = Depends(get_db)
 ) -> Any:
     """Login or register with Google OAuth"""
@@ -40,39 +40,40 @@ def login_with_google(
             detail="Invalid Google token: missing user ID"
         )
     
-    # Try to find user by Google ID
-    user = authenticate_user(db, "", provider="google", auth_id=google_id)
+    # For Google auth, we might create a username from email if not provided
+    username = auth_data.username or email.split("@")[0] if email else None
     
-    # If user doesn't exist and registration is allowed
-    if not user and auth_data.register_if_not_exists:
-        # For Google auth, we might create a username from email if not provided
-        username = auth_data.username or email.split("@")[0] if email else None
-        
-        if not username:
+    user, user_existed = find_or_create_google_user(
+        db,
+        google_id=google_id,
+        email=email,
+        full_name=user_info.get("name"),
+        register_if_not_exists=auth_data.register_if_not_exists,
+        username=username
+    )
+    
+    if not user:
+        if auth_data.register_if_not_exists:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Username is required for new registration"
             )
-        
-        # Get name from Google profile if available
-        full_name = user_info.get("name")
-        
-        # Create a new user with Google auth
-        user_create = UserCreate(
-            username=username,
-            email=email,
-            google_id=google_id,
-            full_name=full_name
-        )
-        
-        user = create_user(db, user_create)
-    
-    if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found and registration not allowed"
         )
     
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Inactive user"
+        )
+    activity_buffer.record_login(user.id)
+    audit_log.record(
+        "login" if user_existed else "register",
+        user_id=user.id, provider="google", ip_address=client_ip(request)
+    )
+    
     # Generate JWT token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -0,0 +1,24 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.core.auth import get_current_user_id
+from app.schemas.split import SplitRequest, SplitResponse
+from app.services.split_engine import split_receipts
+
+router = APIRouter()
+
+@router.post("/compute", response_model=SplitResponse)
+def compute_splits(
+    split_request: SplitRequest,
+    user_id: int = Depends(get_current_user_id),
+) -> Any:
+    """
+    Split one or more itemized receipts between their participants.
+
+    Stateless: nothing is stored, and no database access is needed.
+    """
+    try:
+        return {"results": split_receipts(split_request.receipts)}
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -0,0 +1,33 @@
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session as DbSession
+
+from app.core.auth import get_current_user
+from app.core.config import settings
+from app.db.session import get_read_db
+from app.models.user import User
+from app.schemas.sync import SyncPage
+from app.services.sync import FULL_SYNC, decode_token, get_changes
+
+router = APIRouter()
+
+@router.get("/", response_model=SyncPage)
+def sync_changes(
+    since: Optional[str] = None,
+    limit: int = Query(settings.SYNC_PAGE_SIZE, ge=1, le=5000),
+    db: DbSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Users, groups, members, expenses and settlements visible to the current
+    user that changed since the token `since`, plus what was deleted.
+    Without `since` everything is sent; keep calling while `has_more`.
+    """
+    since_seq = FULL_SYNC
+    if since is not None:
+        try:
+            since_seq = decode_token(since)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return get_changes(db, current_user.id, since=since_seq, limit=limit)
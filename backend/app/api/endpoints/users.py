@@ -1,28 +1,40 @@
-from typing import Any, List
+from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
 from sqlalchemy.orm import Session as DbSession
 
-from app.core.auth import get_current_user
-from app.db.session import get_db
+from app.core.auth import get_current_user, get_current_user_id, require_active
+from app.core.http_cache import resource_etag, etag_matches, set_cache_headers, not_modified
+from app.db.session import get_db, get_read_db
 from app.models.user import User
 from app.schemas.user import User as UserSchema, UserCreate, UserUpdate
-from app.services.user import create_user, delete_user, get_user, update_user, get_users  # Import the new function
+from app.services.audit_log import audit_log, client_ip
+from app.services.user import (
+    create_user, delete_user, get_user, update_user, get_user_rows, get_user_version,
+    get_profile_status_row
+)
 
 router = APIRouter()
 
 @router.get("/me", response_model=UserSchema)
 def read_user_me(
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_user)
 ) -> Any:
     """
     Get current user.
     """
+    etag = resource_etag("user", current_user.id, current_user.row_version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_cache_headers(response, etag)
     return current_user
 
 @router.put("/me", response_model=UserSchema)
 def update_user_me(
     user_in: UserUpdate,
+    request: Request,
     current_user: User = Depends(get_current_user),
     db: DbSession = Depends(get_db),
 ) -> Any:
@@ -30,28 +42,41 @@ def update_user_me(
     Update current user.
     """
     user = update_user(db, current_user.id, user_in)
+    audit_log.record(
+        "profile_update", user_id=current_user.id, ip_address=client_ip(request),
+        details={"fields": sorted(user_in.model_dump(exclude_unset=True))}
+    )
     return user
 
 @router.get("/{user_id}", response_model=UserSchema)
 def read_user_by_id(
     user_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: DbSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
-    db: DbSession = Depends(get_db),
 ) -> Any:
     """
     Get a specific user by id.
     """
-    user = get_user(db, user_id)
-    if not user:
+    # Revalidate against the row version before loading the full user
+    row_version = get_user_version(db, user_id)
+    if row_version is None:
         raise HTTPException(
             status_code=404,
             detail="The user with this id does not exist",
         )
+    etag = resource_etag("user", user_id, row_version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    user = get_user(db, user_id)
+    set_cache_headers(response, resource_etag("user", user.id, user.row_version))
     return user
 
 @router.get("/", response_model=List[UserSchema])
 def read_users(
-    db: DbSession = Depends(get_db),
+    db: DbSession = Depends(get_read_db),
     skip: int = 0,
     limit: int = 10,
     current_user: User = Depends(get_current_user),
@@ -59,22 +84,34 @@ def read_users(
     """
     Retrieve users.
     """
-    users = get_users(db, skip=skip, limit=limit)  # Use get_users instead of get_user
-    return users
+    # Column rows rather than ORM instances; the response model reads their attributes
+    return get_user_rows(db, skip=skip, limit=limit)
 
 @router.get("/me/profile-status", response_model=dict)
 def get_profile_status(
-    current_user: User = Depends(get_current_user)
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: DbSession = Depends(get_read_db),
+    user_id: int = Depends(get_current_user_id)
 ) -> Any:
     """Get the user's profile completion status and available auth methods"""
+    # A single column select replaces loading the full user for authentication
+    row = get_profile_status_row(db, user_id)
+    require_active(user_id, row)
+
+    etag = resource_etag("profile-status", user_id, row.row_version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_cache_headers(response, etag)
+    auth_providers = row.auth_providers or []
     return {
-        "is_complete": current_user.profile_completed,
-        "auth_providers": current_user.auth_providers,
-        "has_email": "email" in (current_user.auth_providers or []),
-        "has_phone": "phone" in (current_user.auth_providers or []),
-        "has_google": "google" in (current_user.auth_providers or []),
-        "username": current_user.username,
-        "email": current_user.email,
-        "phone_number": current_user.phone_number,
-        "full_name": current_user.full_name,
+        "is_complete": row.profile_completed,
+        "auth_providers": row.auth_providers,
+        "has_email": "email" in auth_providers,
+        "has_phone": "phone" in auth_providers,
+        "has_google": "google" in auth_providers,
+        "username": row.username,
+        "email": row.email,
+        "phone_number": row.phone_number,
+        "full_name": row.full_name,
     }
\ No newline at end of file
@@ -1,5 +1,5 @@
 from typing import Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from sqlalchemy.orm import Session as DbSession
@@ -8,19 +8,19 @@ from app.db.session import get_db
 from app.models.user import User
 from app.core.config import settings
 from app.services.user import get_user
+from app.services.activity_tracker import activity_buffer
 
 # Update the tokenUrl to match your new email authentication login endpoint
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/email/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/email/login", auto_error=False)
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: DbSession = Depends(get_db)
-) -> User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+credentials_exception = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
+def decode_user_id(token: str) -> int:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         user_id: Optional[int] = payload.get("user_id")
@@ -28,16 +28,75 @@ def get_current_user(
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    
-    try:
-        user = get_user(db, user_id)
-    except HTTPException:
+    return user_id
+
+def get_current_user_id(request: Request, token: str = Depends(oauth2_scheme)) -> int:
+    """
+    Decode the access token without loading the user.
+
+    For read paths that select their own columns; the endpoint is
+    responsible for rejecting missing or inactive users.
+    """
+    # /batch sub-requests reuse the batch's authentication
+    batch_user = getattr(request.state, "batch_user", None)
+    if batch_user is not None:
+        return batch_user.id
+    return decode_user_id(token)
+
+def get_stream_user_id(
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    access_token: Optional[str] = None,
+) -> int:
+    """
+    Like get_current_user_id, but also accepts `?access_token=`.
+
+    Browsers' EventSource cannot set an Authorization header.
+    """
+    token = token or access_token
+    if not token:
+        raise credentials_exception
+    return decode_user_id(token)
+
+def require_active(user_id: int, user) -> None:
+    """
+    Reject a token whose user is gone or inactive, then record the user as seen.
+
+    `user` is the loaded User, or any row with an `is_active` column, or
+    None when the lookup found nothing.
+    """
+    if user is None:
         raise credentials_exception
-        
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Inactive user"
         )
-        
-    return user
\ No newline at end of file
+    activity_buffer.record_seen(user_id)
+
+def load_active_user(db: DbSession, user_id: int) -> User:
+    """Load the user behind a decoded token, rejecting unknown and inactive users"""
+    try:
+        user = get_user(db, user_id)
+    except HTTPException:
+        user = None
+    require_active(user_id, user)
+    return user
+
+def get_current_user(
+    request: Request,
+    user_id: int = Depends(get_current_user_id),
+    db: DbSession = Depends(get_db)
+) -> User:
+    batch_user = getattr(request.state, "batch_user", None)
+    if batch_user is not None:
+        return batch_user
+    return load_active_user(db, user_id)
+
+def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
+    """Restrict an endpoint to the users listed in ADMIN_USER_IDS"""
+    if current_user.id not in settings.admin_user_ids:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required"
+        )
+    return current_user
\ No newline at end of file
@@ -0,0 +1,50 @@
+import logging
+import threading
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+class PeriodicWorker:
+    """Daemon thread that runs `task` every `interval` seconds until stopped"""
+
+    def __init__(self, name: str, interval: float, task: Callable[[], object]):
+        self.name = name
+        self.interval = interval
+        self.task = task
+        self._stopped = threading.Event()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stopped.clear()
+        self._wakeup.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def wake(self) -> None:
+        """Run the task now instead of waiting for the next interval"""
+        self._wakeup.set()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            if self._stopped.is_set():
+                break
+            try:
+                self.task()
+            except Exception:
+                logger.exception(f"Background task {self.name} failed")
@@ -0,0 +1,333 @@
+import gzip as _gzip
+import hashlib
+import zlib
+from collections import OrderedDict
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import anyio
+from fastapi import Request
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # Optional: pip install brotli
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # Optional: pip install zstandard
+    zstandard = None
+
+STATE_KEY = "compression_levels"
+
+# Compressed in a worker thread above this size; the codecs release the GIL
+_OFFLOAD_BYTES = 256 * 1024
+
+_COMPRESSIBLE_TYPES = (
+    "text/", "application/json", "application/xml", "application/javascript", "application/pdf",
+    "image/svg+xml",
+)
+# Compressing these would buffer or break them for the client
+_EXCLUDED_TYPES = ("text/event-stream",)
+
+class _GzipStream:
+    def __init__(self, level: int):
+        # wbits 31: gzip container
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        # Sync flush so each chunk reaches the client as it is produced
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+class _BrotliStream:
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+class _ZstdStream:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+class Encoding(NamedTuple):
+    name: str
+    compress: Callable[[bytes, int], bytes]  # (body, level) -> encoded body
+    stream: Callable[[int], object]  # level -> object with compress(chunk) and finish()
+
+def available_encodings() -> Dict[str, Encoding]:
+    """Installed content codings, most preferred first"""
+    encodings: List[Encoding] = []
+    # zstd and brotli both beat gzip on size; zstd is the cheaper of the two
+    if zstandard is not None:
+        encodings.append(Encoding(
+            "zstd", lambda body, level: zstandard.ZstdCompressor(level=level).compress(body), _ZstdStream
+        ))
+    if brotli is not None:
+        encodings.append(Encoding("br", lambda body, level: brotli.compress(body, quality=level), _BrotliStream))
+    encodings.append(Encoding("gzip", lambda body, level: _gzip.compress(body, level, mtime=0), _GzipStream))
+    return {encoding.name: encoding for encoding in encodings}
+
+def default_levels() -> Dict[str, int]:
+    return {
+        "gzip": settings.COMPRESSION_GZIP_LEVEL,
+        "br": settings.COMPRESSION_BROTLI_QUALITY,
+        "zstd": settings.COMPRESSION_ZSTD_LEVEL,
+    }
+
+def negotiate(accept_encoding: str, available: List[str]) -> Optional[str]:
+    """
+    Pick a content coding from an Accept-Encoding header.
+
+    The client's q-values decide; among equally weighted codings the
+    order of `available` does. Returns None when nothing acceptable is
+    available, in which case the body goes out as is.
+    """
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                continue
+        weights[name] = q
+    wildcard = weights.get("*", 0.0)
+    best, best_q = None, 0.0
+    for name in available:
+        q = weights.get(name, wildcard)
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+def compression(enabled: bool = True, **levels: int):
+    """
+    Route dependency overriding response compression for that route.
+
+    `levels` sets the level per coding (gzip=1, br=11, zstd=19, ...);
+    codings not given keep the defaults. `enabled=False` sends the
+    route's responses uncompressed.
+
+        @router.get("/big", dependencies=[Depends(compression(gzip=1, br=2, zstd=1))])
+    """
+    async def set_levels(request: Request) -> None:
+        setattr(request.state, STATE_KEY, {**default_levels(), **levels} if enabled else None)
+    return set_levels
+
+class CompressionCache:
+    """
+    Compressed bodies of cacheable responses, least recently used first out.
+
+    Keyed by coding, level and a digest of the uncompressed body, so
+    entries are never stale: a changed body is a different key, and the
+    same body served to different users is compressed once.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, int, bytes], bytes]" = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(encoding: str, level: int, body: bytes) -> Tuple[str, int, bytes]:
+        return encoding, level, hashlib.blake2b(body, digest_size=16).digest()
+
+    def get(self, key: Tuple[str, int, bytes]) -> Optional[bytes]:
+        compressed = self._entries.get(key)
+        if compressed is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return compressed
+
+    def put(self, key: Tuple[str, int, bytes], compressed: bytes) -> None:
+        if len(compressed) > self.max_bytes or key in self._entries:
+            return
+        self._entries[key] = compressed
+        self._size += len(compressed)
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._size = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "bytes": self._size, "hits": self.hits, "misses": self.misses}
+
+compression_cache = CompressionCache(settings.COMPRESSION_CACHE_MAX_BYTES)
+
+class CompressionMiddleware:
+    """
+    Compresses response bodies with the best coding the client accepts.
+
+    Bodies under `minimum_size`, non-text content types, ranges and
+    responses that are already encoded go out untouched. Streamed bodies
+    are compressed chunk by chunk. Bodies of responses carrying an ETag
+    (up to `cache_max_entry_bytes`) are compressed once and then served
+    from `cache`. Routes can change their levels with `compression()`.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        levels: Optional[Dict[str, int]] = None,
+        cache: Optional[CompressionCache] = None,
+        cache_max_entry_bytes: int = 1024 * 1024,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = levels if levels is not None else default_levels()
+        self.cache = cache
+        self.cache_max_entry_bytes = cache_max_entry_bytes
+        self.encodings = available_encodings()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        encoding = negotiate(headers.get("accept-encoding", ""), list(self.encodings))
+        if encoding is None or "range" in headers:
+            await self.app(scope, receive, send)
+            return
+        scope.setdefault("state", {})
+        responder = _Responder(self, scope, send, self.encodings[encoding])
+        await self.app(scope, receive, responder.send)
+
+class _Responder:
+    def __init__(self, middleware: CompressionMiddleware, scope: Scope, send: Send, encoding: Encoding):
+        self.middleware = middleware
+        self.scope = scope
+        self.downstream = send
+        self.encoding = encoding
+        self.start: Optional[Message] = None
+        self.level: Optional[int] = None
+        self.chunks: List[bytes] = []
+        self.buffered = 0
+        self.stream = None
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if self.passthrough:
+            await self.downstream(message)
+        elif message["type"] == "http.response.start":
+            # Held until the body shows whether it is worth compressing
+            self.start = message
+        elif message["type"] != "http.response.body":
+            # e.g. http.response.pathsend: the server sends the file itself
+            await self._pass(message)
+        elif self.stream is not None:
+            await self._stream(message)
+        elif self.level is None and not self._eligible(message):
+            await self._pass(message)
+        else:
+            await self._body(message)
+
+    def _eligible(self, message: Message) -> bool:
+        headers = Headers(raw=self.start["headers"])
+        if self.start["status"] in (204, 206, 304) or "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        if not content_type.startswith(_COMPRESSIBLE_TYPES) or content_type.startswith(_EXCLUDED_TYPES):
+            return False
+        levels = self.scope["state"].get(STATE_KEY, self.middleware.levels)
+        if levels is None or self.encoding.name not in levels:
+            return False
+        size = headers.get("content-length")
+        if size is not None and size.isdigit():
+            large = int(size) >= self.middleware.minimum_size
+        else:
+            large = message.get("more_body", False) or len(message.get("body", b"")) >= self.middleware.minimum_size
+        if not large:
+            return False
+        self.level = levels[self.encoding.name]
+        return True
+
+    async def _pass(self, message: Message) -> None:
+        self.passthrough = True
+        await self.downstream(self.start)
+        await self.downstream(message)
+
+    async def _body(self, message: Message) -> None:
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        cacheable = self.middleware.cache is not None and "etag" in Headers(raw=self.start["headers"])
+        if not more_body and not self.chunks:
+            await self._send_whole(body, cacheable)
+            return
+        if cacheable and self.buffered + len(body) <= self.middleware.cache_max_entry_bytes:
+            # Collect the whole body so it can be cached
+            self.chunks.append(body)
+            self.buffered += len(body)
+            if not more_body:
+                await self._send_whole(b"".join(self.chunks), cacheable)
+            return
+        self.stream = self.encoding.stream(self.level)
+        await self.downstream(self._compressed_start(None))
+        buffered, self.chunks = b"".join(self.chunks), []
+        await self._stream({"body": buffered + body, "more_body": more_body})
+
+    async def _send_whole(self, body: bytes, cacheable: bool) -> None:
+        if len(body) < self.middleware.minimum_size:
+            await self._pass({"type": "http.response.body", "body": body, "more_body": False})
+            return
+        cache = self.middleware.cache if cacheable else None
+        key = cache.key(self.encoding.name, self.level, body) if cache is not None else None
+        compressed = cache.get(key) if cache is not None else None
+        if compressed is None:
+            if len(body) > _OFFLOAD_BYTES:
+                compressed = await anyio.to_thread.run_sync(self.encoding.compress, body, self.level)
+            else:
+                compressed = self.encoding.compress(body, self.level)
+            if cache is not None:
+                cache.put(key, compressed)
+        await self.downstream(self._compressed_start(len(compressed)))
+        await self.downstream({"type": "http.response.body", "body": compressed, "more_body": False})
+
+    async def _stream(self, message: Message) -> None:
+        body = self.stream.compress(message.get("body", b""))
+        more_body = message.get("more_body", False)
+        if not more_body:
+            body += self.stream.finish()
+        if body or not more_body:
+            await self.downstream({"type": "http.response.body", "body": body, "more_body": more_body})
+
+    def _compressed_start(self, length: Optional[int]) -> Message:
+        headers = MutableHeaders(raw=list(self.start["headers"]))
+        headers["content-encoding"] = self.encoding.name
+        headers.add_vary_header("Accept-Encoding")
+        # Byte ranges of the encoded body would not match the file's
+        if "accept-ranges" in headers:
+            del headers["accept-ranges"]
+        if length is None:
+            if "content-length" in headers:
+                del headers["content-length"]
+        else:
+            headers["content-length"] = str(length)
+        return {**self.start, "headers": headers.raw}
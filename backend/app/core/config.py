@@ -1,6 +1,6 @@
 import os
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional
 
 class Settings(BaseSettings):
     app_name: str = "FastAPI Backend"
@@ -18,7 +18,97 @@ class Settings(BaseSettings):
     host: str
     port: str
     dbname: str
+
+    # Size of SQLAlchemy's per-engine compiled statement cache
+    SQL_COMPILED_CACHE_SIZE: int = 500
+
+    # Slow query log (threshold of 0 disables it)
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0
+    SLOW_QUERY_LOG_SIZE: int = 200
+    SLOW_QUERY_EXPLAIN: bool = False
+    SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS: float = 30.0
+
+    # Users allowed on /internal (comma-separated user ids); nobody when empty
+    ADMIN_USER_IDS: str = ""
+
+    # Read replica settings (comma-separated SQLAlchemy URLs, empty to disable)
+    DATABASE_REPLICA_URLS: str = ""
+    REPLICA_STICKY_SECONDS: float = 5.0
+    REPLICA_MAX_LAG_SECONDS: float = 10.0
+    REPLICA_HEALTH_CHECK_SECONDS: float = 15.0
     
+    # Write-behind user activity tracking
+    ACTIVITY_FLUSH_SECONDS: float = 10.0
+
+    # Authentication audit log
+    AUDIT_LOG_QUEUE_SIZE: int = 10000
+    AUDIT_LOG_BATCH_SIZE: int = 500
+    AUDIT_LOG_FLUSH_SECONDS: float = 2.0
+    AUDIT_LOG_RETENTION_DAYS: int = 365
+
+    # On-demand request profiling (middleware is only installed when enabled)
+    PROFILING_ENABLED: bool = False
+    PROFILING_SAMPLE_EVERY: int = 0  # Profile 1 in N requests, 0 for header-triggered only
+    PROFILING_INTERVAL_MS: float = 5.0
+    PROFILING_OUTPUT_DIR: str = "profiles"
+
+    # Production server (python -m app.server)
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 0  # 0 sizes from the CPUs available
+    SERVER_HASHING_CPU_SHARE: float = 0.25  # CPUs left free for bcrypt, which hashes on threads outside the GIL
+    SERVER_BACKLOG: int = 2048
+    SERVER_KEEPALIVE_SECONDS: int = 5
+    SERVER_GRACEFUL_TIMEOUT_SECONDS: int = 30  # In-flight requests get this long to finish on SIGTERM
+
+    # Response compression (see app.core.compression); brotli and zstd are
+    # offered when the brotli / zstandard packages are installed
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # Smaller bodies go out uncompressed
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    COMPRESSION_CACHE_MAX_BYTES: int = 32 * 1024 * 1024  # Compressed bodies of ETagged responses
+    COMPRESSION_CACHE_MAX_ENTRY_BYTES: int = 1024 * 1024  # Larger ETagged bodies are streamed, not cached
+
+    # Group ledger: write a balance snapshot every this many events
+    LEDGER_SNAPSHOT_EVERY: int = 500
+
+    # Activity feed: groups up to this size are fanned out to members' feeds
+    # on write; larger ones are merged in at read time
+    FEED_FANOUT_MAX_MEMBERS: int = 50
+    FEED_RETENTION_DAYS: int = 90
+
+    # Batched API calls (see app.services.batch)
+    BATCH_MAX_REQUESTS: int = 20
+    BATCH_READ_CONCURRENCY: int = 4
+    BATCH_SUBREQUEST_TIMEOUT_SECONDS: float = 30.0  # Reads only: a write always runs to completion
+
+    # Delta sync (see app.services.sync)
+    SYNC_PAGE_SIZE: int = 500
+    SYNC_TOMBSTONE_RETENTION_DAYS: int = 180
+
+    # Recurring expenses (see app.services.recurring)
+    RECURRING_SCHEDULER_ENABLED: bool = True
+    RECURRING_TICK_SECONDS: float = 30.0
+    RECURRING_HORIZON_SECONDS: float = 300.0  # How far ahead the scheduler loads due templates
+    RECURRING_BATCH_SIZE: int = 100  # Templates posted per tick
+    RECURRING_MAX_CATCHUP: int = 60  # Missed occurrences of one template posted per transaction
+
+    # Group statement exports (see app.services.export)
+    EXPORT_CACHE_DIR: str = "exports"
+    EXPORT_CHUNK_ROWS: int = 1000
+    EXPORT_PDF_WORKERS: int = 2
+
+    # Group event stream (see app.services.event_broker)
+    EVENT_BROKER_CLASS: str = "app.services.event_broker.InProcessBroker"
+    EVENT_STREAM_QUEUE_SIZE: int = 100
+    EVENT_STREAM_HEARTBEAT_SECONDS: float = 15.0
+
+    # Exchange rates (see app.services.currency)
+    FX_BASE_CURRENCY: str = "EUR"
+    FX_RATE_CACHE_DAYS: int = 366
+
     # Firebase Settings
     FIREBASE_PROJECT_ID: str
     FIREBASE_CLIENT_EMAIL: str
@@ -34,6 +124,14 @@ class Settings(BaseSettings):
     def DATABASE_URL(self) -> str:
         return f"postgresql://{self.user}:{self.password}@{self.host}:{self.port}/{self.dbname}"
 
+    @property
+    def admin_user_ids(self) -> List[int]:
+        return [int(user_id) for user_id in self.ADMIN_USER_IDS.split(",") if user_id.strip()]
+
+    @property
+    def replica_urls(self) -> List[str]:
+        return [url.strip() for url in self.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+
     model_config = {
         "env_file": ".env",
         "env_file_encoding": "utf-8",
@@ -0,0 +1,36 @@
+from typing import Optional
+from fastapi import Response, status
+
+
+def resource_etag(kind: str, resource_id: int, row_version: int) -> str:
+    """Build a weak ETag for a versioned resource"""
+    return f'W/"{kind}-{resource_id}-v{row_version}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    def opaque(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    target = opaque(etag)
+    return any(opaque(candidate) == target for candidate in if_none_match.split(","))
+
+
+def set_cache_headers(response: Response, etag: str) -> None:
+    """Attach validator headers so clients revalidate instead of refetching"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    response.headers["Vary"] = "Authorization"
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response carrying the current validator"""
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_cache_headers(response, etag)
+    return response
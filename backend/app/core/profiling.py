@@ -0,0 +1,147 @@
+import itertools
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from jose import JWTError, jwt
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile-token"
+PROFILE_TOKEN_SCOPE = "profile"
+
+# Innermost frames that mean a thread is parked rather than doing work
+IDLE_FUNCTIONS = {"wait", "select", "poll", "get", "_wait_for_tstate_lock", "_worker", "accept"}
+IDLE_MODULES = ("threading.py", "selectors.py", "queue.py", "thread.py", "socket.py")
+
+def create_profile_token(expires_minutes: int = 15) -> str:
+    """Admin-issued token that turns on profiling for requests carrying it"""
+    expire = datetime.now(timezone.utc) + timedelta(minutes=expires_minutes)
+    return jwt.encode(
+        {"scope": PROFILE_TOKEN_SCOPE, "exp": expire},
+        settings.SECRET_KEY,
+        algorithm=settings.ALGORITHM,
+    )
+
+def is_valid_profile_token(token: str) -> bool:
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return False
+    return payload.get("scope") == PROFILE_TOKEN_SCOPE
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}:{code.co_name}:{code.co_firstlineno}"
+
+class SamplingProfiler:
+    """
+    Samples the stacks of all busy threads at a fixed interval.
+
+    Sync endpoints and dependencies run on arbitrary threadpool workers, so
+    every non-idle thread is sampled; concurrent requests may show up in the
+    profile as well. Stacks are aggregated in collapsed form
+    (`outer;inner;leaf count`), readable by speedscope and flamegraph.pl.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stopped.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or self._is_idle(frame):
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(labels))] += 1
+            self.samples += 1
+
+    @staticmethod
+    def _is_idle(frame) -> bool:
+        code = frame.f_code
+        return code.co_name in IDLE_FUNCTIONS and code.co_filename.endswith(IDLE_MODULES)
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+class ProfilingMiddleware:
+    """
+    Profiles individual requests on demand.
+
+    A request is profiled when it carries a valid X-Profile-Token header
+    (see create_profile_token) or, if `sample_every` is set, for one in
+    every `sample_every` requests. Other requests pass straight through.
+    Results are written to `output_dir` as collapsed stacks, named after
+    the route and the request's wall time.
+    """
+
+    def __init__(self, app, output_dir: str, interval_ms: float = 5.0, sample_every: int = 0):
+        self.app = app
+        self.output_dir = output_dir
+        self.interval = interval_ms / 1000
+        self.sample_every = sample_every
+        self._counter = itertools.count(1)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profiler = SamplingProfiler(self.interval)
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.stop()
+            self._write(scope, profiler, (time.perf_counter() - started) * 1000)
+
+    def _should_profile(self, scope) -> bool:
+        if self.sample_every and next(self._counter) % self.sample_every == 0:
+            return True
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                return is_valid_profile_token(value.decode("latin-1"))
+        return False
+
+    def _write(self, scope, profiler: SamplingProfiler, elapsed_ms: float) -> Optional[str]:
+        # The router stores the matched route in the scope, e.g. /api/users/{user_id}
+        route_path = getattr(scope.get("route"), "path", scope["path"])
+        route = re.sub(r"[^A-Za-z0-9_.-]+", "_", route_path).strip("_") or "root"
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        file_name = f"{stamp}-{scope['method']}-{route}-{elapsed_ms:.0f}ms.collapsed"
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            with open(os.path.join(self.output_dir, file_name), "w") as f:
+                f.write(profiler.collapsed())
+        except OSError:
+            logger.exception(f"Failed to write profile {file_name}")
+            return None
+        logger.info(f"Profiled {scope['method']} {route_path} in {elapsed_ms:.1f}ms ({profiler.samples} samples) -> {file_name}")
+        return file_name
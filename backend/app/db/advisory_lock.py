@@ -0,0 +1,68 @@
+import logging
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+
+logger = logging.getLogger(__name__)
+
+class AdvisoryLeaderLock:
+    """
+    Leadership among worker processes via a PostgreSQL advisory lock.
+
+    The session-level lock is held on a dedicated connection for as long
+    as this process leads; if that connection drops, PostgreSQL releases
+    the lock and another worker takes over on its next `acquire`. Other
+    databases have no cross-process lock, so there every caller leads.
+    """
+
+    def __init__(self, engine: Engine, key: int):
+        self.engine = engine
+        self.key = key
+        self._conn: Optional[Connection] = None
+
+    @property
+    def held(self) -> bool:
+        return self._conn is not None
+
+    def acquire(self) -> bool:
+        """Try to become (or confirm still being) the leader; never blocks"""
+        if self.engine.dialect.name != "postgresql":
+            return True
+        if self._conn is not None:
+            try:
+                self._conn.exec_driver_sql("SELECT 1")
+                self._conn.commit()
+                return True
+            except DBAPIError:
+                logger.warning(f"Lost advisory lock {self.key}: connection failed")
+                self._conn.invalidate()
+                self._conn = None
+
+        conn = self.engine.connect()
+        try:
+            acquired = conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}).scalar()
+            conn.commit()
+        except DBAPIError:
+            conn.close()
+            logger.exception(f"Failed to request advisory lock {self.key}")
+            return False
+        if not acquired:
+            conn.close()
+            return False
+        logger.info(f"Acquired advisory lock {self.key}")
+        self._conn = conn
+        return True
+
+    def release(self) -> None:
+        if self._conn is None:
+            return
+        try:
+            self._conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.key})
+            self._conn.commit()
+            self._conn.close()
+        except DBAPIError:
+            # Dropping the session releases the lock just the same
+            self._conn.invalidate()
+        self._conn = None
@@ -0,0 +1,150 @@
+"""
+Change sequence numbers for delta sync (see app.services.sync).
+
+Every insert or update of a synced column stamps the row's `change_seq`;
+deletes leave a row in `sync_tombstones` stamped the same way. The
+stamping is done by triggers, so it costs no extra round trip and covers
+Core statements as well as the ORM.
+
+On PostgreSQL the number is the writing transaction's id (plus a fixed
+offset keeping it above the numbers handed out before), so writers share
+no lock. Numbers are not taken in commit order; sync only serves up to
+`stable_change_seq()`, the number below every transaction still in
+progress.
+
+SQLite, used by the tests, has one writer at a time: there each change
+takes the next value of the single `change_counter` row.
+
+`metadata.create_all` installs the triggers when they are missing; on
+PostgreSQL databases created by an older version, migration a9c4e7d2b518
+does the same.
+"""
+from typing import Dict, List, Tuple
+
+from sqlalchemy import MetaData, event
+from sqlalchemy.engine import Connection
+
+# table -> columns whose changes are synced (anything else, like activity
+# timestamps or ledger versions, does not advance the row)
+SYNCED_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "users": (
+        "username", "email", "phone_number", "full_name", "avatar_url",
+        "is_active", "is_verified", "profile_completed", "auth_providers",
+    ),
+    "groups": ("name", "currency"),
+    "group_members": ("role",),
+    "expenses": (
+        "paid_by", "description", "category", "amount_minor", "currency",
+        "original_amount_minor", "original_currency", "fx_rate",
+    ),
+    "settlements": ("from_user_id", "to_user_id", "amount_minor", "currency"),
+}
+
+# table -> entity name of its tombstones; all of these rows have a group_id
+TOMBSTONED: Dict[str, str] = {
+    "group_members": "group_member",
+    "expenses": "expense",
+    "settlements": "settlement",
+}
+
+SEED_COUNTER = "INSERT INTO change_counter (id, value, tombstones_pruned_through) VALUES (1, 0, 0) ON CONFLICT DO NOTHING"
+
+# Numbers handed out before stay below the transaction ids plus this
+# offset; kept as it is once the functions exist
+POSTGRESQL_OFFSET = "SELECT greatest(0, value + 1 - pg_current_xact_id()::text::bigint) FROM change_counter WHERE id = 1"
+POSTGRESQL_INSTALLED = "SELECT to_regprocedure('stable_change_seq()') IS NOT NULL"
+
+def postgresql_triggers(offset: int) -> List[str]:
+    statements = [
+        f"""CREATE OR REPLACE FUNCTION current_change_seq() RETURNS bigint AS $$
+    SELECT pg_current_xact_id()::text::bigint + {offset}
+$$ LANGUAGE sql VOLATILE""",
+        # Every transaction with a lower id has committed or rolled back
+        f"""CREATE OR REPLACE FUNCTION stable_change_seq() RETURNS bigint AS $$
+    SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint + {offset} - 1
+$$ LANGUAGE sql STABLE""",
+        """CREATE OR REPLACE FUNCTION stamp_change_seq() RETURNS trigger AS $$
+BEGIN
+    NEW.change_seq := current_change_seq();
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql""",
+        """CREATE OR REPLACE FUNCTION record_sync_tombstone() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO sync_tombstones (entity, entity_id, group_id, change_seq)
+    VALUES (TG_ARGV[0], OLD.id, OLD.group_id, current_change_seq());
+    RETURN OLD;
+END
+$$ LANGUAGE plpgsql""",
+        # Shares are part of their expense's payload
+        """CREATE OR REPLACE FUNCTION touch_share_expense() RETURNS trigger AS $$
+BEGIN
+    UPDATE expenses SET change_seq = current_change_seq() WHERE id = OLD.expense_id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql""",
+    ]
+    for table, columns in SYNCED_COLUMNS.items():
+        statements.append(
+            f"CREATE OR REPLACE TRIGGER {table}_change_seq BEFORE INSERT OR UPDATE OF {', '.join(columns)} "
+            f"ON {table} FOR EACH ROW EXECUTE FUNCTION stamp_change_seq()"
+        )
+    for table, entity in TOMBSTONED.items():
+        statements.append(
+            f"CREATE OR REPLACE TRIGGER {table}_tombstone AFTER DELETE "
+            f"ON {table} FOR EACH ROW EXECUTE FUNCTION record_sync_tombstone('{entity}')"
+        )
+    statements.append(
+        "CREATE OR REPLACE TRIGGER expense_shares_change_seq AFTER UPDATE OR DELETE "
+        "ON expense_shares FOR EACH ROW EXECUTE FUNCTION touch_share_expense()"
+    )
+    return statements
+
+_SQLITE_NEXT = "UPDATE change_counter SET value = value + 1 WHERE id = 1;"
+_SQLITE_CURRENT = "(SELECT value FROM change_counter WHERE id = 1)"
+
+def sqlite_triggers() -> List[str]:
+    # SQLite triggers cannot assign NEW, so the row is stamped right after the write
+    statements = []
+    for table, columns in SYNCED_COLUMNS.items():
+        for name, timing in (("insert", "AFTER INSERT"), ("update", f"AFTER UPDATE OF {', '.join(columns)}")):
+            statements.append(
+                f"CREATE TRIGGER IF NOT EXISTS {table}_change_seq_{name} {timing} ON {table} BEGIN "
+                f"{_SQLITE_NEXT} UPDATE {table} SET change_seq = {_SQLITE_CURRENT} WHERE id = NEW.id; END"
+            )
+    for table, entity in TOMBSTONED.items():
+        statements.append(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_tombstone AFTER DELETE ON {table} BEGIN {_SQLITE_NEXT} "
+            f"INSERT INTO sync_tombstones (entity, entity_id, group_id, change_seq) "
+            f"VALUES ('{entity}', OLD.id, OLD.group_id, {_SQLITE_CURRENT}); END"
+        )
+    for name, timing in (("update", "AFTER UPDATE"), ("delete", "AFTER DELETE")):
+        statements.append(
+            f"CREATE TRIGGER IF NOT EXISTS expense_shares_change_seq_{name} {timing} ON expense_shares BEGIN "
+            f"{_SQLITE_NEXT} UPDATE expenses SET change_seq = {_SQLITE_CURRENT} WHERE id = OLD.expense_id; END"
+        )
+    return statements
+
+def install_change_tracking(target: MetaData, connection: Connection, **kw) -> None:
+    """
+    Create the counter row and triggers; runs after `metadata.create_all`.
+
+    Idempotent. On PostgreSQL an installed stable_change_seq() means the
+    DDL is in place, so later starts only pay for that one lookup.
+    """
+    dialect = connection.dialect.name
+    if dialect not in ("postgresql", "sqlite"):
+        return
+    connection.exec_driver_sql(SEED_COUNTER)
+    if dialect == "sqlite":
+        statements = sqlite_triggers()
+    elif connection.exec_driver_sql(POSTGRESQL_INSTALLED).scalar():
+        return
+    else:
+        statements = postgresql_triggers(connection.exec_driver_sql(POSTGRESQL_OFFSET).scalar())
+    for statement in statements:
+        connection.exec_driver_sql(statement)
+
+def register(metadata: MetaData) -> None:
+    if not event.contains(metadata, "after_create", install_change_tracking):
+        event.listen(metadata, "after_create", install_change_tracking)
@@ -0,0 +1,125 @@
+import logging
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+def param_shape(parameters: Any, executemany: bool = False) -> Any:
+    """Describe bound parameters by type only, so no user data ends up in the log"""
+    if executemany and isinstance(parameters, (list, tuple)) and parameters:
+        return {"rows": len(parameters), "row": param_shape(parameters[0])}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+def calling_function() -> Optional[str]:
+    """Innermost application function outside app.db that issued the query"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("app.") and not module.startswith("app.db"):
+            return f"{module}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+class SlowQueryLog:
+    """
+    Records statements slower than a threshold in a bounded ring buffer.
+
+    Each entry carries the SQL, elapsed time, bound-parameter shape and the
+    service function that issued it. On PostgreSQL, slow SELECTs can also
+    capture an `EXPLAIN (ANALYZE off)` plan, at most once per
+    `explain_interval` seconds so a burst of slow queries cannot pile
+    extra load on the database.
+    """
+
+    def __init__(self, threshold_ms: float, buffer_size: int = 200,
+                 explain: bool = False, explain_interval: float = 30.0):
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self.explain_interval = explain_interval
+        self.entries: Deque[Dict[str, Any]] = deque(maxlen=buffer_size)
+        self._last_explain = 0.0
+        self._explain_lock = threading.Lock()
+
+    def install(self, engine: Engine) -> None:
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(engine, "handle_error", self._handle_error)
+
+    def uninstall(self, engine: Engine) -> None:
+        event.remove(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.remove(engine, "after_cursor_execute", self._after_cursor_execute)
+        event.remove(engine, "handle_error", self._handle_error)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_times", []).append(time.perf_counter())
+
+    def _handle_error(self, exception_context):
+        # A failed statement never reaches after_cursor_execute; drop its start time
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start_times"):
+            conn.info["query_start_times"].pop()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_start_times"].pop()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms < self.threshold_ms:
+            return
+
+        entry = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "elapsed_ms": round(elapsed_ms, 3),
+            "statement": statement,
+            "params": param_shape(parameters, executemany),
+            "caller": calling_function(),
+            "plan": None,
+        }
+        if self._should_explain(conn, statement, executemany):
+            entry["plan"] = self._explain(cursor, statement, parameters)
+        self.entries.append(entry)
+        logger.warning(f"Slow query ({elapsed_ms:.1f}ms) from {entry['caller']}: {statement}")
+
+    def _should_explain(self, conn, statement: str, executemany: bool) -> bool:
+        if not self.explain or executemany or conn.dialect.name != "postgresql":
+            return False
+        if not statement.lstrip().upper().startswith("SELECT"):
+            return False
+        with self._explain_lock:
+            now = time.monotonic()
+            if now - self._last_explain < self.explain_interval:
+                return False
+            self._last_explain = now
+            return True
+
+    def _explain(self, cursor, statement: str, parameters) -> Optional[str]:
+        # Runs on the request's own connection and transaction: a failing
+        # EXPLAIN would abort it, so it is confined to a savepoint
+        explain_cursor = cursor.connection.cursor()
+        try:
+            explain_cursor.execute("SAVEPOINT slow_query_explain")
+            try:
+                explain_cursor.execute(f"EXPLAIN (ANALYZE off) {statement}", parameters)
+                plan = "\n".join(row[0] for row in explain_cursor.fetchall())
+            except Exception as e:
+                explain_cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+                return f"EXPLAIN failed: {str(e)}"
+            explain_cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+            return plan
+        except Exception as e:
+            return f"EXPLAIN failed: {str(e)}"
+        finally:
+            explain_cursor.close()
+
+    def recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Newest entries first"""
+        return list(reversed(self.entries))[:limit]
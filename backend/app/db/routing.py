@@ -0,0 +1,165 @@
+import hashlib
+import hmac
+import logging
+import random
+import threading
+import time
+from typing import Callable, List, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Replication lag in seconds; a replica that has replayed everything it received reports 0
+POSTGRES_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+def measure_replica_lag(engine: Engine) -> float:
+    """Return the replication lag of a replica in seconds"""
+    if engine.dialect.name != "postgresql":
+        # Non-replicating stand-ins (e.g. a second SQLite file in tests) are never behind
+        return 0.0
+    with engine.connect() as conn:
+        return float(conn.execute(POSTGRES_LAG_QUERY).scalar() or 0.0)
+
+class ReplicaPool:
+    """Set of read replicas with lazy, lag-aware health checks"""
+
+    def __init__(
+        self,
+        engines: List[Engine],
+        max_lag_seconds: float,
+        check_interval_seconds: float,
+        lag_probe: Callable[[Engine], float] = measure_replica_lag,
+    ):
+        self.engines = engines
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self.lag_probe = lag_probe
+        self._healthy: List[Engine] = list(engines)
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def check_health(self) -> List[Engine]:
+        """Probe every replica and keep only those within the lag budget"""
+        healthy = []
+        for replica in self.engines:
+            try:
+                lag = self.lag_probe(replica)
+            except Exception as e:
+                logger.warning(f"Replica {replica.url.host} failed health check: {str(e)}")
+                continue
+            if lag > self.max_lag_seconds:
+                logger.warning(f"Replica {replica.url.host} is {lag:.1f}s behind, removing from rotation")
+                continue
+            healthy.append(replica)
+        self._healthy = healthy
+        self._checked_at = time.monotonic()
+        return healthy
+
+    def healthy(self) -> List[Engine]:
+        if time.monotonic() - self._checked_at >= self.check_interval_seconds:
+            # Only one caller re-checks; everyone else uses the last known state
+            if self._lock.acquire(blocking=False):
+                try:
+                    self.check_health()
+                finally:
+                    self._lock.release()
+        return self._healthy
+
+    def choose(self) -> Optional[Engine]:
+        healthy = self.healthy()
+        return random.choice(healthy) if healthy else None
+
+class StickyWrites:
+    """
+    Signed cookie telling later requests that their client wrote recently.
+
+    The cookie holds the writer's user id and the time of the write, so
+    stickiness follows the client across tokens (the reads right after
+    login use a new one) and across server workers, with nothing kept in
+    process. A write made before signing in (registration, login) carries
+    user id 0 and holds for whichever user the client then signs in as.
+    """
+
+    COOKIE = "recent_write"
+
+    def __init__(self, window_seconds: float, secret: str):
+        self.window_seconds = window_seconds
+        self._secret = secret.encode()
+
+    def _sign(self, user_id: int, written_at: int) -> str:
+        message = f"{self.COOKIE}.{user_id}.{written_at}".encode()
+        return hmac.new(self._secret, message, hashlib.sha256).hexdigest()[:32]
+
+    def cookie(self, user_id: Optional[int], now: Optional[float] = None) -> str:
+        written_at = int(now if now is not None else time.time())
+        return f"{user_id or 0}.{written_at}.{self._sign(user_id or 0, written_at)}"
+
+    def is_sticky(self, cookie: Optional[str], user_id: Optional[int], now: Optional[float] = None) -> bool:
+        if not cookie:
+            return False
+        try:
+            writer, written_at, signature = cookie.split(".")
+            writer, written_at = int(writer), int(written_at)
+        except ValueError:
+            return False
+        if not hmac.compare_digest(signature, self._sign(writer, written_at)):
+            return False
+        if writer and writer != user_id:
+            return False
+        now = now if now is not None else time.time()
+        return now - written_at < self.window_seconds
+
+class RoutingSession(Session):
+    """
+    Session that sends reads to a replica when marked read-only.
+
+    A session is routed to a replica only when `info["read_only"]` is set,
+    nothing has been written in it, and its client has not written within
+    the sticky window (`info["sticky"]`). Everything else goes to the
+    primary bind. After a write commits, the StickyWrites cookie is set on
+    `info["response"]` for the `info["user_id"]` making it.
+    """
+
+    def __init__(self, *args, replicas: Optional[ReplicaPool] = None,
+                 sticky_writes: Optional[StickyWrites] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+        self.sticky_writes = sticky_writes
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.replicas is not None and self._use_replica():
+            # Pin one replica per session so all reads see the same snapshot
+            replica = self.info.get("replica") or self.replicas.choose()
+            if replica is not None:
+                self.info["replica"] = replica
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+    def _use_replica(self) -> bool:
+        if self._flushing or not self.info.get("read_only") or self.info.get("wrote"):
+            return False
+        return not self.info.get("sticky")
+
+@event.listens_for(RoutingSession, "after_flush")
+def _flag_flush_write(session, flush_context):
+    session.info["wrote"] = True
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _flag_statement_write(orm_execute_state):
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["wrote"] = True
+
+@event.listens_for(RoutingSession, "after_commit")
+def _remember_write(session):
+    response = session.info.get("response")
+    if session.info.get("wrote") and session.sticky_writes is not None and response is not None:
+        response.set_cookie(
+            StickyWrites.COOKIE, session.sticky_writes.cookie(session.info.get("user_id")),
+            max_age=int(session.sticky_writes.window_seconds) + 1, httponly=True, samesite="lax",
+        )
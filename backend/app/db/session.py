@@ -1,13 +1,76 @@
+from typing import Dict
+from fastapi import Depends, Request, Response
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, Session
 from app.core.config import settings
+from app.core.security import token_user_id
+from app.db.query_log import SlowQueryLog
+from app.db.routing import ReplicaPool, RoutingSession, StickyWrites
 
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+engine = create_engine(settings.DATABASE_URL, query_cache_size=settings.SQL_COMPILED_CACHE_SIZE)
 
-def get_db() -> Session:
+# Optional read replicas; without them every session uses the primary engine
+replica_pool = None
+if settings.replica_urls:
+    replica_pool = ReplicaPool(
+        [create_engine(url, query_cache_size=settings.SQL_COMPILED_CACHE_SIZE) for url in settings.replica_urls],
+        max_lag_seconds=settings.REPLICA_MAX_LAG_SECONDS,
+        check_interval_seconds=settings.REPLICA_HEALTH_CHECK_SECONDS,
+    )
+sticky_writes = StickyWrites(settings.REPLICA_STICKY_SECONDS, settings.SECRET_KEY)
+
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+    buffer_size=settings.SLOW_QUERY_LOG_SIZE,
+    explain=settings.SLOW_QUERY_EXPLAIN,
+    explain_interval=settings.SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS,
+)
+if settings.SLOW_QUERY_THRESHOLD_MS > 0:
+    slow_query_log.install(engine)
+    for replica in replica_pool.engines if replica_pool else []:
+        slow_query_log.install(replica)
+
+# expire_on_commit=False keeps committed instances loaded, so serializing
+# the result of a write does not trigger another SELECT
+SessionLocal = sessionmaker(
+    class_=RoutingSession,
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+    bind=engine,
+    replicas=replica_pool,
+    sticky_writes=sticky_writes,
+)
+
+def compiled_cache_stats(bind: Engine) -> Dict[str, int]:
+    """Occupancy of an engine's compiled statement cache"""
+    cache = bind._compiled_cache
+    if cache is None:
+        return {"size": 0, "capacity": 0}
+    return {"size": len(cache), "capacity": cache.capacity}
+
+def get_db(request: Request, response: Response) -> Session:
+    shared = getattr(request.state, "batch_db", None)
+    if shared is not None:
+        # A /batch sub-request running on the batch's session; the batch closes it
+        shared.info.pop("read_only", None)
+        yield shared
+        return
     db = SessionLocal()
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    user_id = token_user_id(token) if scheme.lower() == "bearer" else None
+    db.info.update(
+        user_id=user_id,
+        sticky=sticky_writes.is_sticky(request.cookies.get(StickyWrites.COOKIE), user_id),
+        response=response,
+    )
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def get_read_db(db: Session = Depends(get_db)) -> Session:
+    """Request session that may be served by a read replica"""
+    db.info["read_only"] = True
+    return db
@@ -0,0 +1,38 @@
+from typing import Any, Dict, List, Optional, Type
+
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+def dialect_insert(db: Session, model: Type[Any]):
+    """INSERT construct for the session's backend, exposing ON CONFLICT clauses"""
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+def insert_returning(db: Session, model: Type[Any], values: Dict[str, Any]) -> Any:
+    """
+    Insert a row and load it from `INSERT ... RETURNING` in one round trip.
+
+    Unlike `db.add()` + flush, every column (including server defaults and
+    columns left NULL) comes back with the insert, so nothing is lazily
+    re-selected when the instance is serialized.
+    """
+    return db.scalars(insert(model).values(**values).returning(model)).one()
+
+def insert_if_absent(
+    db: Session, model: Type[Any], values: Dict[str, Any], index_elements: Optional[List[str]] = None
+) -> Optional[Any]:
+    """
+    Insert a row unless it collides with an existing one.
+
+    Runs a single `INSERT ... ON CONFLICT DO NOTHING RETURNING` and returns
+    the new ORM instance, or None when a conflicting row already exists.
+    Concurrent callers never fail: the loser simply gets None. With
+    `index_elements` only a conflict on that unique index is absorbed;
+    any other unique violation still raises IntegrityError.
+    """
+    stmt = dialect_insert(db, model).values(**values).on_conflict_do_nothing(
+        index_elements=index_elements
+    ).returning(model)
+    return db.scalars(stmt).first()
@@ -1,14 +1,34 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.endpoints.router import router as api_router
+from app.core.compression import CompressionMiddleware, compression_cache
 from app.core.config import settings
+from app.core.profiling import ProfilingMiddleware
 from app.db.base import Base
 from app.db.session import engine
+from app.services.activity_tracker import activity_buffer
+from app.services.audit_log import audit_log
+from app.services.export import export_renderer
+from app.services.recurring import recurring_scheduler
 
 # Create all tables in the database
 Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title=settings.app_name)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    activity_buffer.start()
+    audit_log.start()
+    if settings.RECURRING_SCHEDULER_ENABLED:
+        recurring_scheduler.start()
+    yield
+    recurring_scheduler.stop()
+    export_renderer.stop()
+    # Flush buffered writes before the process exits
+    activity_buffer.stop()
+    audit_log.stop()
+
+app = FastAPI(title=settings.app_name, lifespan=lifespan)
 
 # Configure CORS with credentials support
 app.add_middleware(
@@ -19,6 +39,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        cache=compression_cache,
+        cache_max_entry_bytes=settings.COMPRESSION_CACHE_MAX_ENTRY_BYTES,
+    )
+
+if settings.PROFILING_ENABLED:
+    app.add_middleware(
+        ProfilingMiddleware,
+        output_dir=settings.PROFILING_OUTPUT_DIR,
+        interval_ms=settings.PROFILING_INTERVAL_MS,
+        sample_every=settings.PROFILING_SAMPLE_EVERY,
+    )
+
 app.include_router(api_router, prefix="/api")
 
 @app.get("/")
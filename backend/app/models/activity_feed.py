@@ -0,0 +1,18 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer
+from app.db.base import Base
+
+class ActivityFeedItem(Base):
+    """
+    A group ledger event fanned out to one member's activity feed.
+
+    Only small groups are fanned out on write (see
+    app.services.activity_feed); the row just points at the ledger event.
+    The primary key is ordered the way the feed is read, newest first per
+    user, so a page is a single index range scan.
+    """
+    __tablename__ = 'activity_feed'
+
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    occurred_at = Column(DateTime(timezone=True), primary_key=True)
+    group_id = Column(Integer, ForeignKey('groups.id', ondelete='CASCADE'), primary_key=True)
+    seq = Column(Integer, primary_key=True)
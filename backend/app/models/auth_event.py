@@ -0,0 +1,25 @@
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, JSON, String
+from app.db.base import Base
+
+class AuthEvent(Base):
+    """Append-only record of authentication and account events"""
+    __tablename__ = 'auth_events'
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    occurred_at = Column(DateTime(timezone=True), nullable=False)
+
+    # login, login_failed, register, link, unlink, profile_update
+    event_type = Column(String, nullable=False)
+
+    # No foreign key: events must outlive the users they describe
+    user_id = Column(Integer, nullable=True)
+    provider = Column(String, nullable=True)
+    identifier = Column(String, nullable=True)  # Login name attempted, for failed logins
+    ip_address = Column(String, nullable=True)
+    details = Column(JSON, nullable=True)
+
+    __table_args__ = (
+        # Rows arrive in time order, so a BRIN index keeps range scans and retention cheap
+        Index('ix_auth_events_occurred_at', 'occurred_at', postgresql_using='brin'),
+        Index('ix_auth_events_user_id_occurred_at', 'user_id', 'occurred_at'),
+    )
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Date, Numeric, String
+from app.db.base import Base
+
+class ExchangeRate(Base):
+    """
+    Daily reference rates, quoted against settings.FX_BASE_CURRENCY.
+
+    Loaded from files or admin uploads (app.services.currency), never from a
+    live service at request time.
+    """
+    __tablename__ = 'exchange_rates'
+
+    rate_date = Column(Date, primary_key=True)
+    currency = Column(String(3), primary_key=True)
+    # Units of `currency` per one unit of the base currency
+    rate = Column(Numeric(24, 10), nullable=False)
@@ -0,0 +1,68 @@
+from sqlalchemy import BigInteger, Column, Date, DateTime, ForeignKey, Index, Integer, Numeric, String, UniqueConstraint
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.db.base import Base
+from app.models.recurring_expense import RecurringExpense  # noqa: F401  (target of expenses.recurring_id)
+
+class Expense(Base):
+    """A payment made by one member on behalf of the group"""
+    __tablename__ = 'expenses'
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    group_id = Column(Integer, ForeignKey('groups.id', ondelete='CASCADE'), nullable=False)
+    paid_by = Column(Integer, ForeignKey('users.id'), nullable=False)
+    created_by = Column(Integer, ForeignKey('users.id'), nullable=False)
+    description = Column(String, nullable=False)
+    category = Column(String(32), nullable=False, default="other", server_default="other")
+
+    # Integer minor units (cents), never floats, always in the group currency
+    amount_minor = Column(BigInteger, nullable=False)
+    currency = Column(String(3), nullable=False)
+
+    # Set when paid in another currency: the amount as paid and the rate used
+    # (group currency per unit), so balances never need a rate lookup again
+    original_amount_minor = Column(BigInteger, nullable=True)
+    original_currency = Column(String(3), nullable=True)
+    fx_rate = Column(Numeric(24, 12), nullable=True)
+
+    # Set for expenses posted by a recurring template: which occurrence this is
+    recurring_id = Column(Integer, ForeignKey('recurring_expenses.id', ondelete='SET NULL'), nullable=True)
+    occurrence_on = Column(Date, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # Stamped by the database on changes to the expense or its shares (app.db.change_tracking)
+    change_seq = Column(BigInteger, nullable=False, server_default="0")
+
+    # Shares are always needed with their expense; load them in one extra query per page
+    shares = relationship(
+        "ExpenseShare", lazy="selectin", cascade="all, delete-orphan", passive_deletes=True,
+        order_by="ExpenseShare.user_id"
+    )
+
+    __table_args__ = (
+        Index('ix_expenses_group_id_created_at', 'group_id', 'created_at'),
+        Index('ix_expenses_group_id_paid_by', 'group_id', 'paid_by'),
+        Index('ix_expenses_group_id_change_seq', 'group_id', 'change_seq'),
+        # Backstop for the scheduler: an occurrence can only ever be posted once
+        UniqueConstraint('recurring_id', 'occurrence_on', name='uq_expenses_recurring_id_occurrence_on'),
+    )
+    __mapper_args__ = {"eager_defaults": True}
+
+class ExpenseShare(Base):
+    """The part of an expense owed by one member"""
+    __tablename__ = 'expense_shares'
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    expense_id = Column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        ForeignKey('expenses.id', ondelete='CASCADE'), nullable=False
+    )
+    # Denormalized from the expense so balances aggregate without a join
+    group_id = Column(Integer, ForeignKey('groups.id', ondelete='CASCADE'), nullable=False)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    amount_minor = Column(BigInteger, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('expense_id', 'user_id', name='uq_expense_shares_expense_id_user_id'),
+        Index('ix_expense_shares_group_id_user_id', 'group_id', 'user_id'),
+    )
@@ -0,0 +1,44 @@
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Index, Integer, String, UniqueConstraint
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+class Group(Base):
+    """A set of users sharing expenses in a single currency"""
+    __tablename__ = 'groups'
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    currency = Column(String(3), nullable=False, default="USD", server_default="USD")  # ISO 4217
+    created_by = Column(Integer, ForeignKey('users.id'), nullable=False)
+
+    # Sequence number of the latest ledger event; bumping it locks the group for writers
+    ledger_version = Column(Integer, nullable=False, default=0, server_default="0")
+    # Set once the group outgrows FEED_FANOUT_MAX_MEMBERS: ledger events from
+    # this seq on are merged into members' feeds at read time, not fanned out
+    feed_pull_from_seq = Column(Integer, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Stamped by the database when a synced column changes (app.db.change_tracking)
+    change_seq = Column(BigInteger, nullable=False, index=True, server_default="0")
+
+    # Server defaults come back with the INSERT instead of a later SELECT
+    __mapper_args__ = {"eager_defaults": True}
+
+class GroupMember(Base):
+    __tablename__ = 'group_members'
+
+    id = Column(Integer, primary_key=True)
+    group_id = Column(Integer, ForeignKey('groups.id', ondelete='CASCADE'), nullable=False)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False, index=True)  # "my groups"
+    role = Column(String, nullable=False, default="member", server_default="member")  # owner, member
+    joined_at = Column(DateTime(timezone=True), server_default=func.now())
+    change_seq = Column(BigInteger, nullable=False, server_default="0")
+
+    __table_args__ = (
+        # Also serves membership checks and member listing by group
+        UniqueConstraint('group_id', 'user_id', name='uq_group_members_group_id_user_id'),
+        Index('ix_group_members_group_id_change_seq', 'group_id', 'change_seq'),
+    )
+    __mapper_args__ = {"eager_defaults": True}
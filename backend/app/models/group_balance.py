@@ -0,0 +1,16 @@
+from sqlalchemy import BigInteger, Column, ForeignKey, Integer
+from app.db.base import Base
+
+class GroupBalance(Base):
+    """
+    Net balance of a member in a group, in minor units.
+
+    Maintained incrementally by app.services.balances in the same
+    transaction as every expense and settlement change; positive means the
+    member is owed money.
+    """
+    __tablename__ = 'group_balances'
+
+    group_id = Column(Integer, ForeignKey('groups.id', ondelete='CASCADE'), primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
+    net_minor = Column(BigInteger, nullable=False, default=0, server_default="0")
@@ -0,0 +1,42 @@
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Index, Integer, JSON, String, UniqueConstraint
+from app.db.base import Base
+
+class LedgerEvent(Base):
+    """
+    Append-only record of every change to a group's expenses and settlements.
+
+    `seq` numbers a group's events without gaps (see Group.ledger_version).
+    `deltas` holds the balance change per user id, so replaying a group only
+    needs to add them up; `payload` keeps the entity as it was after the
+    change (before it, for deletions) for auditing.
+    """
+    __tablename__ = 'ledger_events'
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    group_id = Column(Integer, ForeignKey('groups.id', ondelete='CASCADE'), nullable=False)
+    seq = Column(Integer, nullable=False)
+    occurred_at = Column(DateTime(timezone=True), nullable=False)
+
+    # expense_created, expense_updated, expense_deleted, settlement_created
+    event_type = Column(String, nullable=False)
+    actor_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    entity_id = Column(BigInteger, nullable=False)
+    payload = Column(JSON, nullable=False)
+    deltas = Column(JSON, nullable=False)
+
+    __table_args__ = (
+        # Also serves replay: events of a group after a given seq
+        UniqueConstraint('group_id', 'seq', name='uq_ledger_events_group_id_seq'),
+        # Activity feeds merge large groups' recent events at read time
+        Index('ix_ledger_events_group_id_occurred_at', 'group_id', 'occurred_at'),
+    )
+
+class LedgerSnapshot(Base):
+    """Balances of a group after the event with sequence number `seq`"""
+    __tablename__ = 'ledger_snapshots'
+
+    group_id = Column(Integer, ForeignKey('groups.id', ondelete='CASCADE'), primary_key=True)
+    seq = Column(Integer, primary_key=True)
+    # occurred_at of the event at `seq`, for time-travel lookups
+    taken_at = Column(DateTime(timezone=True), nullable=False)
+    balances = Column(JSON, nullable=False)  # {user_id: net_minor}, non-zero only
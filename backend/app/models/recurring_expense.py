@@ -0,0 +1,45 @@
+from sqlalchemy import BigInteger, Boolean, Column, Date, DateTime, ForeignKey, Index, Integer, JSON, String
+from sqlalchemy.sql import func, true
+from app.db.base import Base
+
+class RecurringExpense(Base):
+    """
+    Template for an expense posted on a schedule (rent, subscriptions).
+
+    Occurrence n falls on `start_on` plus n * `interval_count` units, so
+    monthly templates started on the 31st post on the last day of shorter
+    months and return to the 31st afterwards. `next_run_at` is midnight UTC
+    of the next occurrence and is what the scheduler polls; it is cleared
+    once the template ends or is paused.
+    """
+    __tablename__ = 'recurring_expenses'
+
+    id = Column(Integer, primary_key=True)
+    group_id = Column(Integer, ForeignKey('groups.id', ondelete='CASCADE'), nullable=False, index=True)
+    created_by = Column(Integer, ForeignKey('users.id'), nullable=False)
+
+    # Posted as an ExpenseCreate with these fields
+    description = Column(String, nullable=False)
+    category = Column(String(32), nullable=False, default="other", server_default="other")
+    amount_minor = Column(BigInteger, nullable=False)
+    currency = Column(String(3), nullable=True)  # None: the group currency
+    paid_by = Column(Integer, ForeignKey('users.id'), nullable=False)
+    shares = Column(JSON, nullable=True)  # [{user_id, amount_minor}]; None splits equally
+
+    interval_unit = Column(String, nullable=False)  # day, week, month
+    interval_count = Column(Integer, nullable=False, default=1, server_default="1")
+    start_on = Column(Date, nullable=False)
+    ends_on = Column(Date, nullable=True)
+
+    next_index = Column(Integer, nullable=False, default=0, server_default="0")
+    next_run_at = Column(DateTime(timezone=True), nullable=True)
+    active = Column(Boolean, nullable=False, default=True, server_default=true())
+    # Why the scheduler paused the template, e.g. the payer left the group
+    last_error = Column(String, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index('ix_recurring_expenses_next_run_at', 'next_run_at'),
+    )
+    __mapper_args__ = {"eager_defaults": True}
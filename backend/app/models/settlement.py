@@ -0,0 +1,25 @@
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+class Settlement(Base):
+    """A repayment from one member to another"""
+    __tablename__ = 'settlements'
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    group_id = Column(Integer, ForeignKey('groups.id', ondelete='CASCADE'), nullable=False)
+    from_user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    to_user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    amount_minor = Column(BigInteger, nullable=False)
+    currency = Column(String(3), nullable=False)
+    created_by = Column(Integer, ForeignKey('users.id'), nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # Stamped by the database when a synced column changes (app.db.change_tracking)
+    change_seq = Column(BigInteger, nullable=False, server_default="0")
+
+    __table_args__ = (
+        Index('ix_settlements_group_id_created_at', 'group_id', 'created_at'),
+        Index('ix_settlements_group_id_change_seq', 'group_id', 'change_seq'),
+    )
+    __mapper_args__ = {"eager_defaults": True}
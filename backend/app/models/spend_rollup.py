@@ -0,0 +1,28 @@
+from sqlalchemy import BigInteger, Column, Date, ForeignKey, Index, Integer, String
+from app.db.base import Base
+
+class SpendRollup(Base):
+    """
+    Expense totals per group, day or month, category and payer.
+
+    Maintained incrementally by the expense service (see
+    app.services.analytics), so charts read a few rows per period instead
+    of aggregating raw expenses. Amounts are in the group currency, copied
+    here so per-user totals across groups need no join.
+    """
+    __tablename__ = 'spend_rollups'
+
+    group_id = Column(Integer, ForeignKey('groups.id', ondelete='CASCADE'), primary_key=True)
+    period = Column(String(5), primary_key=True)  # day, month
+    period_start = Column(Date, primary_key=True)
+    category = Column(String(32), primary_key=True)
+    paid_by = Column(Integer, ForeignKey('users.id'), primary_key=True)
+
+    currency = Column(String(3), nullable=False)
+    amount_minor = Column(BigInteger, nullable=False)
+    expense_count = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        # Spend of one user across their groups
+        Index('ix_spend_rollups_paid_by_period', 'paid_by', 'period', 'period_start'),
+    )
@@ -0,0 +1,39 @@
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, String
+from sqlalchemy.sql import func
+from app.db.base import Base
+from app.db import change_tracking
+
+class ChangeCounter(Base):
+    """
+    The single row (id 1) of change tracking state.
+
+    On SQLite `value` is the last change sequence number handed out;
+    PostgreSQL stamps changes with transaction ids instead (see
+    app.db.change_tracking). `tombstones_pruned_through` is the highest
+    number of a tombstone removed by the retention job; clients that last
+    synced before it have to start over.
+    """
+    __tablename__ = 'change_counter'
+
+    id = Column(Integer, primary_key=True)
+    value = Column(BigInteger, nullable=False)
+    tombstones_pruned_through = Column(BigInteger, nullable=False, default=0, server_default="0")
+
+class SyncTombstone(Base):
+    """A deleted row, kept so that syncing clients learn about the delete"""
+    __tablename__ = 'sync_tombstones'
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    entity = Column(String(16), nullable=False)  # group_member, expense, settlement
+    entity_id = Column(BigInteger, nullable=False)
+    # No foreign key: tombstones outlive the group's rows (and the group)
+    group_id = Column(Integer, nullable=False)
+    change_seq = Column(BigInteger, nullable=False)
+    occurred_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index('ix_sync_tombstones_group_id_change_seq', 'group_id', 'change_seq'),
+    )
+
+# Stamp change_seq and record tombstones whenever these tables are created
+change_tracking.register(Base.metadata)
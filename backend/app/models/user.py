@@ -1,11 +1,12 @@
 import json
-from sqlalchemy import Boolean, Column, Integer, String, DateTime, TypeDecorator, JSON
+from sqlalchemy import BigInteger, Boolean, Column, Integer, String, DateTime, TypeDecorator, JSON
 from sqlalchemy.sql import func
 from app.db.base import Base
 
 # For SQLite compatibility with arrays
 class ArrayOfStrings(TypeDecorator):
     impl = JSON
+    cache_ok = True  # Stateless, safe to use in compiled statement cache keys
     
     def process_bind_param(self, value, dialect):
         if value is None:
@@ -48,4 +49,21 @@ class User(Base):
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Activity, written in batches by app.services.activity_tracker
+    last_login_at = Column(DateTime(timezone=True), nullable=True)
+    last_seen_at = Column(DateTime(timezone=True), index=True, nullable=True)
+
+    # Row version, bumped by the ORM on every UPDATE (used for ETags)
+    row_version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    # Stamped by the database when a synced column changes (app.db.change_tracking)
+    change_seq = Column(BigInteger, nullable=False, index=True, server_default="0")
+
+    __mapper_args__ = {
+        "version_id_col": row_version,
+        # Fetch server-generated values (created_at, updated_at) with RETURNING
+        # in the INSERT/UPDATE itself instead of a follow-up SELECT
+        "eager_defaults": True,
+    }
\ No newline at end of file
@@ -0,0 +1,37 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import date
+
+class SpendRow(BaseModel):
+    """Spend in one period; `category` and `paid_by` are set when split by them"""
+    period_start: date
+    category: Optional[str] = None
+    paid_by: Optional[int] = None
+    amount_minor: int
+    expense_count: int
+
+class GroupSpend(BaseModel):
+    group_id: int
+    currency: str
+    period: str
+    rows: List[SpendRow]
+
+class UserSpendRow(BaseModel):
+    """What a user paid in one period, per currency and category"""
+    period_start: date
+    currency: str
+    category: str
+    amount_minor: int
+    expense_count: int
+
+class TrendPoint(BaseModel):
+    period_start: date
+    amount_minor: int
+    expense_count: int
+    # Difference from the month before; None for the first month
+    change_minor: Optional[int] = None
+
+class GroupTrend(BaseModel):
+    group_id: int
+    currency: str
+    months: List[TrendPoint]
@@ -0,0 +1,16 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Optional, Dict, Any
+from datetime import datetime
+
+class AuthEvent(BaseModel):
+    """Response schema for an audit log entry"""
+    id: int
+    occurred_at: datetime
+    event_type: str
+    user_id: Optional[int] = None
+    provider: Optional[str] = None
+    identifier: Optional[str] = None
+    ip_address: Optional[str] = None
+    details: Optional[Dict[str, Any]] = None
+
+    model_config = ConfigDict(from_attributes=True)
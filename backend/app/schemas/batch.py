@@ -0,0 +1,41 @@
+from pydantic import BaseModel, Field, field_validator
+from typing import Any, Dict, List, Literal, Optional
+from urllib.parse import urlsplit
+
+from app.core.config import settings
+
+class BatchSubRequest(BaseModel):
+    """One API call, with `path` relative to the API root (e.g. "/users/me?x=1")"""
+    id: Optional[str] = None
+    method: Literal["GET", "HEAD", "POST", "PUT", "PATCH", "DELETE"] = "GET"
+    path: str
+    headers: Dict[str, str] = {}
+    body: Optional[Any] = None
+
+    @field_validator("path")
+    @classmethod
+    def path_must_be_an_api_path(cls, v: str) -> str:
+        path = urlsplit(v).path
+        if not path.startswith("/") or path.startswith("//"):
+            raise ValueError("path must start with a single /")
+        if path.rstrip("/") == "/batch":
+            raise ValueError("batches cannot be nested")
+        return v
+
+    @property
+    def read_only(self) -> bool:
+        return self.method in ("GET", "HEAD")
+
+class BatchRequest(BaseModel):
+    requests: List[BatchSubRequest] = Field(min_length=1, max_length=settings.BATCH_MAX_REQUESTS)
+
+class BatchSubResponse(BaseModel):
+    id: Optional[str] = None
+    status: int
+    headers: Dict[str, str]
+    body: Optional[Any] = None
+    # "base64" when the body is binary
+    encoding: Optional[str] = None
+
+class BatchResponse(BaseModel):
+    responses: List[BatchSubResponse]
@@ -0,0 +1,20 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Optional, List, Dict, Any
+from datetime import datetime
+
+class FeedItem(BaseModel):
+    """A ledger event from one of the user's groups"""
+    group_id: int
+    seq: int
+    occurred_at: datetime
+    event_type: str
+    actor_id: int
+    entity_id: int
+    payload: Dict[str, Any]
+
+    model_config = ConfigDict(from_attributes=True)
+
+class FeedPage(BaseModel):
+    items: List[FeedItem]
+    # Pass as `before` to get the next (older) page; None on the last page
+    next_cursor: Optional[str] = None
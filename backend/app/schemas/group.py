@@ -0,0 +1,205 @@
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+from typing import Optional, List, Dict, Any, Literal
+from datetime import date, datetime
+from decimal import Decimal
+
+def _iso_currency(v: Optional[str]) -> Optional[str]:
+    if v is not None and (len(v) != 3 or not v.isalpha()):
+        raise ValueError("Currency must be a 3-letter ISO 4217 code")
+    return v.upper() if v else v
+
+class GroupCreate(BaseModel):
+    name: str
+    currency: str = "USD"
+
+    @field_validator('name')
+    @classmethod
+    def name_must_not_be_empty(cls, v):
+        if not v.strip():
+            raise ValueError("Group name must not be empty")
+        return v.strip()
+
+    @field_validator('currency')
+    @classmethod
+    def currency_must_be_iso_code(cls, v):
+        return _iso_currency(v)
+
+class Group(BaseModel):
+    """Response schema for a group"""
+    id: int
+    name: str
+    currency: str
+    created_by: int
+    created_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class GroupMemberAdd(BaseModel):
+    user_id: int
+
+class GroupMember(BaseModel):
+    user_id: int
+    role: str
+    joined_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class ExpenseShareIn(BaseModel):
+    user_id: int
+    amount_minor: int = Field(ge=0)
+
+class ExpenseShare(ExpenseShareIn):
+    model_config = ConfigDict(from_attributes=True)
+
+class ExpenseCreate(BaseModel):
+    """
+    A new expense, in minor units of the group currency.
+
+    `paid_by` defaults to the current user. Without explicit `shares` the
+    amount is split equally between all group members. With a `currency`
+    other than the group's, amount and shares are in that currency and are
+    converted at today's rate.
+    """
+    description: str
+    category: str = "other"
+    amount_minor: int = Field(gt=0)
+    currency: Optional[str] = None
+    paid_by: Optional[int] = None
+    shares: Optional[List[ExpenseShareIn]] = None
+
+    @field_validator('category')
+    @classmethod
+    def category_must_be_short(cls, v):
+        v = v.strip().lower()
+        if not v or len(v) > 32:
+            raise ValueError("Category must be 1 to 32 characters")
+        return v
+
+    @field_validator('currency')
+    @classmethod
+    def currency_must_be_iso_code(cls, v):
+        return _iso_currency(v)
+
+class ExpenseBatchCreate(BaseModel):
+    expenses: List[ExpenseCreate] = Field(min_length=1, max_length=500)
+
+class Expense(BaseModel):
+    """Response schema for an expense"""
+    id: int
+    group_id: int
+    paid_by: int
+    created_by: int
+    description: str
+    category: str
+    amount_minor: int
+    currency: str
+    original_amount_minor: Optional[int] = None
+    original_currency: Optional[str] = None
+    fx_rate: Optional[Decimal] = None
+    recurring_id: Optional[int] = None
+    occurrence_on: Optional[date] = None
+    created_at: datetime
+    shares: List[ExpenseShare] = []
+
+    model_config = ConfigDict(from_attributes=True)
+
+class RecurringExpenseCreate(ExpenseCreate):
+    """
+    An expense posted automatically, e.g. every month from `start_on`.
+
+    Occurrences are posted at midnight UTC of their day, through `ends_on`
+    if given. A monthly template started on the 31st posts on the last day
+    of shorter months.
+    """
+    interval_unit: Literal["day", "week", "month"] = "month"
+    interval_count: int = Field(1, ge=1, le=366)
+    start_on: date
+    ends_on: Optional[date] = None
+
+    @model_validator(mode='after')
+    def ends_after_start(self):
+        if self.ends_on is not None and self.ends_on < self.start_on:
+            raise ValueError("ends_on must not be before start_on")
+        return self
+
+class RecurringExpense(BaseModel):
+    """Response schema for a recurring expense template"""
+    id: int
+    group_id: int
+    created_by: int
+    description: str
+    category: str
+    amount_minor: int
+    currency: Optional[str] = None
+    paid_by: int
+    shares: Optional[List[ExpenseShareIn]] = None
+    interval_unit: str
+    interval_count: int
+    start_on: date
+    ends_on: Optional[date] = None
+    next_run_at: Optional[datetime] = None
+    active: bool
+    last_error: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class SettlementCreate(BaseModel):
+    """A repayment; `from_user_id` defaults to the current user"""
+    to_user_id: int
+    amount_minor: int = Field(gt=0)
+    from_user_id: Optional[int] = None
+
+class Settlement(BaseModel):
+    """Response schema for a settlement"""
+    id: int
+    group_id: int
+    from_user_id: int
+    to_user_id: int
+    amount_minor: int
+    currency: str
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+class MemberBalance(BaseModel):
+    """Positive balances are owed to the member, negative ones are owed by them"""
+    user_id: int
+    balance_minor: int
+
+class GroupSummary(BaseModel):
+    group_id: int
+    currency: str
+    expense_count: int
+    total_minor: int
+    balances: List[MemberBalance]
+
+class Transfer(BaseModel):
+    from_user_id: int
+    to_user_id: int
+    amount_minor: int
+
+class SettleUp(BaseModel):
+    """Transfers that bring every balance in the group to zero"""
+    group_id: int
+    currency: str
+    exact: bool
+    transfers: List[Transfer]
+
+class LedgerEvent(BaseModel):
+    """An entry in a group's append-only expense ledger"""
+    seq: int
+    occurred_at: datetime
+    event_type: str
+    actor_id: int
+    entity_id: int
+    payload: Dict[str, Any]
+    deltas: Dict[str, int]
+
+    model_config = ConfigDict(from_attributes=True)
+
+class BalancesAt(BaseModel):
+    """Balances after ledger event `seq`, the last one at or before `at`"""
+    group_id: int
+    at: Optional[datetime] = None
+    seq: int
+    balances: List[MemberBalance]
@@ -0,0 +1,67 @@
+from pydantic import BaseModel, Field, field_validator
+from typing import Annotated, Optional, List, Dict, Literal
+
+# Keeps every allocation, and sums over thousands of items, within int64
+MAX_AMOUNT_MINOR = 10 ** 13
+MAX_PARTICIPANTS = 200
+# Items x participants over a whole request: each receipt is an int64 matrix that size
+MAX_SPLIT_CELLS = 1_000_000
+
+class SplitRule(BaseModel):
+    """
+    How an amount is divided between participants.
+
+    - equal: evenly between `participants` (default: everyone on the receipt)
+    - shares: proportionally to integer `weights`
+    - percentages: by `weights` that add up to 100, up to 4 decimal places
+    - exact: `weights` are the amounts in minor units and must add up
+    """
+    method: Literal["equal", "shares", "percentages", "exact"] = "equal"
+    participants: Optional[List[str]] = None
+    weights: Optional[Dict[str, Annotated[float, Field(le=MAX_AMOUNT_MINOR)]]] = None
+
+class LineItem(BaseModel):
+    description: Optional[str] = None
+    amount_minor: int = Field(ge=0, le=MAX_AMOUNT_MINOR)
+    split: Optional[SplitRule] = None  # Falls back to the receipt's rule
+
+class Receipt(BaseModel):
+    """An itemized receipt; tax and tip are apportioned by each participant's subtotal"""
+    participants: List[str] = Field(min_length=1, max_length=MAX_PARTICIPANTS)
+    items: List[LineItem] = Field(min_length=1, max_length=5000)
+    split: SplitRule = SplitRule()
+    tax_minor: int = Field(0, ge=0, le=MAX_AMOUNT_MINOR)
+    tip_minor: int = Field(0, ge=0, le=MAX_AMOUNT_MINOR)
+
+    @field_validator('participants')
+    @classmethod
+    def participants_must_be_unique(cls, v):
+        if len(set(v)) != len(v):
+            raise ValueError("Participants must be unique")
+        return v
+
+class SplitRequest(BaseModel):
+    receipts: List[Receipt] = Field(min_length=1, max_length=100)
+
+    @field_validator('receipts')
+    @classmethod
+    def receipts_must_fit(cls, v):
+        if sum(len(receipt.items) * len(receipt.participants) for receipt in v) > MAX_SPLIT_CELLS:
+            raise ValueError(f"Receipts may have at most {MAX_SPLIT_CELLS} items x participants in total")
+        return v
+
+class ParticipantTotal(BaseModel):
+    participant: str
+    subtotal_minor: int
+    tax_minor: int
+    tip_minor: int
+    total_minor: int
+
+class ReceiptSplit(BaseModel):
+    total_minor: int
+    participants: List[ParticipantTotal]
+    # One row per line item, one column per participant in receipt order
+    allocations: List[List[int]]
+
+class SplitResponse(BaseModel):
+    results: List[ReceiptSplit]
@@ -0,0 +1,30 @@
+from pydantic import BaseModel, ConfigDict
+from typing import List
+
+from app.schemas.group import Expense, Group, GroupMember, Settlement
+from app.schemas.user import User
+
+class SyncGroupMember(GroupMember):
+    group_id: int
+
+class SyncTombstone(BaseModel):
+    """A deleted group member, expense or settlement"""
+    entity: str
+    entity_id: int
+    group_id: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+class SyncPage(BaseModel):
+    # Pass as `since` on the next call
+    token: str
+    # More changes are waiting; call again right away with `token`
+    has_more: bool
+    # The client's data is too old to patch: drop it and keep this page instead
+    reset: bool
+    users: List[User]
+    groups: List[Group]
+    group_members: List[SyncGroupMember]
+    expenses: List[Expense]
+    settlements: List[Settlement]
+    deleted: List[SyncTombstone]
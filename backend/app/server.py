@@ -0,0 +1,220 @@
+import gc
+import importlib.util
+import logging
+import math
+import os
+import signal
+import socket
+import time
+from typing import Dict, List, Optional
+
+import uvicorn
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.db.session import engine, replica_pool
+from app.services.event_broker import InProcessBroker, broker
+from app.services.google_auth import warm_google_certs
+
+logger = logging.getLogger(__name__)
+
+CGROUP_CPU_MAX = "/sys/fs/cgroup/cpu.max"
+
+# A worker exiting sooner than this after its start is failing to start;
+# replace it no faster than this
+_RESTART_INTERVAL_SECONDS = 5.0
+
+def event_loop() -> str:
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+def http_protocol() -> str:
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+def available_cpus() -> float:
+    """CPUs this process may use: its affinity mask, capped by a cgroup v2 quota"""
+    try:
+        cpus = float(len(os.sched_getaffinity(0)))
+    except AttributeError:
+        cpus = float(os.cpu_count() or 1)
+    try:
+        with open(CGROUP_CPU_MAX) as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, int(quota) / int(period))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+def worker_count(cpus: float, hashing_share: float) -> int:
+    """
+    One worker per CPU, less the share kept for password hashing.
+
+    A worker's event loop keeps one core busy; bcrypt runs in its
+    threadpool with the GIL released, so sign-ins need cores beyond the
+    workers' own or they slow down every request on the machine.
+    """
+    return max(1, math.floor(cpus * (1 - hashing_share)))
+
+def shared_state_warning(workers: int) -> Optional[str]:
+    """Why `workers` processes would not behave as one, or None"""
+    if workers > 1 and isinstance(broker, InProcessBroker):
+        return (
+            f"{workers} workers share an in-process event broker: group events only reach "
+            "event stream clients connected to the worker that published them. Point "
+            "EVENT_BROKER_CLASS at a broker backed by a shared bus, or set SERVER_WORKERS=1."
+        )
+    return None
+
+def _engines() -> List[Engine]:
+    return [engine] + (replica_pool.engines if replica_pool else [])
+
+def warm_pool(bind: Engine) -> int:
+    """Open the pool's connections now rather than on the first requests"""
+    size = bind.pool.size() if hasattr(bind.pool, "size") else 1
+    connections = []
+    try:
+        for _ in range(size):
+            connections.append(bind.connect())
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+def warm_up() -> None:
+    """Everything a worker would otherwise do on its first requests"""
+    for bind in _engines():
+        try:
+            warm_pool(bind)
+        except Exception as e:
+            logger.warning(f"Could not warm connection pool for {bind.url.host}: {str(e)}")
+    if replica_pool is not None:
+        replica_pool.check_health()
+    if settings.GOOGLE_AUTH_ENABLED:
+        try:
+            warm_google_certs()
+        except Exception as e:
+            logger.warning(f"Could not fetch Google certificates: {str(e)}")
+
+def run_worker(config: uvicorn.Config, sock: socket.socket) -> None:
+    # Connections are never shared with the parent or other workers
+    for bind in _engines():
+        bind.dispose(close=False)
+    warm_up()
+    # Drains on SIGTERM: stops accepting, waits for in-flight requests up to
+    # the graceful timeout, then runs the lifespan shutdown (buffer flushes)
+    uvicorn.Server(config).run(sockets=[sock])
+
+class Supervisor:
+    """
+    Forks workers sharing one listening socket and keeps them running.
+
+    Workers that exit are replaced. On SIGTERM or SIGINT every worker is
+    asked to drain; those still running after the graceful timeout (plus
+    time for their shutdown hooks) are killed.
+    """
+
+    def __init__(self, config: uvicorn.Config, sock: socket.socket, workers: int, graceful_timeout: float):
+        self.config = config
+        self.sock = sock
+        self.workers = workers
+        self.graceful_timeout = graceful_timeout
+        self.children: Dict[int, float] = {}  # pid -> started at
+        self.stopping = False
+
+    def run(self) -> None:
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        for _ in range(self.workers):
+            self._spawn()
+        while not self.stopping:
+            self._reap()
+            time.sleep(0.2)
+        self._drain()
+
+    def _stop(self, signum, frame) -> None:
+        self.stopping = True
+
+    def _spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                signal.signal(signal.SIGINT, signal.SIG_DFL)
+                run_worker(self.config, self.sock)
+            except BaseException:
+                logger.exception("Worker failed")
+                code = 1
+            finally:
+                os._exit(code)
+        self.children[pid] = time.monotonic()
+
+    def _reap(self) -> None:
+        while self.children:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                return
+            started = self.children.pop(pid, None)
+            if started is None or self.stopping:
+                continue
+            logger.warning(f"Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}, replacing it")
+            uptime = time.monotonic() - started
+            if uptime < _RESTART_INTERVAL_SECONDS:
+                time.sleep(_RESTART_INTERVAL_SECONDS - uptime)
+                if self.stopping:
+                    # SIGTERM arrived during the back-off
+                    continue
+            self._spawn()
+
+    def _drain(self) -> None:
+        logger.info(f"Draining {len(self.children)} workers")
+        for pid in self.children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + self.graceful_timeout + 10
+        while self.children and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        for pid in self.children:
+            logger.warning(f"Worker {pid} did not stop in time, killing it")
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+def serve() -> None:
+    workers = settings.SERVER_WORKERS or worker_count(available_cpus(), settings.SERVER_HASHING_CPU_SHARE)
+    warning = shared_state_warning(workers)
+    if warning:
+        logger.error(warning)
+    config = uvicorn.Config(
+        "app.main:app",
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        loop=event_loop(),
+        http=http_protocol(),
+        lifespan="on",
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.SERVER_KEEPALIVE_SECONDS,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_TIMEOUT_SECONDS,
+    )
+    # Import the app once, before forking: workers share its memory
+    # copy-on-write instead of each importing it again
+    config.load()
+    for bind in _engines():
+        bind.dispose()
+    sock = config.bind_socket()
+    # Keep the collector from touching (and so copying) the preloaded objects
+    gc.freeze()
+    logger.info(
+        f"Serving on {settings.SERVER_HOST}:{settings.SERVER_PORT} with {workers} workers "
+        f"({config.loop} event loop, {config.http} HTTP parser)"
+    )
+    Supervisor(config, sock, workers, settings.SERVER_GRACEFUL_TIMEOUT_SECONDS).run()
+
+if __name__ == "__main__":
+    # python -m app.server   (production; use uvicorn --reload for development)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s [%(process)d] %(name)s: %(message)s")
+    serve()
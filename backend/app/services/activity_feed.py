@@ -0,0 +1,148 @@
+import base64
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import DateTime, and_, bindparam, delete, insert, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.activity_feed import ActivityFeedItem
+from app.models.group import Group, GroupMember
+from app.models.ledger import LedgerEvent
+
+class FeedCursor(NamedTuple):
+    """Position of the last item on a page; feeds are ordered by this key, newest first"""
+    occurred_at: datetime
+    group_id: int
+    seq: int
+
+_group_member_ids = select(GroupMember.user_id).where(GroupMember.group_id == bindparam("group_id"))
+
+_switch_to_read_time_merge = update(Group).where(
+    Group.id == bindparam("group_id"), Group.feed_pull_from_seq.is_(None)
+).values(feed_pull_from_seq=bindparam("seq")).execution_options(synchronize_session=False)
+
+_before_cursor = [
+    bindparam("before_at", type_=DateTime(timezone=True)), bindparam("before_group_id"), bindparam("before_seq")
+]
+
+# Events fanned out to the user's own feed rows
+_fanned_out_page = select(LedgerEvent).join(ActivityFeedItem, and_(
+    ActivityFeedItem.group_id == LedgerEvent.group_id, ActivityFeedItem.seq == LedgerEvent.seq
+)).where(
+    ActivityFeedItem.user_id == bindparam("user_id"),
+    ActivityFeedItem.occurred_at >= bindparam("since", type_=DateTime(timezone=True)),
+).order_by(
+    ActivityFeedItem.occurred_at.desc(), ActivityFeedItem.group_id.desc(), ActivityFeedItem.seq.desc()
+).limit(bindparam("limit"))
+_fanned_out_page_before = _fanned_out_page.where(
+    tuple_(ActivityFeedItem.occurred_at, ActivityFeedItem.group_id, ActivityFeedItem.seq) < tuple_(*_before_cursor)
+)
+
+# Events of the user's large groups, read straight from the ledger
+_merged_page = select(LedgerEvent).join(Group, Group.id == LedgerEvent.group_id).join(GroupMember, and_(
+    GroupMember.group_id == LedgerEvent.group_id, GroupMember.user_id == bindparam("user_id")
+)).where(
+    Group.feed_pull_from_seq.is_not(None),
+    LedgerEvent.seq >= Group.feed_pull_from_seq,
+    LedgerEvent.occurred_at >= GroupMember.joined_at,
+    LedgerEvent.occurred_at >= bindparam("since", type_=DateTime(timezone=True)),
+).order_by(
+    LedgerEvent.occurred_at.desc(), LedgerEvent.group_id.desc(), LedgerEvent.seq.desc()
+).limit(bindparam("limit"))
+_merged_page_before = _merged_page.where(
+    tuple_(LedgerEvent.occurred_at, LedgerEvent.group_id, LedgerEvent.seq) < tuple_(*_before_cursor)
+)
+
+def fan_out_events(
+    db: Session, group_id: int, pull_from_seq: Optional[int], first_seq: int, count: int, occurred_at: datetime
+) -> None:
+    """
+    Add newly recorded ledger events to the members' feeds; caller commits.
+
+    Called by record_events while it holds the group lock. A group with more
+    than FEED_FANOUT_MAX_MEMBERS members switches to read-time merging
+    instead, from this batch on; the switch is one-way, so events already
+    fanned out are never listed twice.
+    """
+    if pull_from_seq is not None:
+        return
+    member_ids = list(db.scalars(_group_member_ids, {"group_id": group_id}))
+    if not member_ids:
+        return
+    if len(member_ids) > settings.FEED_FANOUT_MAX_MEMBERS:
+        db.execute(_switch_to_read_time_merge, {"group_id": group_id, "seq": first_seq})
+        return
+    db.execute(insert(ActivityFeedItem), [
+        {"user_id": user_id, "occurred_at": occurred_at, "group_id": group_id, "seq": seq}
+        for seq in range(first_seq, first_seq + count)
+        for user_id in member_ids
+    ])
+
+def _feed_key(event: LedgerEvent) -> FeedCursor:
+    occurred_at = event.occurred_at
+    if occurred_at.tzinfo is None:
+        occurred_at = occurred_at.replace(tzinfo=timezone.utc)
+    return FeedCursor(occurred_at, event.group_id, event.seq)
+
+def get_feed(
+    db: Session, user_id: int, before: Optional[FeedCursor] = None, limit: int = 50
+) -> Tuple[List[LedgerEvent], Optional[FeedCursor]]:
+    """
+    A page of activity across all of the user's groups, newest first.
+
+    Merges the user's fanned-out rows with the recent events of large
+    groups, both read by keyset, and returns (events, cursor of the next
+    page or None). Events older than FEED_RETENTION_DAYS are not listed.
+    """
+    params = {
+        "user_id": user_id,
+        "since": datetime.now(timezone.utc) - timedelta(days=settings.FEED_RETENTION_DAYS),
+        "limit": limit + 1,
+    }
+    fanned_out, merged = _fanned_out_page, _merged_page
+    if before is not None:
+        fanned_out, merged = _fanned_out_page_before, _merged_page_before
+        params.update(before_at=before.occurred_at, before_group_id=before.group_id, before_seq=before.seq)
+
+    events = list(db.scalars(fanned_out, params)) + list(db.scalars(merged, params))
+    events.sort(key=_feed_key, reverse=True)
+    if len(events) <= limit:
+        return events, None
+    return events[:limit], _feed_key(events[limit - 1])
+
+def encode_cursor(cursor: FeedCursor) -> str:
+    raw = json.dumps([cursor.occurred_at.isoformat(), cursor.group_id, cursor.seq])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(token: str) -> FeedCursor:
+    """Raises ValueError for anything encode_cursor did not produce"""
+    try:
+        occurred_at, group_id, seq = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        occurred_at = datetime.fromisoformat(occurred_at)
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid feed cursor") from e
+    if not isinstance(group_id, int) or not isinstance(seq, int):
+        raise ValueError("Invalid feed cursor")
+    if occurred_at.tzinfo is None:
+        occurred_at = occurred_at.replace(tzinfo=timezone.utc)
+    return FeedCursor(occurred_at, group_id, seq)
+
+def trim_feeds(db: Session, before: datetime) -> int:
+    """Delete fanned-out feed rows older than `before`; returns the number of rows removed"""
+    result = db.execute(delete(ActivityFeedItem).where(ActivityFeedItem.occurred_at < before))
+    db.commit()
+    return result.rowcount
+
+if __name__ == "__main__":
+    # python -m app.services.activity_feed trim   (e.g. nightly from cron)
+    from app.db.session import SessionLocal
+
+    if sys.argv[1:] != ["trim"]:
+        sys.exit("usage: python -m app.services.activity_feed trim")
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.FEED_RETENTION_DAYS)
+    with SessionLocal() as db:
+        removed = trim_feeds(db, cutoff)
+    print(f"Removed {removed} feed items older than {cutoff.isoformat()}")
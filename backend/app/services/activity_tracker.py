@@ -0,0 +1,134 @@
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.core.background import PeriodicWorker
+from app.core.config import settings
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+# Rows per UPDATE statement, keeps bound parameter counts well under driver limits
+FLUSH_CHUNK_SIZE = 1000
+
+# (last_login_at, last_seen_at) pending for a user
+PendingActivity = Tuple[Optional[datetime], Optional[datetime]]
+
+class ActivityBuffer:
+    """
+    Write-behind buffer for users' last_login_at / last_seen_at.
+
+    Updates are coalesced per user in memory and written periodically as a
+    single `UPDATE users ... FROM (VALUES ...)` per chunk, so the request
+    path never waits on the database for activity tracking.
+    """
+
+    def __init__(self, engine: Engine, flush_interval: float):
+        self.engine = engine
+        self._pending: Dict[int, PendingActivity] = {}
+        self._lock = threading.Lock()
+        self._worker = PeriodicWorker("activity-flush", flush_interval, self.flush)
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.rows_flushed = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+
+    def record_login(self, user_id: int, at: Optional[datetime] = None) -> None:
+        at = at or datetime.now(timezone.utc)
+        with self._lock:
+            self._pending[user_id] = (at, at)
+
+    def record_seen(self, user_id: int, at: Optional[datetime] = None) -> None:
+        at = at or datetime.now(timezone.utc)
+        with self._lock:
+            last_login, _ = self._pending.get(user_id, (None, None))
+            self._pending[user_id] = (last_login, at)
+
+    def flush(self) -> int:
+        """Write all pending activity; returns the number of users updated"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        started = time.perf_counter()
+        rows = list(pending.items())
+        try:
+            with self.engine.begin() as conn:
+                for i in range(0, len(rows), FLUSH_CHUNK_SIZE):
+                    statement, params = self._build_update(rows[i:i + FLUSH_CHUNK_SIZE])
+                    conn.execute(statement, params)
+        except Exception:
+            self.failed_flushes += 1
+            logger.exception(f"Failed to flush activity for {len(rows)} users")
+            self._requeue(pending)
+            return 0
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.flushes += 1
+        self.rows_flushed += len(rows)
+        self.last_flush_ms = elapsed_ms
+        self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+        return len(rows)
+
+    def _requeue(self, pending: Dict[int, PendingActivity]) -> None:
+        # Anything recorded since the failed flush is newer and wins
+        with self._lock:
+            for user_id, activity in pending.items():
+                self._pending.setdefault(user_id, activity)
+
+    def _build_update(self, rows: List[Tuple[int, PendingActivity]]):
+        params = {}
+        values = []
+        for i, (user_id, (last_login, last_seen)) in enumerate(rows):
+            params[f"id_{i}"] = user_id
+            params[f"login_{i}"] = last_login
+            params[f"seen_{i}"] = last_seen
+            if self.engine.dialect.name == "postgresql":
+                values.append(
+                    f"(CAST(:id_{i} AS INTEGER), CAST(:login_{i} AS TIMESTAMPTZ), CAST(:seen_{i} AS TIMESTAMPTZ))"
+                )
+            else:
+                values.append(f"(:id_{i}, :login_{i}, :seen_{i})")
+
+        if self.engine.dialect.name == "postgresql":
+            source = f"(VALUES {', '.join(values)}) AS v(id, last_login_at, last_seen_at)"
+            id_col, login_col, seen_col = "v.id", "v.last_login_at", "v.last_seen_at"
+        else:
+            # SQLite names VALUES columns column1..columnN and rejects aliases
+            source = f"(VALUES {', '.join(values)}) AS v"
+            id_col, login_col, seen_col = "v.column1", "v.column2", "v.column3"
+
+        statement = text(
+            f"UPDATE users SET "
+            f"last_login_at = COALESCE({login_col}, users.last_login_at), "
+            f"last_seen_at = COALESCE({seen_col}, users.last_seen_at) "
+            f"FROM {source} WHERE users.id = {id_col}"
+        )
+        return statement, params
+
+    def start(self) -> None:
+        self._worker.start()
+
+    def stop(self) -> None:
+        """Stop the flush thread and write whatever is still buffered"""
+        self._worker.stop()
+        self.flush()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "buffer_size": len(self._pending),
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "rows_flushed": self.rows_flushed,
+            "last_flush_ms": round(self.last_flush_ms, 3),
+            "max_flush_ms": round(self.max_flush_ms, 3),
+        }
+
+activity_buffer = ActivityBuffer(engine, settings.ACTIVITY_FLUSH_SECONDS)
@@ -0,0 +1,209 @@
+import sys
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Date, bindparam, delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.db.writes import dialect_insert
+from app.models.expense import Expense
+from app.models.group import Group
+from app.models.spend_rollup import SpendRollup
+
+PERIODS = ("day", "month")
+BACKFILL_CHUNK_SIZE = 5000
+
+# (group_id, period, period_start, category, paid_by) -> [currency, amount_minor, expense_count]
+RollupDeltas = Dict[Tuple[int, str, date, str, int], List[Any]]
+
+_lock_group = select(Group.currency).where(Group.id == bindparam("group_id")).with_for_update()
+
+SPEND_DIMENSIONS = ("category", "paid_by")
+
+def _group_spend_by(by: Tuple[str, ...]):
+    columns = [getattr(SpendRollup, field) for field in by]
+    return select(
+        SpendRollup.period_start, *columns,
+        func.sum(SpendRollup.amount_minor), func.sum(SpendRollup.expense_count),
+    ).where(
+        SpendRollup.group_id == bindparam("group_id"),
+        SpendRollup.period == bindparam("period"),
+        SpendRollup.period_start >= bindparam("start", type_=Date),
+        SpendRollup.period_start <= bindparam("end", type_=Date),
+    ).group_by(SpendRollup.period_start, *columns).order_by(SpendRollup.period_start, *columns)
+
+# One prebuilt statement per split: (), (category,), (paid_by,), (category, paid_by)
+_group_spend = {
+    by: _group_spend_by(by)
+    for by in [(), ("category",), ("paid_by",), SPEND_DIMENSIONS]
+}
+
+_user_spend = select(
+    SpendRollup.period_start, SpendRollup.currency, SpendRollup.category,
+    func.sum(SpendRollup.amount_minor), func.sum(SpendRollup.expense_count),
+).where(
+    SpendRollup.paid_by == bindparam("user_id"),
+    SpendRollup.period == bindparam("period"),
+    SpendRollup.period_start >= bindparam("start", type_=Date),
+    SpendRollup.period_start <= bindparam("end", type_=Date),
+).group_by(
+    SpendRollup.period_start, SpendRollup.currency, SpendRollup.category
+).order_by(SpendRollup.period_start, SpendRollup.currency, SpendRollup.category)
+
+_group_history = select(
+    Expense.created_at, Expense.occurrence_on, Expense.category, Expense.paid_by, Expense.amount_minor
+).where(Expense.group_id == bindparam("group_id")).order_by(Expense.id)
+
+def period_start(day: date, period: str) -> date:
+    return day.replace(day=1) if period == "month" else day
+
+def spent_on(expense: Expense) -> date:
+    """Day an expense counts towards: its occurrence for recurring ones, else its creation (UTC)"""
+    if expense.occurrence_on is not None:
+        return expense.occurrence_on
+    created_at = expense.created_at
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc)
+    return created_at.date()
+
+def add_rollup_delta(
+    deltas: RollupDeltas, group_id: int, currency: str, day: date, category: str, paid_by: int,
+    amount_minor: int, sign: int = 1
+) -> None:
+    for period in PERIODS:
+        entry = deltas.setdefault((group_id, period, period_start(day, period), category, paid_by), [currency, 0, 0])
+        entry[1] += sign * amount_minor
+        entry[2] += sign
+
+def expense_rollup_deltas(expense: Expense, sign: int = 1, deltas: Optional[RollupDeltas] = None) -> RollupDeltas:
+    """Rollup changes from adding (sign=1) or removing (sign=-1) an expense"""
+    deltas = {} if deltas is None else deltas
+    add_rollup_delta(
+        deltas, expense.group_id, expense.currency, spent_on(expense), expense.category, expense.paid_by,
+        expense.amount_minor, sign
+    )
+    return deltas
+
+def apply_rollup_deltas(db: Session, deltas: RollupDeltas) -> None:
+    """
+    Add `deltas` to the rollups with one `INSERT ... ON CONFLICT DO UPDATE`.
+
+    Runs in the transaction of the expense change, under the group lock
+    taken by record_events; rows are written in key order like balances.
+    """
+    rows = [
+        {"group_id": group_id, "period": period, "period_start": start, "category": category,
+         "paid_by": paid_by, "currency": currency, "amount_minor": amount, "expense_count": count}
+        for (group_id, period, start, category, paid_by), (currency, amount, count) in sorted(deltas.items())
+        if amount or count
+    ]
+    if not rows:
+        return
+    statement = dialect_insert(db, SpendRollup).values(rows)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[
+            SpendRollup.group_id, SpendRollup.period, SpendRollup.period_start,
+            SpendRollup.category, SpendRollup.paid_by,
+        ],
+        set_={
+            "amount_minor": SpendRollup.amount_minor + statement.excluded.amount_minor,
+            "expense_count": SpendRollup.expense_count + statement.excluded.expense_count,
+        },
+    ))
+
+def get_group_spend(
+    db: Session, group_id: int, period: str, start: date, end: date, by: Iterable[str] = ("category",)
+) -> List[Dict[str, Any]]:
+    """
+    Spend of a group per period between `start` and `end`, split by any of
+    "category" and "paid_by". Reads at most periods x categories x payers
+    rollup rows, however many expenses the group has.
+    """
+    by = tuple(field for field in SPEND_DIMENSIONS if field in by)
+    params = {"group_id": group_id, "period": period, "start": period_start(start, period), "end": end}
+    return [
+        {"period_start": row[0], **dict(zip(by, row[1:-2])), "amount_minor": row[-2], "expense_count": row[-1]}
+        for row in db.execute(_group_spend[by], params)
+        if row[-1]
+    ]
+
+def get_user_spend(db: Session, user_id: int, period: str, start: date, end: date) -> List[Dict[str, Any]]:
+    """What the user paid across all groups, per period, currency and category"""
+    params = {"user_id": user_id, "period": period, "start": period_start(start, period), "end": end}
+    return [
+        {"period_start": start_on, "currency": currency, "category": category,
+         "amount_minor": amount, "expense_count": count}
+        for start_on, currency, category, amount, count in db.execute(_user_spend, params)
+        if count
+    ]
+
+def _month_starts(end: date, months: int) -> List[date]:
+    year, month = end.year, end.month
+    starts = []
+    for _ in range(months):
+        starts.append(date(year, month, 1))
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return starts[::-1]
+
+def get_group_trend(db: Session, group_id: int, months: int, end: date) -> List[Dict[str, Any]]:
+    """Monthly totals for the `months` months up to `end`, including empty ones, with the change from the month before"""
+    starts = _month_starts(end, months)
+    totals = {start: [0, 0] for start in starts}
+    for row in get_group_spend(db, group_id, "month", starts[0], end, by=()):
+        totals[row["period_start"]] = [row["amount_minor"], row["expense_count"]]
+    trend = []
+    previous = None
+    for start in starts:
+        amount, count = totals[start]
+        trend.append({
+            "period_start": start,
+            "amount_minor": amount,
+            "expense_count": count,
+            "change_minor": None if previous is None else amount - previous,
+        })
+        previous = amount
+    return trend
+
+def backfill_group_rollups(db: Session, group_id: int, chunk_size: int = BACKFILL_CHUNK_SIZE) -> int:
+    """
+    Rebuild a group's rollups from its expenses; returns the expenses read.
+
+    History is streamed `chunk_size` rows at a time and aggregated in
+    memory, which only grows with days x categories x payers. The group
+    lock keeps writers out until the new rollups commit.
+    """
+    # Locked before the currency is read, so it cannot change under the rebuild
+    currency = db.scalar(_lock_group, {"group_id": group_id})
+    db.execute(delete(SpendRollup).where(SpendRollup.group_id == group_id))
+
+    deltas: RollupDeltas = {}
+    read = 0
+    result = db.execute(_group_history.execution_options(yield_per=chunk_size), {"group_id": group_id})
+    for rows in result.partitions():
+        for row in rows:
+            add_rollup_delta(deltas, group_id, currency, spent_on(row), row.category, row.paid_by, row.amount_minor)
+        read += len(rows)
+
+    rows = [
+        {"group_id": group_id, "period": period, "period_start": start, "category": category,
+         "paid_by": paid_by, "currency": currency, "amount_minor": amount, "expense_count": count}
+        for (_, period, start, category, paid_by), (_, amount, count) in sorted(deltas.items())
+    ]
+    for i in range(0, len(rows), chunk_size):
+        db.execute(insert(SpendRollup), rows[i:i + chunk_size])
+    db.commit()
+    return read
+
+if __name__ == "__main__":
+    # python -m app.services.analytics backfill [group_id ...]
+    from app.db.session import SessionLocal
+
+    if sys.argv[1:2] != ["backfill"]:
+        sys.exit("usage: python -m app.services.analytics backfill [group_id ...]")
+    with SessionLocal() as db:
+        group_ids = [int(arg) for arg in sys.argv[2:]] or list(db.scalars(select(Group.id).order_by(Group.id)))
+        for group_id in group_ids:
+            started = datetime.now(timezone.utc)
+            read = backfill_group_rollups(db, group_id)
+            elapsed = (datetime.now(timezone.utc) - started).total_seconds()
+            print(f"Group {group_id}: rolled up {read} expenses in {elapsed:.1f}s")
@@ -0,0 +1,161 @@
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from fastapi import Request
+from sqlalchemy import delete, insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.background import PeriodicWorker
+from app.core.config import settings
+from app.db.session import engine
+from app.models.auth_event import AuthEvent
+
+logger = logging.getLogger(__name__)
+
+class AuditLog:
+    """
+    Asynchronous writer for the auth_events table.
+
+    `record` only enqueues onto a bounded in-memory queue; a background
+    thread drains it in batches with a single multi-row INSERT. When the
+    queue is full new events are dropped and counted rather than blocking
+    the request, and a backlog of one batch wakes the writer early.
+    """
+
+    def __init__(self, engine: Engine, max_queue: int, batch_size: int, flush_interval: float):
+        self.engine = engine
+        self.batch_size = batch_size
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_queue)
+        self._flush_lock = threading.Lock()
+        # Counters are updated from request threads and the writer
+        self._stats_lock = threading.Lock()
+        self._worker = PeriodicWorker("audit-log-writer", flush_interval, self.flush)
+        self.dropped = 0
+        self.written = 0
+        self.failed_batches = 0
+        self.last_batch_ms = 0.0
+
+    def record(
+        self,
+        event_type: str,
+        user_id: Optional[int] = None,
+        provider: Optional[str] = None,
+        identifier: Optional[str] = None,
+        ip_address: Optional[str] = None,
+        details: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """Queue an event; returns False if it was dropped because the queue is full"""
+        event = {
+            "occurred_at": datetime.now(timezone.utc),
+            "event_type": event_type,
+            "user_id": user_id,
+            "provider": provider,
+            "identifier": identifier,
+            "ip_address": ip_address,
+            "details": details,
+        }
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            with self._stats_lock:
+                self.dropped += 1
+            return False
+        if self._queue.qsize() >= self.batch_size:
+            self._worker.wake()
+        return True
+
+    def flush(self) -> int:
+        """Write everything currently queued; returns the number of events written"""
+        total = 0
+        with self._flush_lock:
+            while True:
+                batch = self._take_batch()
+                if not batch:
+                    return total
+                started = time.perf_counter()
+                try:
+                    with self.engine.begin() as conn:
+                        conn.execute(insert(AuthEvent), batch)
+                except Exception:
+                    # The audit log is best effort; never let it take the writer down
+                    with self._stats_lock:
+                        self.failed_batches += 1
+                        self.dropped += len(batch)
+                    logger.exception(f"Failed to write {len(batch)} auth events")
+                    continue
+                with self._stats_lock:
+                    self.last_batch_ms = (time.perf_counter() - started) * 1000
+                    self.written += len(batch)
+                total += len(batch)
+
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def start(self) -> None:
+        self._worker.start()
+
+    def stop(self) -> None:
+        """Stop the writer thread and write whatever is still queued"""
+        self._worker.stop()
+        self.flush()
+
+    def stats(self) -> Dict[str, float]:
+        with self._stats_lock:
+            return {
+                "queue_size": self._queue.qsize(),
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed_batches": self.failed_batches,
+                "last_batch_ms": round(self.last_batch_ms, 3),
+            }
+
+def client_ip(request: Request) -> Optional[str]:
+    return request.client.host if request.client else None
+
+def query_auth_events(
+    db: Session,
+    start: datetime,
+    end: datetime,
+    user_id: Optional[int] = None,
+    event_type: Optional[str] = None,
+    limit: int = 100,
+) -> List[AuthEvent]:
+    """Events in [start, end), newest first; the time range keeps scans on the BRIN index"""
+    query = db.query(AuthEvent).filter(AuthEvent.occurred_at >= start, AuthEvent.occurred_at < end)
+    if user_id is not None:
+        query = query.filter(AuthEvent.user_id == user_id)
+    if event_type:
+        query = query.filter(AuthEvent.event_type == event_type)
+    return query.order_by(AuthEvent.occurred_at.desc()).limit(limit).all()
+
+def purge_auth_events(db: Session, before: datetime) -> int:
+    """Delete events older than `before`; returns the number of rows removed"""
+    result = db.execute(delete(AuthEvent).where(AuthEvent.occurred_at < before))
+    db.commit()
+    return result.rowcount
+
+audit_log = AuditLog(
+    engine,
+    max_queue=settings.AUDIT_LOG_QUEUE_SIZE,
+    batch_size=settings.AUDIT_LOG_BATCH_SIZE,
+    flush_interval=settings.AUDIT_LOG_FLUSH_SECONDS,
+)
+
+if __name__ == "__main__":
+    from app.db.session import SessionLocal
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.AUDIT_LOG_RETENTION_DAYS)
+    with SessionLocal() as db:
+        removed = purge_auth_events(db, cutoff)
+    print(f"Removed {removed} auth events older than {cutoff.isoformat()}")
@@ -6,14 +6,16 @@ from sqlalchemy.orm.attributes import flag_modified
 from app.models.user import User
 from app.schemas.user import UserCreate
 from app.core.security import hash_password
-from app.services.user import get_user, get_user_by_email, get_user_by_phone
+from app.services.user import (
+    commit_user_changes, get_user, get_user_by_email, get_user_by_phone, get_user_by_firebase_uid, get_user_by_google_id
+)
 
 def get_user_by_auth_id(db: Session, provider: str, auth_id: str) -> User:
     """Get a user by an authentication provider ID"""
     if provider == "google":
-        return db.query(User).filter(User.google_id == auth_id).first()
+        return get_user_by_google_id(db, auth_id)
     elif provider == "firebase":
-        return db.query(User).filter(User.firebase_uid == auth_id).first()
+        return get_user_by_firebase_uid(db, auth_id)
     return None
 
 def validate_auth_providers(db: Session, user_create: UserCreate) -> Dict[str, Any]:
@@ -51,7 +53,7 @@ def validate_auth_providers(db: Session, user_create: UserCreate) -> Dict[str, A
     
     # Check phone auth
     if user_create.firebase_uid:
-        existing_firebase = db.query(User).filter(User.firebase_uid == user_create.firebase_uid).first()
+        existing_firebase = get_user_by_firebase_uid(db, user_create.firebase_uid)
         if existing_firebase:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -72,7 +74,7 @@ def validate_auth_providers(db: Session, user_create: UserCreate) -> Dict[str, A
     
     # Check Google auth
     if user_create.google_id:
-        existing_google = db.query(User).filter(User.google_id == user_create.google_id).first()
+        existing_google = get_user_by_google_id(db, user_create.google_id)
         if existing_google:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -160,7 +162,7 @@ def link_auth_method(db: Session, user_id: int, provider: str, auth_data: dict)
                 detail="Firebase UID is required"
             )
         
-        existing_firebase = db.query(User).filter(User.firebase_uid == firebase_uid).first()
+        existing_firebase = get_user_by_firebase_uid(db, firebase_uid)
         if existing_firebase and existing_firebase.id != user.id:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -199,7 +201,7 @@ def link_auth_method(db: Session, user_id: int, provider: str, auth_data: dict)
                 detail="Google ID is required"
             )
         
-        existing_google = db.query(User).filter(User.google_id == google_id).first()
+        existing_google = get_user_by_google_id(db, google_id)
         if existing_google and existing_google.id != user.id:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -235,8 +237,7 @@ def link_auth_method(db: Session, user_id: int, provider: str, auth_data: dict)
     flag_modified(user, "auth_providers")
     
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    commit_user_changes(db)
     
     return user
 
@@ -290,7 +291,6 @@ def unlink_auth_method(db: Session, user_id: int, provider: str) -> User:
     user.auth_providers = auth_providers
     
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    commit_user_changes(db)
     
     return user
\ No newline at end of file
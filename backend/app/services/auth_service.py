@@ -4,7 +4,10 @@ from fastapi import HTTPException, status
 
 from app.models.user import User
 from app.core.security import verify_password
-from app.services.user import get_user_by_any_identifier
+from app.services.user import (
+    get_user_by_any_identifier, get_user_by_firebase_uid, get_user_by_google_id
+)
+from app.services.activity_tracker import activity_buffer
 
 def authenticate_user(db: Session, identifier: str, password: str = None, provider: str = None, auth_id: str = None) -> Optional[User]:
     """
@@ -27,16 +30,19 @@ def authenticate_user(db: Session, identifier: str, password: str = None, provid
         # Phone auth via Firebase
         if not auth_id:
             return None
-        user = db.query(User).filter(User.firebase_uid == auth_id).first()
+        user = get_user_by_firebase_uid(db, auth_id)
     
     elif provider == "google":
         # Google OAuth
         if not auth_id:
             return None
-        user = db.query(User).filter(User.google_id == auth_id).first()
+        user = get_user_by_google_id(db, auth_id)
     
     # Check if user is active
     if user and not user.is_active:
         return None
     
+    if user:
+        activity_buffer.record_login(user.id)
+    
     return user
\ No newline at end of file
@@ -0,0 +1,148 @@
+import sys
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import bindparam, delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.db.writes import dialect_insert
+from app.models.expense import Expense, ExpenseShare
+from app.models.group import Group
+from app.models.group_balance import GroupBalance
+from app.models.settlement import Settlement
+from app.services.group import get_group_member_ids
+
+_lock_group = select(Group.id).where(Group.id == bindparam("group_id"))
+_group_balances = select(GroupBalance.user_id, GroupBalance.net_minor).where(
+    GroupBalance.group_id == bindparam("group_id")
+)
+
+# Per-member sums that make up balances from scratch: paid - owed + repaid - repaid to
+_paid_by_member = select(Expense.paid_by, func.sum(Expense.amount_minor)).where(
+    Expense.group_id == bindparam("group_id")
+).group_by(Expense.paid_by)
+_owed_by_member = select(ExpenseShare.user_id, func.sum(ExpenseShare.amount_minor)).where(
+    ExpenseShare.group_id == bindparam("group_id")
+).group_by(ExpenseShare.user_id)
+_settled_by_member = select(Settlement.from_user_id, func.sum(Settlement.amount_minor)).where(
+    Settlement.group_id == bindparam("group_id")
+).group_by(Settlement.from_user_id)
+_settled_to_member = select(Settlement.to_user_id, func.sum(Settlement.amount_minor)).where(
+    Settlement.group_id == bindparam("group_id")
+).group_by(Settlement.to_user_id)
+
+def expense_deltas(paid_by: int, amount_minor: int, shares: Dict[int, int], sign: int = 1) -> Dict[int, int]:
+    """Balance changes from adding (sign=1) or removing (sign=-1) an expense"""
+    deltas: Dict[int, int] = defaultdict(int)
+    deltas[paid_by] += sign * amount_minor
+    for user_id, amount in shares.items():
+        deltas[user_id] -= sign * amount
+    return deltas
+
+def settlement_deltas(from_user_id: int, to_user_id: int, amount_minor: int, sign: int = 1) -> Dict[int, int]:
+    return {from_user_id: sign * amount_minor, to_user_id: -sign * amount_minor}
+
+def merge_deltas(*deltas: Dict[int, int]) -> Dict[int, int]:
+    merged: Dict[int, int] = defaultdict(int)
+    for delta in deltas:
+        for user_id, amount in delta.items():
+            merged[user_id] += amount
+    return merged
+
+def apply_balance_deltas(db: Session, group_id: int, deltas: Dict[int, int]) -> None:
+    """
+    Add `deltas` to the stored balances with one `INSERT ... ON CONFLICT DO UPDATE`.
+
+    Must run in the same transaction as the change it accounts for, after
+    app.services.ledger.record_events has locked the group row. Rows are
+    written in user_id order so concurrent writers lock them in the same
+    order and cannot deadlock each other.
+    """
+    rows = [
+        {"group_id": group_id, "user_id": user_id, "net_minor": amount}
+        for user_id, amount in sorted(deltas.items()) if amount
+    ]
+    if not rows:
+        return
+    statement = dialect_insert(db, GroupBalance).values(rows)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[GroupBalance.group_id, GroupBalance.user_id],
+        set_={"net_minor": GroupBalance.net_minor + statement.excluded.net_minor},
+    ))
+
+def get_group_balances(db: Session, group_id: int) -> Dict[int, int]:
+    """
+    Net balance of every member in minor units, from the group_balances table.
+
+    Costs O(members) regardless of how many expenses the group has. Members
+    without any activity yet have no row and report 0.
+    """
+    balances = {user_id: 0 for user_id in get_group_member_ids(db, group_id)}
+    balances.update(db.execute(_group_balances, {"group_id": group_id}).all())
+    return balances
+
+def compute_group_balances(db: Session, group_id: int) -> Dict[int, int]:
+    """Balances aggregated from every expense, share and settlement of the group"""
+    params = {"group_id": group_id}
+    balances: Dict[int, int] = defaultdict(int)
+    for statement, sign in (
+        (_paid_by_member, 1), (_owed_by_member, -1), (_settled_by_member, 1), (_settled_to_member, -1)
+    ):
+        for user_id, amount in db.execute(statement, params):
+            balances[user_id] += sign * amount
+    return {user_id: amount for user_id, amount in balances.items() if amount}
+
+def find_balance_drift(db: Session, group_id: int) -> Dict[int, int]:
+    """Members whose stored balance differs from the recomputed one, with the difference"""
+    stored = {
+        user_id: amount
+        for user_id, amount in db.execute(_group_balances, {"group_id": group_id})
+        if amount
+    }
+    computed = compute_group_balances(db, group_id)
+    return {
+        user_id: stored.get(user_id, 0) - computed.get(user_id, 0)
+        for user_id in stored.keys() | computed.keys()
+        if stored.get(user_id, 0) != computed.get(user_id, 0)
+    }
+
+def rebuild_group_balances(db: Session, group_id: int) -> None:
+    """Replace the stored balances of a group with recomputed ones"""
+    # Writers hold the group row lock while they record events; wait for them
+    db.execute(_lock_group.with_for_update(), {"group_id": group_id})
+    db.execute(delete(GroupBalance).where(GroupBalance.group_id == group_id))
+    rows = [
+        {"group_id": group_id, "user_id": user_id, "net_minor": amount}
+        for user_id, amount in sorted(compute_group_balances(db, group_id).items())
+    ]
+    if rows:
+        db.execute(insert(GroupBalance), rows)
+    db.commit()
+
+def _group_ids(db: Session, group_ids: Optional[Iterable[int]]) -> List[int]:
+    if group_ids:
+        return list(group_ids)
+    return list(db.scalars(select(Group.id).order_by(Group.id)))
+
+if __name__ == "__main__":
+    # python -m app.services.balances verify|rebuild [group_id ...]
+    from app.db.session import SessionLocal
+
+    command, group_ids = sys.argv[1], [int(arg) for arg in sys.argv[2:]]
+    if command not in ("verify", "rebuild"):
+        sys.exit("usage: python -m app.services.balances verify|rebuild [group_id ...]")
+
+    drifted = 0
+    with SessionLocal() as db:
+        for group_id in _group_ids(db, group_ids):
+            drift = find_balance_drift(db, group_id)
+            if not drift:
+                continue
+            drifted += 1
+            print(f"group {group_id}: drift {drift}")
+            if command == "rebuild":
+                rebuild_group_balances(db, group_id)
+                print(f"group {group_id}: rebuilt")
+    print(f"{drifted} groups with drift")
+    if command == "verify" and drifted:
+        sys.exit(1)
@@ -0,0 +1,151 @@
+import base64
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import anyio
+from sqlalchemy.orm import Session
+from starlette.types import ASGIApp, Message, Scope
+
+from app.core.config import settings
+from app.models.user import User
+from app.schemas.batch import BatchSubRequest
+
+logger = logging.getLogger(__name__)
+
+# Never taken from the batch request: sub-requests send their own
+_DROPPED_HEADERS = {b"content-length", b"content-type", b"accept-encoding", b"if-none-match", b"if-match"}
+
+def _waves(requests: List[BatchSubRequest]) -> List[List[int]]:
+    """Indexes grouped into runs of reads, which may run together, and single writes"""
+    waves: List[List[int]] = []
+    for i, request in enumerate(requests):
+        if request.read_only and waves and requests[waves[-1][0]].read_only:
+            waves[-1].append(i)
+        else:
+            waves.append([i])
+    return waves
+
+def _scope(parent: Scope, api_root: str, request: BatchSubRequest, state: Dict[str, Any]) -> Tuple[Scope, bytes]:
+    url = urlsplit(request.path)
+    path = api_root + url.path
+    headers = [(name, value) for name, value in parent["headers"] if name not in _DROPPED_HEADERS]
+    headers += [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in request.headers.items()
+                if name.lower() != "authorization"]
+    body = b""
+    if request.body is not None:
+        body = json.dumps(request.body).encode()
+        headers += [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    scope = {
+        "type": "http",
+        "asgi": parent.get("asgi", {"version": "3.0"}),
+        "http_version": parent.get("http_version", "1.1"),
+        "method": request.method,
+        "scheme": parent.get("scheme", "http"),
+        "server": parent.get("server"),
+        "client": parent.get("client"),
+        "root_path": parent.get("root_path", ""),
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": url.query.encode(),
+        "headers": headers,
+        "state": state,
+    }
+    return scope, body
+
+def _decode_body(headers: Dict[str, str], body: bytes) -> Dict[str, Any]:
+    content_type = headers.get("content-type", "")
+    if not body:
+        return {"body": None}
+    if content_type.startswith("application/json"):
+        return {"body": json.loads(body)}
+    try:
+        return {"body": body.decode()}
+    except UnicodeDecodeError:
+        return {"body": base64.b64encode(body).decode(), "encoding": "base64"}
+
+async def call_app(app: ASGIApp, scope: Scope, body: bytes, timeout: Optional[float]) -> Dict[str, Any]:
+    """
+    Run one request through `app` in process and collect its response.
+
+    A sync endpoint's thread cannot be cancelled: the timeout only fires
+    once it has finished, so it is only meant for reads.
+    """
+    status_code: Optional[int] = None
+    headers: Dict[str, str] = {}
+    chunks: List[bytes] = []
+    body_sent = False
+
+    async def receive() -> Message:
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # The "client" stays connected until the response is complete
+        await anyio.sleep_forever()
+
+    async def send(message: Message) -> None:
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+            for name, value in message.get("headers", []):
+                headers[name.decode("latin-1")] = value.decode("latin-1")
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        with anyio.fail_after(timeout):  # None: no limit
+            await app(scope, receive, send)
+    except TimeoutError:
+        return {"status": 504, "headers": {}, "body": {"detail": "Sub-request timed out"}}
+    except Exception:
+        # ServerErrorMiddleware has already sent the 500 when it re-raises
+        logger.exception(f"Batch sub-request {scope['method']} {scope['path']} failed")
+        if status_code is None:
+            return {"status": 500, "headers": {}, "body": {"detail": "Internal Server Error"}}
+
+    headers.pop("content-length", None)
+    return {"status": status_code, "headers": headers, **_decode_body(headers, b"".join(chunks))}
+
+async def run_batch(
+    app: ASGIApp, parent: Scope, api_root: str, requests: List[BatchSubRequest], user: User, db: Session
+) -> List[Dict[str, Any]]:
+    """
+    Run sub-requests against `app` in process, as `user`.
+
+    Sub-requests reuse the batch's authentication instead of decoding the
+    token and loading the user again. Writes run one at a time, in order,
+    on the batch's own session; each run of consecutive reads between them
+    runs concurrently, up to BATCH_READ_CONCURRENCY at once, each read on a
+    session of its own since sessions cannot be shared between threads.
+    """
+    responses: List[Optional[Dict[str, Any]]] = [None] * len(requests)
+    limiter = anyio.CapacityLimiter(settings.BATCH_READ_CONCURRENCY)
+
+    async def run(i: int, share_session: bool) -> None:
+        state = {"batch_user": user}
+        if share_session:
+            state["batch_db"] = db
+        scope, body = _scope(parent, api_root, requests[i], state)
+        # A write that outlasted the timeout may well have committed; report what it did
+        timeout = settings.BATCH_SUBREQUEST_TIMEOUT_SECONDS if requests[i].read_only else None
+        async with limiter:
+            responses[i] = await call_app(app, scope, body, timeout)
+        responses[i]["id"] = requests[i].id
+        if share_session and responses[i]["status"] >= 400 and db.in_transaction():
+            # Leave nothing half-written for the next sub-request; keep the user loaded
+            await anyio.to_thread.run_sync(_reset_session, db, user)
+
+    for wave in _waves(requests):
+        if len(wave) == 1:
+            await run(wave[0], share_session=True)
+            continue
+        async with anyio.create_task_group() as tasks:
+            for i in wave:
+                tasks.start_soon(run, i, False)
+    return responses
+
+def _reset_session(db: Session, user: User) -> None:
+    db.rollback()
+    db.refresh(user)
@@ -0,0 +1,177 @@
+import csv
+import io
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from decimal import Decimal, InvalidOperation, ROUND_HALF_EVEN
+from typing import Dict, Iterable, List, Optional, Sequence, TextIO, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import bindparam, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.writes import dialect_insert
+from app.models.exchange_rate import ExchangeRate
+
+# ISO 4217 minor-unit exponents that differ from the usual 2
+CURRENCY_EXPONENTS = {
+    "BIF": 0, "CLP": 0, "DJF": 0, "GNF": 0, "ISK": 0, "JPY": 0, "KMF": 0, "KRW": 0,
+    "PYG": 0, "RWF": 0, "UGX": 0, "VND": 0, "VUV": 0, "XAF": 0, "XOF": 0, "XPF": 0,
+    "BHD": 3, "IQD": 3, "JOD": 3, "KWD": 3, "LYD": 3, "OMR": 3, "TND": 3,
+}
+
+# Rows per upsert statement when loading rate files
+LOAD_CHUNK_SIZE = 1000
+
+# Latest rate of every currency published on or before :day
+_latest_dates = select(
+    ExchangeRate.currency, func.max(ExchangeRate.rate_date).label("rate_date")
+).where(ExchangeRate.rate_date <= bindparam("day")).group_by(ExchangeRate.currency).subquery()
+_rates_as_of = select(ExchangeRate.currency, ExchangeRate.rate).join(
+    _latest_dates,
+    (ExchangeRate.currency == _latest_dates.c.currency) & (ExchangeRate.rate_date == _latest_dates.c.rate_date)
+)
+
+def minor_exponent(currency: str) -> int:
+    return CURRENCY_EXPONENTS.get(currency, 2)
+
+def format_minor(amount_minor: int, currency: str) -> str:
+    """Minor units as a plain decimal amount, e.g. 1050 EUR -> "10.50" """
+    exponent = minor_exponent(currency)
+    return f"{Decimal(amount_minor).scaleb(-exponent):.{exponent}f}"
+
+class RateCache:
+    """
+    In-memory rate tables, one per day, least recently used evicted first.
+
+    A day's table holds every currency's latest rate on or before that day,
+    so converting any number of amounts for one day costs at most one query.
+    Today's rates can still be uploaded, possibly through another worker,
+    so tables for today or later are reloaded after `current_ttl` seconds.
+    """
+
+    def __init__(self, max_days: int, current_ttl: float = 300.0):
+        self.max_days = max_days
+        self.current_ttl = current_ttl
+        self._days: "OrderedDict[date, Tuple[float, Dict[str, Decimal]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def rates_for(self, db: Session, day: date) -> Dict[str, Decimal]:
+        now = time.monotonic()
+        with self._lock:
+            cached = self._days.get(day)
+            if cached is not None and (day < date.today() or now - cached[0] < self.current_ttl):
+                self._days.move_to_end(day)
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+
+        rates = {currency: rate for currency, rate in db.execute(_rates_as_of, {"day": day})}
+        rates[settings.FX_BASE_CURRENCY] = Decimal(1)
+        with self._lock:
+            self._days[day] = (now, rates)
+            self._days.move_to_end(day)
+            while len(self._days) > self.max_days:
+                self._days.popitem(last=False)
+        return rates
+
+    def clear(self) -> None:
+        with self._lock:
+            self._days.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"days": len(self._days), "hits": self.hits, "misses": self.misses}
+
+rate_cache = RateCache(settings.FX_RATE_CACHE_DAYS)
+
+def exchange_rate(rates: Dict[str, Decimal], source: str, target: str, day: date) -> Decimal:
+    """Units of `target` per unit of `source`"""
+    for currency in (source, target):
+        if currency not in rates:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"No exchange rate for {currency} on or before {day.isoformat()}"
+            )
+    return rates[target] / rates[source]
+
+def convert_minor(amount_minor: int, source: str, target: str, rate: Decimal) -> int:
+    """Convert minor units of `source` to minor units of `target`, rounding half to even"""
+    scale = Decimal(10) ** (minor_exponent(target) - minor_exponent(source))
+    return int((Decimal(amount_minor) * rate * scale).quantize(Decimal(1), rounding=ROUND_HALF_EVEN))
+
+def convert_amounts(
+    db: Session, amounts: Sequence[Tuple[int, str]], target: str, day: Optional[date] = None
+) -> List[Tuple[int, Decimal]]:
+    """
+    Convert a batch of (amount_minor, currency) pairs to `target` at one day's rates.
+
+    Returns (converted amount_minor, rate used) per input, in order. The whole
+    batch shares a single rate table, and each currency pair's rate is only
+    computed once.
+    """
+    day = day or date.today()
+    rates = None
+    pair_rates: Dict[str, Decimal] = {target: Decimal(1)}
+    converted = []
+    for amount_minor, currency in amounts:
+        if currency not in pair_rates:
+            if rates is None:
+                rates = rate_cache.rates_for(db, day)
+            pair_rates[currency] = exchange_rate(rates, currency, target, day)
+        rate = pair_rates[currency]
+        converted.append((convert_minor(amount_minor, currency, target, rate), rate))
+    return converted
+
+def parse_rates_csv(source: TextIO) -> List[Dict]:
+    """
+    Parse `date,currency,rate` rows (header optional); rate is units per base currency.
+
+    Raises ValueError naming the first bad line.
+    """
+    rows = []
+    for line_number, row in enumerate(csv.reader(source), start=1):
+        if not row or (line_number == 1 and row[0].strip().lower() == "date"):
+            continue
+        try:
+            rate_date, currency, rate = (value.strip() for value in row)
+            rate_value = Decimal(rate)
+            if rate_value <= 0 or len(currency) != 3:
+                raise ValueError
+            rows.append({
+                "rate_date": date.fromisoformat(rate_date),
+                "currency": currency.upper(),
+                "rate": rate_value,
+            })
+        except (ValueError, InvalidOperation):
+            raise ValueError(f"Invalid exchange rate on line {line_number}: {','.join(row)}")
+    return rows
+
+def store_rates(db: Session, rows: Iterable[Dict]) -> int:
+    """Insert or replace rates in chunks, then drop cached tables; returns rows written"""
+    rows = list(rows)
+    for i in range(0, len(rows), LOAD_CHUNK_SIZE):
+        statement = dialect_insert(db, ExchangeRate).values(rows[i:i + LOAD_CHUNK_SIZE])
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[ExchangeRate.rate_date, ExchangeRate.currency],
+            set_={"rate": statement.excluded.rate},
+        ))
+    db.commit()
+    # Past days may have changed too, so every cached table is stale
+    rate_cache.clear()
+    return len(rows)
+
+def load_rates_file(db: Session, content: str) -> int:
+    return store_rates(db, parse_rates_csv(io.StringIO(content)))
+
+if __name__ == "__main__":
+    # python -m app.services.currency rates.csv
+    from app.db.session import SessionLocal
+
+    with open(sys.argv[1], newline="") as f, SessionLocal() as db:
+        written = store_rates(db, parse_rates_csv(f))
+    print(f"Loaded {written} exchange rates")
@@ -0,0 +1,154 @@
+import abc
+import asyncio
+import importlib
+import logging
+import threading
+from typing import Any, Dict, Optional, Set
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+def group_topic(group_id: int) -> str:
+    return f"group:{group_id}"
+
+class Subscription:
+    """
+    One consumer's bounded queue of events.
+
+    Iterate with `next_event`. When the queue overflows the subscription is
+    evicted: it is closed, its backlog dropped, and `evicted` is set, so a
+    slow client cannot make the broker buffer without limit.
+    """
+
+    def __init__(self, broker: "Broker", topic: str, max_queue: int):
+        self.broker = broker
+        self.topic = topic
+        self.loop = asyncio.get_running_loop()
+        self.queue: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue(maxsize=max_queue)
+        self.closed = False
+        self.evicted = False
+
+    def _deliver(self, event: Dict[str, Any]) -> None:
+        # Runs on the subscriber's event loop
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.evicted = True
+            self.broker._evict(self)
+
+    def _close_now(self) -> None:
+        self.closed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)  # Wakes a waiting reader
+
+    async def next_event(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """The next event, or None on timeout or once the subscription is closed"""
+        if self.closed and self.queue.empty():
+            return None
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self.broker.unsubscribe(self)
+
+class Broker(abc.ABC):
+    """
+    Publish/subscribe interface for pushing group events to connected clients.
+
+    `publish` may be called from any thread (sync endpoints run in a
+    threadpool); `subscribe` must be called from the event loop that will
+    consume the events. A multi-worker deployment can replace the in-process
+    implementation with one backed by a shared bus by pointing
+    EVENT_BROKER_CLASS at a subclass.
+    """
+
+    @abc.abstractmethod
+    def publish(self, topic: str, event: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def has_subscribers(self, topic: str) -> bool:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def subscribe(self, topic: str) -> Subscription:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def unsubscribe(self, subscription: Subscription) -> None:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def _evict(self, subscription: Subscription) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, int]:
+        return {}
+
+class InProcessBroker(Broker):
+    """Delivers events to subscribers of this process only"""
+
+    def __init__(self, max_queue: int):
+        self.max_queue = max_queue
+        self._topics: Dict[str, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+        self.published = 0
+        self.evicted = 0
+
+    def publish(self, topic: str, event: Dict[str, Any]) -> None:
+        with self._lock:
+            subscriptions = list(self._topics.get(topic, ()))
+            self.published += 1
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._deliver, event)
+            except RuntimeError:
+                # The subscriber's loop has shut down
+                self.unsubscribe(subscription)
+
+    def has_subscribers(self, topic: str) -> bool:
+        return bool(self._topics.get(topic))
+
+    def subscribe(self, topic: str) -> Subscription:
+        subscription = Subscription(self, topic, self.max_queue)
+        with self._lock:
+            self._topics.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._topics.get(subscription.topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._topics[subscription.topic]
+        subscription.closed = True
+
+    def _evict(self, subscription: Subscription) -> None:
+        logger.warning(f"Evicting slow subscriber of {subscription.topic}")
+        self.unsubscribe(subscription)
+        with self._lock:
+            self.evicted += 1
+        subscription._close_now()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "topics": len(self._topics),
+                "subscribers": sum(len(subscribers) for subscribers in self._topics.values()),
+                "published": self.published,
+                "evicted": self.evicted,
+            }
+
+def _create_broker() -> Broker:
+    module_name, _, class_name = settings.EVENT_BROKER_CLASS.rpartition(".")
+    broker_class = getattr(importlib.import_module(module_name), class_name)
+    return broker_class(max_queue=settings.EVENT_STREAM_QUEUE_SIZE)
+
+broker: Broker = _create_broker()
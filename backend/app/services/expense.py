@@ -0,0 +1,294 @@
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Set, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import bindparam, func, select
+from sqlalchemy.orm import Session
+
+from app.models.expense import Expense, ExpenseShare
+from app.models.group import Group
+from app.models.settlement import Settlement
+from app.schemas.group import ExpenseCreate, SettlementCreate
+from app.services.analytics import RollupDeltas, apply_rollup_deltas, expense_rollup_deltas
+from app.services.balances import (
+    apply_balance_deltas, expense_deltas, get_group_balances, merge_deltas, settlement_deltas
+)
+from app.services.currency import convert_amounts
+from app.services.group import get_group_member_ids, require_members
+from app.services.ledger import PendingEvent, expense_payload, record_events, settlement_payload
+from app.services.split_engine import largest_remainder
+
+# Pages and totals are served by the (group_id, created_at) indexes
+_group_expenses = select(Expense).where(
+    Expense.group_id == bindparam("group_id")
+).order_by(Expense.created_at.desc(), Expense.id.desc()).offset(bindparam("skip")).limit(bindparam("limit"))
+_group_settlements = select(Settlement).where(
+    Settlement.group_id == bindparam("group_id")
+).order_by(Settlement.created_at.desc(), Settlement.id.desc()).offset(bindparam("skip")).limit(bindparam("limit"))
+_group_expense_totals = select(
+    func.count(Expense.id), func.coalesce(func.sum(Expense.amount_minor), 0)
+).where(Expense.group_id == bindparam("group_id"))
+
+def split_equally(amount_minor: int, user_ids: List[int]) -> Dict[int, int]:
+    """Equal shares in minor units; the first `remainder` members carry one extra unit"""
+    base, remainder = divmod(amount_minor, len(user_ids))
+    return {user_id: base + (1 if i < remainder else 0) for i, user_id in enumerate(sorted(user_ids))}
+
+def _resolve_shares(expense_in: ExpenseCreate, paid_by: int, member_ids: Set[int]) -> Dict[int, int]:
+    """
+    Validated shares by user id, in the expense's own currency: the explicit
+    ones, or an equal split between all members.
+    """
+    if expense_in.shares:
+        shares = {}
+        for share in expense_in.shares:
+            if share.user_id in shares:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Duplicate share for user {share.user_id}"
+                )
+            shares[share.user_id] = share.amount_minor
+        if sum(shares.values()) != expense_in.amount_minor:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Shares must add up to the expense amount"
+            )
+    else:
+        shares = split_equally(expense_in.amount_minor, list(member_ids))
+
+    missing = (set(shares) | {paid_by}) - member_ids
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Users are not members of this group: {sorted(missing)}"
+        )
+    return shares
+
+def check_expense(db: Session, group: Group, expense_in: ExpenseCreate, paid_by: int) -> None:
+    """Validate an expense without creating it, e.g. a recurring template"""
+    _resolve_shares(expense_in, paid_by, set(get_group_member_ids(db, group.id)))
+
+def _is_foreign(group: Group, expense_in: ExpenseCreate) -> bool:
+    return bool(expense_in.currency) and expense_in.currency != group.currency
+
+def _in_group_currency(
+    expense_in: ExpenseCreate, shares: Dict[int, int], conversion: Optional[Tuple[int, Decimal]]
+) -> Tuple[Dict[str, Any], Dict[int, int]]:
+    """Expense columns and shares in the group currency, recording the rate used"""
+    if conversion is None:
+        values = {"amount_minor": expense_in.amount_minor, "original_amount_minor": None,
+                  "original_currency": None, "fx_rate": None}
+        return values, shares
+    amount_minor, rate = conversion
+    values = {"amount_minor": amount_minor, "original_amount_minor": expense_in.amount_minor,
+              "original_currency": expense_in.currency, "fx_rate": rate}
+    # Shares keep their proportions and still add up exactly after conversion
+    return values, dict(zip(shares, largest_remainder(amount_minor, list(shares.values()))))
+
+def _convert(
+    db: Session, group: Group, expenses_in: List[ExpenseCreate], days: Optional[List[date]] = None
+) -> List[Optional[Tuple[int, Decimal]]]:
+    """
+    Conversions for every foreign-currency expense of a batch, one pass per
+    day: each expense's entry in `days`, or today's rates
+    """
+    foreign_by_day: Dict[Optional[date], List[int]] = {}
+    for i, expense_in in enumerate(expenses_in):
+        if _is_foreign(group, expense_in):
+            foreign_by_day.setdefault(days[i] if days else None, []).append(i)
+    conversions: List[Optional[Tuple[int, Decimal]]] = [None] * len(expenses_in)
+    for day, foreign in foreign_by_day.items():
+        converted = convert_amounts(
+            db, [(expenses_in[i].amount_minor, expenses_in[i].currency) for i in foreign], group.currency, day
+        )
+        for i, conversion in zip(foreign, converted):
+            conversions[i] = conversion
+    return conversions
+
+def _share_amounts(expense: Expense) -> Dict[int, int]:
+    return {share.user_id: share.amount_minor for share in expense.shares}
+
+def _get_own_expense(db: Session, group_id: int, expense_id: int, user_id: int) -> Expense:
+    expense = db.get(Expense, expense_id)
+    if expense is None or expense.group_id != group_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Expense not found")
+    if user_id not in (expense.created_by, expense.paid_by):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only the creator or payer can change an expense"
+        )
+    return expense
+
+def add_expenses(
+    db: Session,
+    group: Group,
+    expenses_in: List[ExpenseCreate],
+    created_by: int,
+    occurrences: Optional[List[Tuple[int, date]]] = None,
+) -> List[Expense]:
+    """
+    Add a batch of expenses to the session, with their ledger events and
+    balance changes; the caller commits.
+
+    Membership is checked against one member list, foreign amounts are
+    converted together and balances move with a single upsert.
+    `occurrences` gives the (recurring_id, occurrence_on) of each expense
+    posted by a recurring template; those are converted at the rates of
+    their occurrence days.
+    """
+    member_ids = set(get_group_member_ids(db, group.id))
+    conversions = _convert(db, group, expenses_in, [day for _, day in occurrences] if occurrences else None)
+
+    expenses = []
+    shares_by_expense = []
+    deltas = []
+    for i, (expense_in, conversion) in enumerate(zip(expenses_in, conversions)):
+        paid_by = expense_in.paid_by or created_by
+        values, shares = _in_group_currency(expense_in, _resolve_shares(expense_in, paid_by, member_ids), conversion)
+        if occurrences:
+            values["recurring_id"], values["occurrence_on"] = occurrences[i]
+        expenses.append(Expense(
+            group_id=group.id,
+            paid_by=paid_by,
+            created_by=created_by,
+            description=expense_in.description,
+            category=expense_in.category,
+            currency=group.currency,
+            shares=[
+                ExpenseShare(group_id=group.id, user_id=user_id, amount_minor=amount)
+                for user_id, amount in shares.items()
+            ],
+            **values,
+        ))
+        shares_by_expense.append(shares)
+        deltas.append(expense_deltas(paid_by, values["amount_minor"], shares))
+
+    db.add_all(expenses)
+    db.flush()  # Assigns ids for the ledger and creation times for the rollups
+    record_events(db, group.id, created_by, [
+        PendingEvent("expense_created", expense.id, expense_payload(expense, shares), expense_delta)
+        for expense, shares, expense_delta in zip(expenses, shares_by_expense, deltas)
+    ])
+    apply_balance_deltas(db, group.id, merge_deltas(*deltas))
+    rollups: RollupDeltas = {}
+    for expense in expenses:
+        expense_rollup_deltas(expense, deltas=rollups)
+    apply_rollup_deltas(db, rollups)
+    return expenses
+
+def create_expenses(db: Session, group: Group, expenses_in: List[ExpenseCreate], created_by: int) -> List[Expense]:
+    """Create a batch of expenses in one transaction"""
+    expenses = add_expenses(db, group, expenses_in, created_by)
+    db.commit()
+    return expenses
+
+def create_expense(db: Session, group: Group, expense_in: ExpenseCreate, created_by: int) -> Expense:
+    return create_expenses(db, group, [expense_in], created_by)[0]
+
+def update_expense(db: Session, group: Group, expense_id: int, expense_in: ExpenseCreate, user_id: int) -> Expense:
+    """Replace an expense's amount, payer and shares; balances move by the difference"""
+    expense = _get_own_expense(db, group.id, expense_id, user_id)
+    paid_by = expense_in.paid_by or expense.paid_by
+    if _is_foreign(group, expense_in) and (expense_in.amount_minor, expense_in.currency) == (
+        expense.original_amount_minor, expense.original_currency
+    ):
+        # The foreign amount is unchanged: keep the rate it was recorded at
+        conversion = (expense.amount_minor, expense.fx_rate)
+    else:
+        [conversion] = _convert(db, group, [expense_in])
+    values, shares = _in_group_currency(
+        expense_in, _resolve_shares(expense_in, paid_by, set(get_group_member_ids(db, group.id))), conversion
+    )
+
+    deltas = merge_deltas(
+        expense_deltas(expense.paid_by, expense.amount_minor, _share_amounts(expense), sign=-1),
+        expense_deltas(paid_by, values["amount_minor"], shares),
+    )
+    rollups = expense_rollup_deltas(expense, sign=-1)
+    existing = {share.user_id: share for share in expense.shares}
+    expense.shares = [
+        existing[user_id] if user_id in existing else ExpenseShare(group_id=group.id, user_id=user_id)
+        for user_id in shares
+    ]
+    for share in expense.shares:
+        share.amount_minor = shares[share.user_id]
+    expense.paid_by = paid_by
+    expense.description = expense_in.description
+    expense.category = expense_in.category
+    for key, value in values.items():
+        setattr(expense, key, value)
+
+    record_events(db, group.id, user_id, [
+        PendingEvent("expense_updated", expense.id, expense_payload(expense, shares), deltas)
+    ])
+    apply_balance_deltas(db, group.id, deltas)
+    apply_rollup_deltas(db, expense_rollup_deltas(expense, deltas=rollups))
+    db.commit()
+    return expense
+
+def get_expenses(db: Session, group_id: int, skip: int = 0, limit: int = 50) -> List[Expense]:
+    """Expenses of a group, newest first"""
+    return list(db.scalars(_group_expenses, {"group_id": group_id, "skip": skip, "limit": limit}))
+
+def delete_expense(db: Session, group_id: int, expense_id: int, user_id: int) -> Expense:
+    expense = _get_own_expense(db, group_id, expense_id, user_id)
+    shares = _share_amounts(expense)
+    deltas = expense_deltas(expense.paid_by, expense.amount_minor, shares, sign=-1)
+    record_events(db, group_id, user_id, [
+        PendingEvent("expense_deleted", expense.id, expense_payload(expense, shares), deltas)
+    ])
+    apply_balance_deltas(db, group_id, deltas)
+    apply_rollup_deltas(db, expense_rollup_deltas(expense, sign=-1))
+    db.delete(expense)
+    db.commit()
+    return expense
+
+def create_settlement(db: Session, group: Group, settlement_in: SettlementCreate, created_by: int) -> Settlement:
+    from_user_id = settlement_in.from_user_id or created_by
+    if from_user_id == settlement_in.to_user_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A settlement needs two different members"
+        )
+    if created_by not in (from_user_id, settlement_in.to_user_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only the payer or recipient can record a settlement"
+        )
+    require_members(db, group.id, {from_user_id, settlement_in.to_user_id})
+
+    settlement = Settlement(
+        group_id=group.id,
+        from_user_id=from_user_id,
+        to_user_id=settlement_in.to_user_id,
+        amount_minor=settlement_in.amount_minor,
+        currency=group.currency,
+        created_by=created_by,
+    )
+    db.add(settlement)
+    db.flush()
+    deltas = settlement_deltas(from_user_id, settlement_in.to_user_id, settlement_in.amount_minor)
+    record_events(db, group.id, created_by, [
+        PendingEvent("settlement_created", settlement.id, settlement_payload(settlement), deltas)
+    ])
+    apply_balance_deltas(db, group.id, deltas)
+    db.commit()
+    return settlement
+
+def get_settlements(db: Session, group_id: int, skip: int = 0, limit: int = 50) -> List[Settlement]:
+    """Settlements of a group, newest first"""
+    return list(db.scalars(_group_settlements, {"group_id": group_id, "skip": skip, "limit": limit}))
+
+def get_group_summary(db: Session, group: Group) -> dict:
+    expense_count, total_minor = db.execute(_group_expense_totals, {"group_id": group.id}).one()
+    balances = get_group_balances(db, group.id)
+    return {
+        "group_id": group.id,
+        "currency": group.currency,
+        "expense_count": expense_count,
+        "total_minor": total_minor,
+        "balances": [
+            {"user_id": user_id, "balance_minor": balance}
+            for user_id, balance in sorted(balances.items())
+        ],
+    }
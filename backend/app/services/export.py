@@ -0,0 +1,328 @@
+import csv
+import glob
+import io
+import logging
+import math
+import os
+import re
+import sys
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import String, bindparam, cast, func, literal, null, select, union_all
+from sqlalchemy.engine import Engine, Row
+from sqlalchemy.orm import Session, aliased
+
+from app.core.config import settings
+from app.models.expense import Expense
+from app.models.group import Group
+from app.models.settlement import Settlement
+from app.models.user import User
+from app.services.currency import format_minor
+from app.services.pdf import PdfWriter
+
+logger = logging.getLogger(__name__)
+
+CSV_COLUMNS = [
+    "date", "type", "id", "description", "category", "paid_by", "paid_to",
+    "amount", "currency", "original_amount", "original_currency",
+]
+
+_payer, _from_user, _to_user = aliased(User), aliased(User), aliased(User)
+
+_expense_rows = select(
+    Expense.created_at.label("occurred_at"),
+    literal("expense", String).label("kind"),
+    Expense.id,
+    Expense.description,
+    Expense.category,
+    func.coalesce(_payer.username, _payer.email).label("paid_by"),
+    cast(null(), String).label("paid_to"),
+    Expense.amount_minor,
+    Expense.currency,
+    Expense.original_amount_minor,
+    Expense.original_currency,
+).join(_payer, _payer.id == Expense.paid_by).where(Expense.group_id == bindparam("group_id"))
+
+_settlement_rows = select(
+    Settlement.created_at.label("occurred_at"),
+    literal("settlement", String).label("kind"),
+    Settlement.id,
+    cast(null(), String).label("description"),
+    cast(null(), String).label("category"),
+    func.coalesce(_from_user.username, _from_user.email).label("paid_by"),
+    func.coalesce(_to_user.username, _to_user.email).label("paid_to"),
+    Settlement.amount_minor,
+    Settlement.currency,
+    cast(null(), Settlement.amount_minor.type).label("original_amount_minor"),
+    cast(null(), String).label("original_currency"),
+).join(_from_user, _from_user.id == Settlement.from_user_id).join(
+    _to_user, _to_user.id == Settlement.to_user_id
+).where(Settlement.group_id == bindparam("group_id"))
+
+_statement_union = union_all(_expense_rows, _settlement_rows).subquery()
+_statement = select(_statement_union).order_by(
+    _statement_union.c.occurred_at, _statement_union.c.kind, _statement_union.c.id
+)
+
+_statement_length = select(
+    select(func.count()).where(Expense.group_id == bindparam("group_id")).scalar_subquery()
+    + select(func.count()).where(Settlement.group_id == bindparam("group_id")).scalar_subquery()
+)
+
+_group_header = select(Group.name, Group.currency, Group.ledger_version).where(Group.id == bindparam("group_id"))
+
+def open_snapshot(bind: Engine) -> Session:
+    """
+    Session for reading a whole statement.
+
+    On PostgreSQL the transaction runs at REPEATABLE READ, so the ledger
+    version and every row come from one snapshot however long the export
+    streams; the caller closes the session.
+    """
+    db = Session(bind=bind, expire_on_commit=False)
+    if bind.dialect.name == "postgresql":
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    return db
+
+def snapshot_version(db: Session, group_id: int) -> Optional[int]:
+    row = db.execute(_group_header, {"group_id": group_id}).first()
+    return row.ledger_version if row else None
+
+def cache_path(group_id: int, version: int, fmt: str) -> str:
+    return os.path.join(settings.EXPORT_CACHE_DIR, f"group-{group_id}-v{version}.{fmt}")
+
+def cached_export(group_id: int, version: int, fmt: str) -> Optional[str]:
+    """Path of the export for this ledger version, if one has been written"""
+    path = cache_path(group_id, version, fmt)
+    return path if os.path.exists(path) else None
+
+class _CacheFile:
+    """A cache entry being written; becomes visible only once complete"""
+
+    def __init__(self, group_id: int, version: int, fmt: str):
+        self.group_id, self.version, self.fmt = group_id, version, fmt
+        os.makedirs(settings.EXPORT_CACHE_DIR, exist_ok=True)
+        fd, self.temp_path = tempfile.mkstemp(dir=settings.EXPORT_CACHE_DIR, suffix=".partial")
+        self.file = os.fdopen(fd, "wb")
+
+    def commit(self) -> str:
+        self.file.close()
+        path = cache_path(self.group_id, self.version, self.fmt)
+        os.replace(self.temp_path, path)
+        # Older versions can never be served again
+        pattern = re.compile(rf"group-{self.group_id}-v(\d+)\.{self.fmt}$")
+        for other in glob.glob(os.path.join(settings.EXPORT_CACHE_DIR, f"group-{self.group_id}-v*.{self.fmt}")):
+            match = pattern.search(other)
+            if match and int(match.group(1)) < self.version:
+                try:
+                    os.remove(other)
+                except FileNotFoundError:
+                    pass
+        return path
+
+    def discard(self) -> None:
+        self.file.close()
+        try:
+            os.remove(self.temp_path)
+        except FileNotFoundError:
+            pass
+
+def _utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+def _spreadsheet_safe(text: Optional[str]) -> Optional[str]:
+    # Keep descriptions from being evaluated as formulas when opened in a spreadsheet
+    if text and text[0] in "=+-@\t\r":
+        return "'" + text
+    return text
+
+def _statement_partitions(db: Session, group_id: int, chunk_rows: int) -> Iterator[List[Row]]:
+    # yield_per streams from a server-side cursor where the driver has one
+    result = db.execute(_statement.execution_options(yield_per=chunk_rows), {"group_id": group_id})
+    for rows in result.partitions():
+        yield rows
+
+def csv_chunks(db: Session, group_id: int, version: int) -> Iterator[bytes]:
+    """
+    A group's statement as CSV, encoded a chunk of EXPORT_CHUNK_ROWS rows
+    at a time, read from the snapshot session `db`.
+
+    The output is also written to the cache under `version`; if the client
+    goes away before the end, the partial file is removed.
+    """
+    cache = _CacheFile(group_id, version, "csv")
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    completed = False
+    try:
+        writer.writerow(CSV_COLUMNS)
+        for rows in _statement_partitions(db, group_id, settings.EXPORT_CHUNK_ROWS):
+            writer.writerows(
+                (
+                    _utc(row.occurred_at).isoformat(timespec="seconds"),
+                    row.kind,
+                    row.id,
+                    _spreadsheet_safe(row.description),
+                    row.category,
+                    _spreadsheet_safe(row.paid_by),
+                    _spreadsheet_safe(row.paid_to),
+                    format_minor(row.amount_minor, row.currency),
+                    row.currency,
+                    None if row.original_amount_minor is None
+                    else format_minor(row.original_amount_minor, row.original_currency),
+                    row.original_currency,
+                )
+                for row in rows
+            )
+            chunk = buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+            cache.file.write(chunk)
+            yield chunk
+        chunk = buffer.getvalue().encode()
+        if chunk:
+            cache.file.write(chunk)
+            yield chunk
+        cache.commit()
+        completed = True
+    finally:
+        if not completed:
+            cache.discard()
+        db.close()
+
+def _fit(text: Optional[str], width: int) -> str:
+    text = (text or "").replace("\n", " ")
+    return text if len(text) <= width else text[:width - 1] + "~"
+
+_PDF_COLUMNS = "{:<10} {:<10} {:<26} {:<14} {:<14} {:>14}"
+
+def render_pdf(db: Session, group_id: int) -> Optional[Tuple[int, str]]:
+    """
+    Write a group's statement as a paginated PDF to the cache; returns
+    (ledger version, path), or None if the group no longer exists.
+
+    Pages are written as they fill, so memory use does not depend on the
+    length of the history; the row count, read in the same snapshot,
+    numbers the pages.
+    """
+    header = db.execute(_group_header, {"group_id": group_id}).first()
+    if header is None:
+        return None
+    total_rows = db.scalar(_statement_length, {"group_id": group_id})
+
+    cache = _CacheFile(group_id, header.ledger_version, "pdf")
+    try:
+        pdf = PdfWriter(cache.file)
+        heading = [
+            f"{header.name} - statement",
+            f"Currency {header.currency}   Ledger version {header.ledger_version}   "
+            f"Generated {datetime.now(timezone.utc).isoformat(timespec='seconds')}",
+            "",
+            _PDF_COLUMNS.format("Date", "Type", "Description", "Paid by", "Paid to", "Amount"),
+            "-" * 93,
+        ]
+        rows_per_page = pdf.lines_per_page - len(heading) - 2
+        page_count = max(1, math.ceil(total_rows / rows_per_page))
+
+        page: List[str] = []
+        pages_written = 0
+
+        def flush_page() -> None:
+            nonlocal page, pages_written
+            pages_written += 1
+            footer = f"Page {pages_written} of {max(page_count, pages_written)}"
+            pdf.add_page(heading + page + ["", footer])
+            page = []
+
+        for rows in _statement_partitions(db, group_id, settings.EXPORT_CHUNK_ROWS):
+            for row in rows:
+                page.append(_PDF_COLUMNS.format(
+                    _utc(row.occurred_at).date().isoformat(),
+                    row.kind,
+                    _fit(row.description, 26),
+                    _fit(row.paid_by, 14),
+                    _fit(row.paid_to, 14),
+                    format_minor(row.amount_minor, row.currency),
+                ))
+                if len(page) == rows_per_page:
+                    flush_page()
+        if page or not pages_written:
+            flush_page()
+        pdf.close()
+        path = cache.commit()
+    except BaseException:
+        cache.discard()
+        raise
+    return header.ledger_version, path
+
+class ExportRenderer:
+    """
+    Renders PDF statements on a small thread pool so requests never wait
+    for them; a group already being rendered is not queued twice.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self.rendered = 0
+        self.failed = 0
+
+    def submit(self, bind: Engine, group_id: int) -> Future:
+        with self._lock:
+            future = self._pending.get(group_id)
+            if future is not None:
+                return future
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="export-renderer")
+            future = self._executor.submit(self._render, bind, group_id)
+            self._pending[group_id] = future
+            return future
+
+    def _render(self, bind: Engine, group_id: int) -> Optional[Tuple[int, str]]:
+        try:
+            with open_snapshot(bind) as db:
+                result = render_pdf(db, group_id)
+        except Exception:
+            with self._lock:
+                self.failed += 1
+                self._pending.pop(group_id, None)
+            logger.exception(f"Failed to render the statement of group {group_id}")
+            raise
+        with self._lock:
+            self.rendered += 1
+            self._pending.pop(group_id, None)
+        return result
+
+    def stop(self) -> None:
+        """Wait for renders in progress; queued ones are dropped"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        with self._lock:
+            self._pending.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"pending": len(self._pending), "rendered": self.rendered, "failed": self.failed}
+
+export_renderer = ExportRenderer(settings.EXPORT_PDF_WORKERS)
+
+if __name__ == "__main__":
+    # python -m app.services.export pdf <group_id>   (pre-render a statement)
+    from app.db.session import engine
+
+    if len(sys.argv) != 3 or sys.argv[1] != "pdf":
+        sys.exit("usage: python -m app.services.export pdf <group_id>")
+    with open_snapshot(engine) as db:
+        rendered = render_pdf(db, int(sys.argv[2]))
+    if rendered is None:
+        sys.exit("Group not found")
+    print(f"Wrote version {rendered[0]} to {rendered[1]}")
@@ -1,11 +1,54 @@
+import re
+import time
+from typing import Optional, Tuple
 from google.oauth2 import id_token
+from google.auth import transport
 from google.auth.transport import requests
 from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
 from app.core.config import settings
+from app.db.writes import insert_if_absent
+from app.models.user import User
+from app.services.user import get_user_by_google_id
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Where verify_oauth2_token fetches Google's signing certificates
+GOOGLE_CERTS_URL = "https://www.googleapis.com/oauth2/v1/certs"
+
+class CachingRequest(transport.Request):
+    """
+    google-auth transport that reuses GET responses while they are fresh.
+
+    verify_oauth2_token downloads Google's certificates on every call;
+    they change rarely and are served with a Cache-Control max-age of
+    hours, so caching them takes an HTTP round trip off every sign-in.
+    """
+
+    def __init__(self, inner: transport.Request):
+        self._inner = inner
+        self._cache = {}
+
+    def __call__(self, url, method="GET", body=None, headers=None, **kwargs):
+        if method != "GET" or body is not None:
+            return self._inner(url, method=method, body=body, headers=headers, **kwargs)
+        cached = self._cache.get(url)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        response = self._inner(url, method=method, headers=headers, **kwargs)
+        match = re.search(r"max-age=(\d+)", response.headers.get("cache-control", ""))
+        if response.status == 200 and match:
+            self._cache[url] = (time.monotonic() + int(match.group(1)), response)
+        return response
+
+google_request = CachingRequest(requests.Request())
+
+def warm_google_certs() -> None:
+    """Fetch Google's certificates ahead of the first sign-in"""
+    google_request(GOOGLE_CERTS_URL, timeout=10)
+
 def verify_google_token(token: str) -> dict:
     """
     Verify a Google ID token and return user information using Google Auth Library.
@@ -13,11 +56,8 @@ def verify_google_token(token: str) -> dict:
     This is the recommended approach for production environments.
     """
     try:
-        # Create a request adapter for Google Auth
-        request = requests.Request()
-        
         # Verify the token - the library verifies that the token is properly signed by Google
-        id_info = id_token.verify_oauth2_token(token, request)
+        id_info = id_token.verify_oauth2_token(token, google_request)
         
         # Verify issuer
         if id_info['iss'] not in ['accounts.google.com', 'https://accounts.google.com']:
@@ -43,4 +83,50 @@ def verify_google_token(token: str) -> dict:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error verifying Google token: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+def find_or_create_google_user(
+    db: Session,
+    google_id: str,
+    email: Optional[str],
+    full_name: Optional[str],
+    register_if_not_exists: bool = True,
+    username: Optional[str] = None
+) -> Tuple[Optional[User], bool]:
+    """
+    Find a user by Google ID, or create one on a first login.
+    Returns: (user, user_existed)
+    """
+    db_user = get_user_by_google_id(db, google_id)
+    if db_user:
+        return db_user, True
+    if not (register_if_not_exists and username):
+        return None, False
+    
+    # INSERT ... ON CONFLICT (google_id) DO NOTHING: two simultaneous first
+    # logins both succeed, the loser reads the winner's row below
+    try:
+        db_user = insert_if_absent(db, User, {
+            "username": username,
+            "email": email,
+            "google_id": google_id,
+            "full_name": full_name,
+            "auth_providers": ["google"],
+            "is_verified": True,
+            "profile_completed": bool(username and full_name),
+        }, index_elements=["google_id"])
+    except IntegrityError:
+        db.rollback()
+        db_user = None
+    else:
+        if db_user:
+            db.commit()
+            return db_user, False
+    db_user = get_user_by_google_id(db, google_id)
+    if db_user:
+        return db_user, True
+    # The username or email belongs to a different account
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Username or email already exists"
+    )
@@ -0,0 +1,77 @@
+from typing import List, Set
+from fastapi import HTTPException, status
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import Session
+
+from app.db.writes import insert_if_absent
+from app.models.group import Group, GroupMember
+from app.schemas.group import GroupCreate
+from app.services.user import get_user
+
+_group_for_member = select(Group).join(GroupMember, GroupMember.group_id == Group.id).where(
+    Group.id == bindparam("group_id"),
+    GroupMember.user_id == bindparam("user_id")
+)
+_groups_for_user = select(Group).join(GroupMember, GroupMember.group_id == Group.id).where(
+    GroupMember.user_id == bindparam("user_id")
+).order_by(Group.id)
+_group_members = select(GroupMember).where(
+    GroupMember.group_id == bindparam("group_id")
+).order_by(GroupMember.user_id)
+_group_member_ids = select(GroupMember.user_id).where(GroupMember.group_id == bindparam("group_id"))
+
+def create_group(db: Session, group_in: GroupCreate, owner_id: int) -> Group:
+    """Create a group with its creator as the owner"""
+    group = Group(name=group_in.name, currency=group_in.currency, created_by=owner_id)
+    db.add(group)
+    db.flush()
+    db.add(GroupMember(group_id=group.id, user_id=owner_id, role="owner"))
+    db.commit()
+    return group
+
+def get_group_for_member(db: Session, group_id: int, user_id: int) -> Group:
+    """
+    Get a group the user belongs to.
+
+    Groups the user is not a member of are reported as missing, so group ids
+    cannot be probed.
+    """
+    group = db.scalars(_group_for_member, {"group_id": group_id, "user_id": user_id}).first()
+    if group is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Group not found")
+    return group
+
+def get_groups_for_user(db: Session, user_id: int) -> List[Group]:
+    return list(db.scalars(_groups_for_user, {"user_id": user_id}))
+
+def get_group_members(db: Session, group_id: int) -> List[GroupMember]:
+    return list(db.scalars(_group_members, {"group_id": group_id}))
+
+def get_group_member_ids(db: Session, group_id: int) -> List[int]:
+    return list(db.scalars(_group_member_ids, {"group_id": group_id}))
+
+def require_members(db: Session, group_id: int, user_ids: Set[int]) -> None:
+    """Raise 400 unless every user in `user_ids` belongs to the group"""
+    found = set(db.scalars(
+        select(GroupMember.user_id).where(
+            GroupMember.group_id == group_id,
+            GroupMember.user_id.in_(user_ids)
+        )
+    ))
+    missing = user_ids - found
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Users are not members of this group: {sorted(missing)}"
+        )
+
+def add_group_member(db: Session, group_id: int, user_id: int) -> GroupMember:
+    get_user(db, user_id)  # 404 if the user does not exist
+    member = insert_if_absent(db, GroupMember, {"group_id": group_id, "user_id": user_id, "role": "member"})
+    if member is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User is already a member of this group"
+        )
+    db.commit()
+    return member
@@ -0,0 +1,70 @@
+import json
+from typing import Any, AsyncIterator, Dict, Optional
+
+from fastapi import Request
+
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.services.balances import get_group_balances
+from app.services.event_broker import broker, group_topic
+
+def publish_group_event(
+    db: Session, group_id: int, event_type: str, data: Any, include_balances: bool = False
+) -> None:
+    """
+    Push a change to clients streaming the group; call after the change commits.
+
+    With `include_balances` the event carries the group's new balances, so
+    clients need not fetch them. Nothing is built, and no balance query runs,
+    while nobody is listening.
+    """
+    topic = group_topic(group_id)
+    if not broker.has_subscribers(topic):
+        return
+    event: Dict[str, Any] = {"type": event_type, "group_id": group_id, "data": _jsonable(data)}
+    if include_balances:
+        event["balances"] = {
+            str(user_id): balance for user_id, balance in sorted(get_group_balances(db, group_id).items())
+        }
+    broker.publish(topic, event)
+
+def _jsonable(data: Any) -> Optional[Any]:
+    if isinstance(data, BaseModel):
+        return data.model_dump(mode="json")
+    if isinstance(data, list):
+        return [_jsonable(item) for item in data]
+    return data
+
+# Tells EventSource how long to wait before reconnecting, in milliseconds
+RECONNECT_MS = 3000
+
+def _sse(event_type: str, data: Any) -> str:
+    return f"event: {event_type}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+async def group_event_stream(request: Request, group_id: int) -> AsyncIterator[str]:
+    """
+    Server-sent events for one group.
+
+    A comment line is sent whenever no event arrives for
+    EVENT_STREAM_HEARTBEAT_SECONDS, so proxies keep the connection open and
+    a vanished client is noticed. A client evicted for falling behind gets
+    an `evicted` event and should reconnect and refetch.
+    """
+    subscription = broker.subscribe(group_topic(group_id))
+    try:
+        yield f"retry: {RECONNECT_MS}\n\n"
+        while True:
+            event = await subscription.next_event(settings.EVENT_STREAM_HEARTBEAT_SECONDS)
+            if event is not None:
+                yield _sse(event["type"], event)
+            elif subscription.evicted:
+                yield _sse("evicted", {"group_id": group_id})
+                return
+            elif await request.is_disconnected():
+                return
+            else:
+                yield ": ping\n\n"
+    finally:
+        subscription.close()
@@ -0,0 +1,174 @@
+import sys
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import bindparam, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.expense import Expense
+from app.models.group import Group
+from app.models.ledger import LedgerEvent, LedgerSnapshot
+from app.models.settlement import Settlement
+from app.services.activity_feed import fan_out_events
+
+class PendingEvent(NamedTuple):
+    event_type: str
+    entity_id: int
+    payload: Dict[str, Any]
+    deltas: Dict[int, int]
+
+_bump_ledger_version = update(Group).where(Group.id == bindparam("group_id")).values(
+    ledger_version=Group.ledger_version + bindparam("count")
+).returning(Group.ledger_version, Group.feed_pull_from_seq).execution_options(synchronize_session=False)
+
+_latest_snapshot = select(LedgerSnapshot).where(
+    LedgerSnapshot.group_id == bindparam("group_id")
+).order_by(LedgerSnapshot.seq.desc()).limit(1)
+_latest_snapshot_at = select(LedgerSnapshot).where(
+    LedgerSnapshot.group_id == bindparam("group_id"),
+    LedgerSnapshot.taken_at <= bindparam("at")
+).order_by(LedgerSnapshot.seq.desc()).limit(1)
+
+_deltas_after = select(LedgerEvent.seq, LedgerEvent.deltas).where(
+    LedgerEvent.group_id == bindparam("group_id"),
+    LedgerEvent.seq > bindparam("after_seq")
+).order_by(LedgerEvent.seq)
+_deltas_after_until = _deltas_after.where(LedgerEvent.occurred_at <= bindparam("at"))
+
+_events_page = select(LedgerEvent).where(
+    LedgerEvent.group_id == bindparam("group_id"),
+    LedgerEvent.seq > bindparam("after_seq")
+).order_by(LedgerEvent.seq).limit(bindparam("limit"))
+
+_groups_due_for_snapshot = select(Group.id).where(
+    Group.ledger_version > func.coalesce(
+        select(func.max(LedgerSnapshot.seq)).where(LedgerSnapshot.group_id == Group.id).scalar_subquery(), 0
+    )
+).order_by(Group.id)
+
+def expense_payload(expense: Expense, shares: Dict[int, int]) -> Dict[str, Any]:
+    return {
+        "expense_id": expense.id,
+        "description": expense.description,
+        "category": expense.category,
+        "paid_by": expense.paid_by,
+        "amount_minor": expense.amount_minor,
+        "currency": expense.currency,
+        "original_amount_minor": expense.original_amount_minor,
+        "original_currency": expense.original_currency,
+        "fx_rate": str(expense.fx_rate) if expense.fx_rate is not None else None,
+        "shares": {str(user_id): amount for user_id, amount in shares.items()},
+    }
+
+def settlement_payload(settlement: Settlement) -> Dict[str, Any]:
+    return {
+        "settlement_id": settlement.id,
+        "from_user_id": settlement.from_user_id,
+        "to_user_id": settlement.to_user_id,
+        "amount_minor": settlement.amount_minor,
+        "currency": settlement.currency,
+    }
+
+def record_events(db: Session, group_id: int, actor_id: int, events: List[PendingEvent]) -> int:
+    """
+    Append events to a group's ledger; returns the new ledger version.
+
+    Bumping Group.ledger_version takes the group row lock, so writers of one
+    group are serialized from here to commit and sequence numbers never
+    collide. Call it before touching group_balances. The events are added to
+    members' activity feeds, and every LEDGER_SNAPSHOT_EVERY events a
+    snapshot is written, in the same transaction.
+    """
+    version, feed_pull_from_seq = db.execute(_bump_ledger_version, {"group_id": group_id, "count": len(events)}).one()
+    first_seq = version - len(events) + 1
+    occurred_at = datetime.now(timezone.utc)
+    db.execute(insert(LedgerEvent), [
+        {
+            "group_id": group_id,
+            "seq": first_seq + i,
+            "occurred_at": occurred_at,
+            "event_type": event.event_type,
+            "actor_id": actor_id,
+            "entity_id": event.entity_id,
+            "payload": event.payload,
+            "deltas": {str(user_id): amount for user_id, amount in event.deltas.items() if amount},
+        }
+        for i, event in enumerate(events)
+    ])
+    fan_out_events(db, group_id, feed_pull_from_seq, first_seq, len(events), occurred_at)
+
+    every = settings.LEDGER_SNAPSHOT_EVERY
+    if every > 0 and (first_seq - 1) // every != version // every:
+        write_snapshot(db, group_id)
+    return version
+
+def _replay(db: Session, group_id: int, snapshot: Optional[LedgerSnapshot], at: Optional[datetime]) -> Tuple[int, Dict[int, int]]:
+    seq = snapshot.seq if snapshot else 0
+    balances: Dict[int, int] = defaultdict(int)
+    if snapshot:
+        for user_id, amount in snapshot.balances.items():
+            balances[int(user_id)] = amount
+
+    params = {"group_id": group_id, "after_seq": seq}
+    statement = _deltas_after
+    if at is not None:
+        statement, params["at"] = _deltas_after_until, at
+    for seq, deltas in db.execute(statement, params):
+        for user_id, amount in deltas.items():
+            balances[int(user_id)] += amount
+    return seq, {user_id: amount for user_id, amount in balances.items() if amount}
+
+def balances_at(db: Session, group_id: int, at: Optional[datetime] = None, use_snapshots: bool = True) -> Tuple[int, Dict[int, int]]:
+    """
+    A group's balances after its last event at or before `at` (default: now).
+
+    Starts from the latest snapshot taken by then and replays only the events
+    after it. Returns (ledger sequence number, non-zero balances by user id).
+    """
+    snapshot = None
+    if use_snapshots:
+        if at is None:
+            snapshot = db.scalars(_latest_snapshot, {"group_id": group_id}).first()
+        else:
+            snapshot = db.scalars(_latest_snapshot_at, {"group_id": group_id, "at": at}).first()
+    return _replay(db, group_id, snapshot, at)
+
+def write_snapshot(db: Session, group_id: int) -> int:
+    """Snapshot the group's balances at its current ledger version; caller commits"""
+    snapshot = db.scalars(_latest_snapshot, {"group_id": group_id}).first()
+    seq, balances = _replay(db, group_id, snapshot, None)
+    if seq == 0 or (snapshot and snapshot.seq == seq):
+        return seq
+    taken_at = db.scalar(select(LedgerEvent.occurred_at).where(
+        LedgerEvent.group_id == group_id, LedgerEvent.seq == seq
+    ))
+    db.execute(insert(LedgerSnapshot).values(
+        group_id=group_id, seq=seq, taken_at=taken_at,
+        balances={str(user_id): amount for user_id, amount in balances.items()},
+    ))
+    return seq
+
+def get_ledger_events(db: Session, group_id: int, after_seq: int = 0, limit: int = 100) -> List[LedgerEvent]:
+    """Events in sequence order, for auditing and incremental readers"""
+    return list(db.scalars(_events_page, {"group_id": group_id, "after_seq": after_seq, "limit": limit}))
+
+def snapshot_due_groups(db: Session) -> int:
+    """Snapshot every group with events since its latest snapshot; returns groups snapshotted"""
+    group_ids = list(db.scalars(_groups_due_for_snapshot))
+    for group_id in group_ids:
+        # Take the group lock so no event slips in between replay and insert
+        db.execute(select(Group.id).where(Group.id == group_id).with_for_update())
+        write_snapshot(db, group_id)
+        db.commit()
+    return len(group_ids)
+
+if __name__ == "__main__":
+    # python -m app.services.ledger snapshot   (e.g. nightly from cron)
+    from app.db.session import SessionLocal
+
+    if sys.argv[1:] != ["snapshot"]:
+        sys.exit("usage: python -m app.services.ledger snapshot")
+    with SessionLocal() as db:
+        print(f"Snapshotted {snapshot_due_groups(db)} groups")
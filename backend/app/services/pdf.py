@@ -0,0 +1,78 @@
+from typing import BinaryIO, Dict, List
+
+# A4 in points
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+class PdfWriter:
+    """
+    Minimal PDF writer for plain-text pages in the built-in Courier font.
+
+    Pages are written to `out` as they are added, so a statement of any
+    length is rendered in constant memory; only the object offsets are
+    kept for the cross-reference table written by `close`. Text outside
+    Windows-1252 is replaced with '?'.
+    """
+
+    CATALOG, PAGES, FONT = 1, 2, 3
+
+    def __init__(self, out: BinaryIO, font_size: float = 8, leading: float = 10, margin: float = 40):
+        self.out = out
+        self.font_size = font_size
+        self.leading = leading
+        self.margin = margin
+        self._offsets: Dict[int, int] = {}
+        self._page_ids: List[int] = []
+        self._next_id = 4
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    @property
+    def lines_per_page(self) -> int:
+        return int((PAGE_HEIGHT - 2 * self.margin) // self.leading)
+
+    def _write(self, data: bytes) -> None:
+        self.out.write(data)
+
+    def _object(self, obj_id: int, body: bytes) -> None:
+        self._offsets[obj_id] = self.out.tell()
+        self._write(f"{obj_id} 0 obj\n".encode() + body + b"\nendobj\n")
+
+    def _allocate(self) -> int:
+        obj_id = self._next_id
+        self._next_id += 1
+        return obj_id
+
+    def add_page(self, lines: List[str]) -> None:
+        top = PAGE_HEIGHT - self.margin - self.font_size
+        text = "".join(f"({_escape(line)}) Tj T*\n" for line in lines[:self.lines_per_page])
+        content = (
+            f"BT /F1 {self.font_size} Tf {self.leading} TL {self.margin} {top} Td\n{text}ET"
+        ).encode("cp1252", errors="replace")
+
+        content_id, page_id = self._allocate(), self._allocate()
+        self._object(content_id, b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+        self._object(page_id, (
+            f"<< /Type /Page /Parent {self.PAGES} 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 {self.FONT} 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode())
+        self._page_ids.append(page_id)
+
+    def close(self) -> None:
+        """Write the document structure and trailer; `out` is left open"""
+        if not self._page_ids:
+            self.add_page([])
+        self._object(self.FONT, b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>")
+        kids = " ".join(f"{page_id} 0 R" for page_id in self._page_ids)
+        self._object(self.PAGES, f"<< /Type /Pages /Kids [{kids}] /Count {len(self._page_ids)} >>".encode())
+        self._object(self.CATALOG, f"<< /Type /Catalog /Pages {self.PAGES} 0 R >>".encode())
+
+        xref_offset = self.out.tell()
+        size = self._next_id
+        entries = "".join(f"{self._offsets[obj_id]:010d} 00000 n \n" for obj_id in range(1, size))
+        self._write(
+            f"xref\n0 {size}\n0000000000 65535 f \n{entries}"
+            f"trailer\n<< /Size {size} /Root {self.CATALOG} 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode()
+        )
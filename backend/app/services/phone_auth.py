@@ -1,16 +1,22 @@
 from typing import Dict, Tuple, Optional
+from sqlalchemy import bindparam, or_, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
-import secrets
 
 from app.models.user import User
-from app.schemas.user import UserCreate, User as UserSchema
+from app.schemas.user import User as UserSchema
 from app.services.firebase_auth import verify_firebase_token
-from app.services.user import create_user
+from app.services.user import commit_user_changes
+from app.db.writes import insert_if_absent
 from app.core.security import create_access_token
 from datetime import timedelta
 from app.core.config import settings
 
+_user_by_phone_login = select(User).where(or_(
+    User.firebase_uid == bindparam("firebase_uid"), User.phone_number == bindparam("phone_number")
+)).limit(1)
+
 def verify_phone_token(
     id_token: str, 
     db: Session
@@ -43,12 +49,7 @@ def find_or_create_user(
     Find a user by phone number or create one if not exists
     Returns: (user, user_existed)
     """
-    # Check if user exists
-    db_user = db.query(User).filter(
-        (User.phone_number == phone_number) | (User.firebase_uid == firebase_uid)
-    ).first()
-    
-    user_existed = bool(db_user)
+    db_user = db.scalars(_user_by_phone_login, {"firebase_uid": firebase_uid, "phone_number": phone_number}).first()
     
     # If user does not exist
     if not db_user:
@@ -61,55 +62,53 @@ def find_or_create_user(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Username is required for new user registration"
             )
-            
-        # Create a new user
-        random_password = secrets.token_urlsafe(16)
-        
-        user_create = UserCreate(
-            username=username,
-            email=f"{username}_{firebase_uid[:8]}@phone.auth",
-            password=random_password,
-            phone_number=phone_number
-        )
         
+        # INSERT ... ON CONFLICT (firebase_uid) DO NOTHING: two simultaneous
+        # first logins both succeed, the loser reads the winner's row below
         try:
-            db_user = create_user(db, user_create)
-            # Update firebase_uid
-            db_user.firebase_uid = firebase_uid
-            db.add(db_user)
-            db.commit()
-            db.refresh(db_user)
-        except Exception as e:
+            db_user = insert_if_absent(db, User, {
+                "username": username,
+                "phone_number": phone_number,
+                "firebase_uid": firebase_uid,
+                "auth_providers": ["phone"],
+                "is_verified": True,
+                "profile_completed": False,
+            }, index_elements=["firebase_uid"])
+        except IntegrityError:
             db.rollback()
-            if "UniqueViolation" in str(e) or "unique constraint" in str(e).lower():
-                raise HTTPException(
-                    status_code=status.HTTP_409_CONFLICT,
-                    detail="Username or email already exists"
-                )
+            db_user = None
+        else:
+            if db_user:
+                db.commit()
+                return db_user, False
+        db_user = db.scalars(
+            _user_by_phone_login, {"firebase_uid": firebase_uid, "phone_number": phone_number}
+        ).first()
+        if not db_user:
+            # The username belongs to a different account
             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Failed to create user: {str(e)}"
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Username or email already exists"
             )
-    else:
-        # Update user if needed
-        needs_update = False
+    
+    # Update user if needed
+    needs_update = False
+    
+    # Update phone number if it changed
+    if db_user.phone_number != phone_number:
+        db_user.phone_number = phone_number
+        needs_update = True
+        
+    # Update firebase_uid if it's missing or changed
+    if not db_user.firebase_uid or db_user.firebase_uid != firebase_uid:
+        db_user.firebase_uid = firebase_uid
+        needs_update = True
         
-        # Update phone number if it changed
-        if db_user.phone_number != phone_number:
-            db_user.phone_number = phone_number
-            needs_update = True
-            
-        # Update firebase_uid if it's missing or changed
-        if not db_user.firebase_uid or db_user.firebase_uid != firebase_uid:
-            db_user.firebase_uid = firebase_uid
-            needs_update = True
-            
-        if needs_update:
-            db.add(db_user)
-            db.commit()
-            db.refresh(db_user)
+    if needs_update:
+        db.add(db_user)
+        commit_user_changes(db)
     
-    return db_user, user_existed
+    return db_user, True
 
 def generate_auth_response(user: User, user_existed: bool, phone_number: str) -> Dict:
     """Generate authentication response with tokens"""
@@ -3,7 +3,7 @@ from fastapi import HTTPException, status
 
 from app.models.user import User
 from app.schemas.user import ProfileComplete
-from app.services.user import get_user, get_user_by_email, get_user_by_username
+from app.services.user import commit_user_changes, get_user, get_user_by_email, get_user_by_username
 
 def complete_profile(db: Session, user_id: int, profile_data: ProfileComplete) -> User:
     """Complete a user profile after initial authentication"""
@@ -38,7 +38,6 @@ def complete_profile(db: Session, user_id: int, profile_data: ProfileComplete) -
         user.profile_completed = True
     
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    commit_user_changes(db)
     
     return user
\ No newline at end of file
@@ -0,0 +1,290 @@
+import calendar
+import heapq
+import logging
+import sys
+import threading
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import bindparam, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.background import PeriodicWorker
+from app.core.config import settings
+from app.db.advisory_lock import AdvisoryLeaderLock
+from app.db.session import SessionLocal, engine
+from app.models.group import Group
+from app.models.recurring_expense import RecurringExpense
+from app.schemas.group import ExpenseCreate, RecurringExpenseCreate
+from app.services.expense import add_expenses, check_expense
+
+logger = logging.getLogger(__name__)
+
+# pg_advisory_lock key held by the worker that posts recurring expenses
+SCHEDULER_LOCK_KEY = 0x5EC0_0044
+
+_due_within = select(RecurringExpense.next_run_at, RecurringExpense.id).where(
+    RecurringExpense.active.is_(True),
+    RecurringExpense.next_run_at < bindparam("until"),
+).order_by(RecurringExpense.next_run_at).limit(bindparam("limit"))
+
+_lock_due_template = select(RecurringExpense).where(
+    RecurringExpense.id == bindparam("template_id"),
+    RecurringExpense.active.is_(True),
+    RecurringExpense.next_run_at <= bindparam("now"),
+).with_for_update(skip_locked=True)
+
+_group_templates = select(RecurringExpense).where(
+    RecurringExpense.group_id == bindparam("group_id")
+).order_by(RecurringExpense.id)
+
+def _utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+def occurrence_on(start_on: date, interval_unit: str, interval_count: int, index: int) -> date:
+    """Day of occurrence `index` (0 is `start_on`); months clamp to their last day"""
+    if interval_unit == "day":
+        return start_on + timedelta(days=interval_count * index)
+    if interval_unit == "week":
+        return start_on + timedelta(weeks=interval_count * index)
+    year, month = divmod(start_on.month - 1 + interval_count * index, 12)
+    year += start_on.year
+    return date(year, month + 1, min(start_on.day, calendar.monthrange(year, month + 1)[1]))
+
+def _next_run_at(template: RecurringExpense) -> Optional[datetime]:
+    day = occurrence_on(template.start_on, template.interval_unit, template.interval_count, template.next_index)
+    if template.ends_on is not None and day > template.ends_on:
+        return None
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+def create_recurring_expense(
+    db: Session, group: Group, recurring_in: RecurringExpenseCreate, created_by: int
+) -> RecurringExpense:
+    paid_by = recurring_in.paid_by or created_by
+    check_expense(db, group, recurring_in, paid_by)
+    template = RecurringExpense(
+        group_id=group.id,
+        created_by=created_by,
+        description=recurring_in.description,
+        category=recurring_in.category,
+        amount_minor=recurring_in.amount_minor,
+        currency=recurring_in.currency,
+        paid_by=paid_by,
+        shares=[share.model_dump() for share in recurring_in.shares] if recurring_in.shares else None,
+        interval_unit=recurring_in.interval_unit,
+        interval_count=recurring_in.interval_count,
+        start_on=recurring_in.start_on,
+        ends_on=recurring_in.ends_on,
+        next_index=0,
+        active=True,
+    )
+    template.next_run_at = _next_run_at(template)
+    db.add(template)
+    db.commit()
+    return template
+
+def get_recurring_expenses(db: Session, group_id: int) -> List[RecurringExpense]:
+    return list(db.scalars(_group_templates, {"group_id": group_id}))
+
+def stop_recurring_expense(db: Session, group_id: int, template_id: int, user_id: int) -> RecurringExpense:
+    """Stop posting a template; expenses already posted are kept"""
+    template = db.get(RecurringExpense, template_id)
+    if template is None or template.group_id != group_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Recurring expense not found")
+    if user_id not in (template.created_by, template.paid_by):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only the creator or payer can stop a recurring expense"
+        )
+    template.active = False
+    template.next_run_at = None
+    db.commit()
+    return template
+
+def post_due_occurrences(db: Session, template_id: int, now: datetime) -> Optional[datetime]:
+    """
+    Post a template's occurrences due by `now`, at most RECURRING_MAX_CATCHUP
+    of them, and advance it in the same transaction; returns its new
+    next_run_at.
+
+    The row is locked with SKIP LOCKED and expenses are unique per
+    (template, occurrence day), so a second poster can never double-post.
+    A template that cannot be posted (payer left the group, no exchange
+    rate) is paused with the reason in `last_error`.
+    """
+    template = db.scalars(_lock_due_template, {"template_id": template_id, "now": now}).first()
+    if template is None:
+        db.rollback()
+        return None
+
+    occurrences: List[Tuple[int, date]] = []
+    while len(occurrences) < settings.RECURRING_MAX_CATCHUP:
+        run_at = _next_run_at(template)
+        if run_at is None or run_at > now:
+            break
+        occurrences.append((template.id, run_at.date()))
+        template.next_index += 1
+    template.next_run_at = _next_run_at(template)
+    if template.next_run_at is None:
+        template.active = False
+
+    expense_in = ExpenseCreate(
+        description=template.description,
+        category=template.category,
+        amount_minor=template.amount_minor,
+        currency=template.currency,
+        paid_by=template.paid_by,
+        shares=template.shares,
+    )
+    try:
+        add_expenses(db, db.get(Group, template.group_id), [expense_in] * len(occurrences),
+                     template.created_by, occurrences=occurrences)
+        db.commit()
+    except HTTPException as e:
+        db.rollback()
+        _pause(db, template_id, e.detail)
+        return None
+    except IntegrityError:
+        db.rollback()
+        logger.error(f"Recurring expense {template_id} has occurrences that were already posted")
+        _pause(db, template_id, "Occurrence already posted")
+        return None
+    return _utc(template.next_run_at) if template.next_run_at else None
+
+def _pause(db: Session, template_id: int, reason: str) -> None:
+    template = db.get(RecurringExpense, template_id)
+    template.active = False
+    template.last_error = reason
+    db.commit()
+    logger.warning(f"Paused recurring expense {template_id}: {reason}")
+
+class RecurringScheduler:
+    """
+    Posts recurring expenses as they fall due.
+
+    Only the worker holding the advisory lock posts. It keeps a min-heap of
+    (next_run_at, template id) covering the next `horizon` seconds and
+    reloads it from the database only when the horizon runs out, so a tick
+    with nothing due issues no query beyond the lock check. Templates
+    created in another worker are picked up by the next reload. Each tick
+    posts at most `batch_size` templates; a backlog after downtime is worked
+    off in consecutive ticks without waiting for the interval.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        leader_lock: AdvisoryLeaderLock,
+        interval: float,
+        horizon: float,
+        batch_size: int,
+    ):
+        self.session_factory = session_factory
+        self.leader_lock = leader_lock
+        self.horizon = timedelta(seconds=horizon)
+        self.batch_size = batch_size
+        self._heap: List[Tuple[datetime, int]] = []
+        self._heap_lock = threading.Lock()
+        self._loaded_until: Optional[datetime] = None
+        self._worker = PeriodicWorker("recurring-expenses", interval, self.tick)
+        self.posted_templates = 0
+        self.reloads = 0
+
+    def start(self) -> None:
+        self._worker.start()
+
+    def stop(self) -> None:
+        self._worker.stop()
+        self.leader_lock.release()
+
+    def schedule(self, template_id: int, run_at: Optional[datetime]) -> None:
+        """Tell the scheduler about a template created in this process"""
+        if run_at is None:
+            return
+        run_at = _utc(run_at)
+        with self._heap_lock:
+            if self._loaded_until is not None and run_at < self._loaded_until:
+                heapq.heappush(self._heap, (run_at, template_id))
+        if run_at <= datetime.now(timezone.utc):
+            self._worker.wake()
+
+    def tick(self, now: Optional[datetime] = None) -> int:
+        """Post what is due; returns the number of templates posted"""
+        if not self.leader_lock.acquire():
+            with self._heap_lock:
+                self._heap, self._loaded_until = [], None
+            return 0
+
+        now = now or datetime.now(timezone.utc)
+        if self._loaded_until is None or now >= self._loaded_until:
+            self._load(now)
+
+        due = []
+        with self._heap_lock:
+            while self._heap and self._heap[0][0] <= now and len(due) < self.batch_size:
+                due.append(heapq.heappop(self._heap)[1])
+
+        posted = 0
+        with self.session_factory() as db:
+            for template_id in dict.fromkeys(due):
+                next_run_at = post_due_occurrences(db, template_id, now)
+                posted += 1
+                if next_run_at is not None:
+                    with self._heap_lock:
+                        if next_run_at < self._loaded_until:
+                            heapq.heappush(self._heap, (next_run_at, template_id))
+        self.posted_templates += posted
+
+        with self._heap_lock:
+            backlog = bool(self._heap) and self._heap[0][0] <= now
+        if backlog:
+            self._worker.wake()
+        return posted
+
+    def _load(self, now: datetime) -> None:
+        until = now + self.horizon
+        limit = 10 * self.batch_size
+        with self.session_factory() as db:
+            rows = db.execute(_due_within, {"until": until, "limit": limit}).all()
+        heap = [(_utc(run_at), template_id) for run_at, template_id in rows]
+        heapq.heapify(heap)
+        if len(rows) == limit:
+            # Only part of the horizon fitted; reload once it has been worked off
+            until = max(run_at for run_at, _ in heap)
+        with self._heap_lock:
+            self._heap, self._loaded_until = heap, until
+        self.reloads += 1
+
+    def stats(self) -> Dict[str, object]:
+        with self._heap_lock:
+            return {
+                "leader": self.leader_lock.held,
+                "scheduled": len(self._heap),
+                "loaded_until": self._loaded_until.isoformat() if self._loaded_until else None,
+                "posted_templates": self.posted_templates,
+                "reloads": self.reloads,
+            }
+
+recurring_scheduler = RecurringScheduler(
+    SessionLocal,
+    AdvisoryLeaderLock(engine, SCHEDULER_LOCK_KEY),
+    interval=settings.RECURRING_TICK_SECONDS,
+    horizon=settings.RECURRING_HORIZON_SECONDS,
+    batch_size=settings.RECURRING_BATCH_SIZE,
+)
+
+if __name__ == "__main__":
+    # python -m app.services.recurring run   (post everything due, e.g. from cron)
+    if sys.argv[1:] != ["run"]:
+        sys.exit("usage: python -m app.services.recurring run")
+    total = 0
+    while True:
+        posted = recurring_scheduler.tick()
+        total += posted
+        if not posted:
+            break
+    recurring_scheduler.leader_lock.release()
+    print(f"Posted {total} recurring expenses")
@@ -0,0 +1,83 @@
+import heapq
+from typing import Dict, List, NamedTuple
+
+# Above this many non-zero balances the exact solver's 2^n table gets too slow
+# for a request, and settle-up falls back to the greedy pass.
+EXACT_SOLVER_MAX_MEMBERS = 12
+
+class Transfer(NamedTuple):
+    from_user_id: int
+    to_user_id: int
+    amount_minor: int
+
+def simplify_debts_greedy(balances: Dict[int, int]) -> List[Transfer]:
+    """
+    Settle balances by repeatedly matching the largest debtor with the largest creditor.
+
+    Each transfer zeroes at least one of the two, so there are at most n - 1
+    transfers for n non-zero balances, in O(n log n).
+    """
+    creditors = [(-amount, user_id) for user_id, amount in balances.items() if amount > 0]
+    debtors = [(amount, user_id) for user_id, amount in balances.items() if amount < 0]
+    heapq.heapify(creditors)
+    heapq.heapify(debtors)
+
+    transfers = []
+    while creditors and debtors:
+        credit, creditor = heapq.heappop(creditors)
+        debt, debtor = heapq.heappop(debtors)
+        amount = min(-credit, -debt)
+        transfers.append(Transfer(debtor, creditor, amount))
+        if -credit > amount:
+            heapq.heappush(creditors, (credit + amount, creditor))
+        if -debt > amount:
+            heapq.heappush(debtors, (debt + amount, debtor))
+    return transfers
+
+def simplify_debts_exact(balances: Dict[int, int]) -> List[Transfer]:
+    """
+    Settle balances with the minimum possible number of transfers.
+
+    The minimum is n - k, where k is the largest number of disjoint zero-sum
+    subsets the n non-zero balances split into; each subset then settles
+    internally with the greedy pass. Found by dynamic programming over all
+    2^n subsets, so only use it for small groups.
+    """
+    members = sorted(user_id for user_id, amount in balances.items() if amount)
+    n = len(members)
+    if n > EXACT_SOLVER_MAX_MEMBERS:
+        raise ValueError(f"Exact settlement supports at most {EXACT_SOLVER_MAX_MEMBERS} members with a balance")
+
+    full = (1 << n) - 1
+    subset_sum = [0] * (full + 1)
+    for mask in range(1, full + 1):
+        low = (mask & -mask).bit_length() - 1
+        subset_sum[mask] = subset_sum[mask & (mask - 1)] + balances[members[low]]
+
+    # best[mask]: most zero-sum groups along a removal order of mask's members
+    best = [0] * (full + 1)
+    for mask in range(1, full + 1):
+        best[mask] = max(best[mask & ~(1 << i)] for i in range(n) if mask >> i & 1)
+        if subset_sum[mask] == 0:
+            best[mask] += 1
+
+    # Walk one optimal removal order back; every zero-sum mask on it closes a group
+    transfers = []
+    mask = full
+    group = {}
+    while mask:
+        for i in range(n):
+            if mask >> i & 1 and best[mask & ~(1 << i)] + (subset_sum[mask] == 0) == best[mask]:
+                break
+        group[members[i]] = balances[members[i]]
+        mask &= ~(1 << i)
+        if subset_sum[mask] == 0:
+            transfers.extend(simplify_debts_greedy(group))
+            group = {}
+    return transfers
+
+def simplify_debts(balances: Dict[int, int], exact: bool = True) -> List[Transfer]:
+    """Exact minimum for small groups when `exact` is set, the greedy pass otherwise"""
+    if exact and sum(1 for amount in balances.values() if amount) <= EXACT_SOLVER_MAX_MEMBERS:
+        return simplify_debts_exact(balances)
+    return simplify_debts_greedy(balances)
@@ -0,0 +1,151 @@
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from app.schemas.split import MAX_AMOUNT_MINOR, Receipt, SplitRule
+
+# Percentages are accepted with up to 4 decimal places
+PERCENT_SCALE = 10_000
+
+# Above this, amount * weight products could overflow int64; fall back to Python ints
+INT64_SAFE_PRODUCT = 2 ** 62
+
+def largest_remainder(amount: int, weights: Sequence[int]) -> List[int]:
+    """
+    Split `amount` proportionally to integer `weights`, exact to the minor unit.
+
+    Everyone gets the floor of their exact quota; the units left over go to
+    the largest remainders, ties to the earliest participant. This is the
+    reference for allocate_rows.
+    """
+    total = sum(weights)
+    if total <= 0:
+        raise ValueError("Weights must add up to more than zero")
+    quotas = [amount * weight for weight in weights]
+    allocation = [quota // total for quota in quotas]
+    left = amount - sum(allocation)
+    by_remainder = sorted(range(len(weights)), key=lambda i: (-(quotas[i] % total), i))
+    for i in by_remainder[:left]:
+        allocation[i] += 1
+    return allocation
+
+def allocate_rows(amounts: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """
+    largest_remainder for every row of a matrix at once.
+
+    `amounts` has one entry per row, `weights` one column per participant.
+    Integer arithmetic throughout, so each row adds up to its amount exactly.
+    """
+    rows, columns = weights.shape
+    if rows == 0:
+        return weights.copy()
+    totals = weights.sum(axis=1)
+    if (totals <= 0).any():
+        raise ValueError("Weights must add up to more than zero")
+    if int(amounts.max()) * int(weights.max()) >= INT64_SAFE_PRODUCT:
+        amounts, weights, totals = amounts.astype(object), weights.astype(object), totals.astype(object)
+
+    quotas = amounts[:, None] * weights
+    allocation = quotas // totals[:, None]
+    remainders = quotas % totals[:, None]
+    left = amounts - allocation.sum(axis=1)
+
+    # Rank columns by remainder within each row; a stable sort breaks ties by position
+    order = np.argsort(-remainders, axis=1, kind="stable")
+    ranks = np.empty((rows, columns), dtype=np.int64)
+    np.put_along_axis(ranks, order, np.broadcast_to(np.arange(columns), (rows, columns)), axis=1)
+    return allocation + (ranks < left[:, None])
+
+def _rule_row(rule: SplitRule, index: Dict[str, int], amount: int) -> Tuple[bool, np.ndarray]:
+    """(is_exact, row) for one rule: weights to apportion by, or exact amounts"""
+    row = np.zeros(len(index), dtype=np.int64)
+
+    def column(participant: str) -> int:
+        if participant not in index:
+            raise ValueError(f"Unknown participant {participant!r}")
+        return index[participant]
+
+    if rule.method == "equal":
+        if rule.participants is None:
+            row[:] = 1
+        else:
+            if not rule.participants:
+                raise ValueError("An equal split needs at least one participant")
+            for participant in rule.participants:
+                row[column(participant)] = 1
+        return False, row
+
+    if not rule.weights:
+        raise ValueError(f"A {rule.method} split needs weights")
+    # Summed as Python ints: a row total past this could overflow int64 in allocate_rows
+    total = 0
+    for participant, weight in rule.weights.items():
+        if weight < 0:
+            raise ValueError("Weights must not be negative")
+        if rule.method == "percentages":
+            value = round(weight * PERCENT_SCALE)
+            if abs(value - weight * PERCENT_SCALE) > 1e-6:
+                raise ValueError("Percentages support at most 4 decimal places")
+        else:
+            if not float(weight).is_integer():
+                raise ValueError(f"{rule.method.capitalize()} weights must be whole numbers")
+            value = int(weight)
+        total += value
+        if total > MAX_AMOUNT_MINOR:
+            raise ValueError(f"Weights must add up to at most {MAX_AMOUNT_MINOR}")
+        row[column(participant)] = value
+
+    if rule.method == "percentages" and row.sum() != 100 * PERCENT_SCALE:
+        raise ValueError("Percentages must add up to 100")
+    if rule.method == "exact":
+        if row.sum() != amount:
+            raise ValueError("Exact amounts must add up to the item amount")
+        return True, row
+    return False, row
+
+def split_receipt(receipt: Receipt) -> dict:
+    """
+    Allocate every line item, then tax and tip, to the receipt's participants.
+
+    Proportional items are apportioned together as one weight matrix; tax and
+    tip follow each participant's subtotal. Every row, and the receipt as a
+    whole, reconciles to the minor unit.
+    """
+    index = {participant: i for i, participant in enumerate(receipt.participants)}
+    amounts = np.array([item.amount_minor for item in receipt.items], dtype=np.int64)
+    weights = np.zeros((len(receipt.items), len(index)), dtype=np.int64)
+    exact = np.zeros(len(receipt.items), dtype=bool)
+    for i, item in enumerate(receipt.items):
+        exact[i], weights[i] = _rule_row(item.split or receipt.split, index, item.amount_minor)
+
+    # Exact rows already hold their amounts
+    allocations = weights.copy()
+    allocations[~exact] = allocate_rows(amounts[~exact], weights[~exact])
+
+    subtotals = allocations.sum(axis=0)
+    if subtotals.sum() > 0:
+        basis = subtotals
+    else:
+        # Nothing to be proportional to (all items free); share tax and tip equally
+        basis = np.ones(len(index), dtype=np.int64)
+    tax, tip = allocate_rows(
+        np.array([receipt.tax_minor, receipt.tip_minor], dtype=np.int64), np.vstack([basis, basis])
+    )
+
+    return {
+        "total_minor": int(amounts.sum()) + receipt.tax_minor + receipt.tip_minor,
+        "participants": [
+            {
+                "participant": participant,
+                "subtotal_minor": int(subtotals[i]),
+                "tax_minor": int(tax[i]),
+                "tip_minor": int(tip[i]),
+                "total_minor": int(subtotals[i] + tax[i] + tip[i]),
+            }
+            for participant, i in index.items()
+        ],
+        "allocations": allocations.tolist(),
+    }
+
+def split_receipts(receipts: List[Receipt]) -> List[dict]:
+    return [split_receipt(receipt) for receipt in receipts]
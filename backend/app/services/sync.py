@@ -0,0 +1,182 @@
+import base64
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict
+
+from sqlalchemy import bindparam, delete, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.expense import Expense
+from app.models.group import Group, GroupMember
+from app.models.settlement import Settlement
+from app.models.sync import ChangeCounter, SyncTombstone
+from app.models.user import User
+
+# Sync everything: rows predating change tracking carry change_seq 0
+FULL_SYNC = -1
+
+_my_group_ids = select(GroupMember.group_id).where(GroupMember.user_id == bindparam("user_id"))
+
+# What a user may see of each kind of row
+_visible = {
+    "users": or_(
+        User.id == bindparam("user_id"),
+        User.id.in_(select(GroupMember.user_id).where(GroupMember.group_id.in_(_my_group_ids))),
+    ),
+    "groups": Group.id.in_(_my_group_ids),
+    "group_members": GroupMember.group_id.in_(_my_group_ids),
+    "expenses": Expense.group_id.in_(_my_group_ids),
+    "settlements": Settlement.group_id.in_(_my_group_ids),
+    "deleted": SyncTombstone.group_id.in_(_my_group_ids),
+}
+_models = {
+    "users": User,
+    "groups": Group,
+    "group_members": GroupMember,
+    "expenses": Expense,
+    "settlements": Settlement,
+    "deleted": SyncTombstone,
+}
+
+# Oldest changes first, one page per kind
+_changed_since = {
+    kind: select(model, model.change_seq).where(
+        _visible[kind], model.change_seq > bindparam("since"), model.change_seq <= bindparam("stable")
+    ).order_by(model.change_seq).limit(bindparam("limit"))
+    for kind, model in _models.items()
+}
+# Every change of a kind up to a number, for pages that end in a run of equal numbers
+_changed_through = {
+    kind: select(model, model.change_seq).where(
+        _visible[kind], model.change_seq > bindparam("since"), model.change_seq <= bindparam("through")
+    ).order_by(model.change_seq)
+    for kind, model in _models.items()
+}
+
+# Rows a member needs on joining a group, whenever they last changed
+_group_contents = {
+    "users": select(User, User.change_seq).where(User.id.in_(
+        select(GroupMember.user_id).where(GroupMember.group_id.in_(bindparam("group_ids", expanding=True)))
+    )),
+    "groups": select(Group, Group.change_seq).where(Group.id.in_(bindparam("group_ids", expanding=True))),
+    "group_members": select(GroupMember, GroupMember.change_seq).where(
+        GroupMember.group_id.in_(bindparam("group_ids", expanding=True))
+    ),
+    "expenses": select(Expense, Expense.change_seq).where(
+        Expense.group_id.in_(bindparam("group_ids", expanding=True))
+    ),
+    "settlements": select(Settlement, Settlement.change_seq).where(
+        Settlement.group_id.in_(bindparam("group_ids", expanding=True))
+    ),
+}
+_new_members = select(User, User.change_seq).where(User.id.in_(bindparam("user_ids", expanding=True)))
+
+_pruned_through = select(ChangeCounter.tombstones_pruned_through).where(ChangeCounter.id == 1)
+
+# The highest change number no transaction in progress can still take
+# (app.db.change_tracking); SQLite writers commit in number order
+_stable_pg = select(func.stable_change_seq())
+_stable_counter = select(ChangeCounter.value).where(ChangeCounter.id == 1)
+
+def stable_through(db: Session) -> int:
+    if db.get_bind().dialect.name == "postgresql":
+        return db.scalar(_stable_pg)
+    return db.scalar(_stable_counter) or 0
+
+def encode_token(seq: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"seq": seq}).encode()).decode().rstrip("=")
+
+def decode_token(token: str) -> int:
+    """Raises ValueError for anything encode_token did not produce"""
+    try:
+        seq = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))["seq"]
+    except (TypeError, ValueError, KeyError) as e:
+        raise ValueError("Invalid sync token") from e
+    if not isinstance(seq, int) or seq < 0:
+        raise ValueError("Invalid sync token")
+    return seq
+
+def get_changes(db: Session, user_id: int, since: int = FULL_SYNC, limit: int = 500) -> Dict[str, Any]:
+    """
+    Rows visible to the user that changed after change number `since`.
+
+    Returns a page with up to `limit` changes of each kind, the deletes
+    under "deleted", and a token for the number the page goes up to:
+    every visible change up to it is included, so the next call continues
+    from there and never misses a row. "reset" is set when tombstones the
+    client still needed have been pruned; the page is then a full sync.
+
+    Joining a group makes its older rows visible, so a page that includes
+    the user's own membership also carries the group's full contents.
+    """
+    reset = False
+    if since != FULL_SYNC and since < (db.scalar(_pruned_through) or 0):
+        since, reset = FULL_SYNC, True
+
+    # Taken before the pages: every change up to it has committed by then
+    stable = stable_through(db)
+    params = {"user_id": user_id, "since": since, "stable": stable, "limit": limit}
+    pages = {kind: db.execute(statement, params).all() for kind, statement in _changed_since.items()}
+
+    # A kind that filled its page may have more changes after its last
+    # number; the page can only vouch for numbers below that
+    truncated = [rows[-1][1] for rows in pages.values() if len(rows) == limit]
+    if truncated:
+        through = min(truncated) - 1
+        if through <= since:
+            # More than `limit` rows share a number (rows predating change tracking)
+            through = min(truncated)
+            for kind, rows in pages.items():
+                if len(rows) == limit and rows[-1][1] == through:
+                    pages[kind] = db.execute(_changed_through[kind], {**params, "through": through}).all()
+    else:
+        through = max(since, stable)
+
+    changes: Dict[str, Dict[int, Any]] = {
+        kind: {row[0].id: row[0] for row in rows if row[1] <= through} for kind, rows in pages.items()
+    }
+
+    members = list(changes["group_members"].values())
+    joined = [member.group_id for member in members if member.user_id == user_id]
+    if joined:
+        for kind, statement in _group_contents.items():
+            for entity, seq in db.execute(statement, {"group_ids": joined}):
+                if seq <= through:
+                    changes[kind].setdefault(entity.id, entity)
+    new_member_ids = [member.user_id for member in members if member.user_id not in changes["users"]]
+    if new_member_ids:
+        for user, seq in db.execute(_new_members, {"user_ids": new_member_ids}):
+            if seq <= through:
+                changes["users"][user.id] = user
+
+    return {
+        "token": encode_token(max(through, 0)),
+        "has_more": bool(truncated),
+        "reset": reset,
+        **{kind: list(entities.values()) for kind, entities in changes.items()},
+    }
+
+def prune_tombstones(db: Session, before: datetime) -> int:
+    """Delete tombstones recorded before `before`; returns the number removed"""
+    pruned_through = db.scalar(select(func.max(SyncTombstone.change_seq)).where(SyncTombstone.occurred_at < before))
+    if pruned_through is None:
+        return 0
+    result = db.execute(delete(SyncTombstone).where(SyncTombstone.change_seq <= pruned_through))
+    db.execute(update(ChangeCounter).where(
+        ChangeCounter.id == 1, ChangeCounter.tombstones_pruned_through < pruned_through
+    ).values(tombstones_pruned_through=pruned_through))
+    db.commit()
+    return result.rowcount
+
+if __name__ == "__main__":
+    # python -m app.services.sync prune   (e.g. nightly from cron)
+    from app.db.session import SessionLocal
+
+    if sys.argv[1:] != ["prune"]:
+        sys.exit("usage: python -m app.services.sync prune")
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+    with SessionLocal() as db:
+        removed = prune_tombstones(db, cutoff)
+    print(f"Removed {removed} sync tombstones older than {cutoff.isoformat()}")
@@ -1,40 +1,101 @@
 from typing import Optional, List
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy import Row, bindparam, or_, select
 
+from app.db.writes import insert_returning
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
 
+# Lookup statements are built once at import time. SQLAlchemy caches their
+# compiled SQL by statement shape, so hot lookups only bind parameters instead
+# of constructing and compiling a Query on every call.
+_user_by_any_identifier = select(User).where(
+    or_(
+        User.username == bindparam("identifier"),
+        User.email == bindparam("identifier"),
+        User.phone_number == bindparam("identifier")
+    )
+).limit(1)
+_user_by_email = select(User).where(User.email == bindparam("email")).limit(1)
+_user_by_username = select(User).where(User.username == bindparam("username")).limit(1)
+_user_by_phone = select(User).where(User.phone_number == bindparam("phone")).limit(1)
+_user_by_firebase_uid = select(User).where(User.firebase_uid == bindparam("firebase_uid")).limit(1)
+_user_by_google_id = select(User).where(User.google_id == bindparam("google_id")).limit(1)
+_user_version = select(User.row_version).where(User.id == bindparam("user_id"))
+
+# Read models: plain column selects come back as slotted Row tuples with
+# attribute access, bypassing the identity map and change tracking. They are
+# for read-only endpoints that hand results straight to a response schema.
+_user_list = select(
+    User.id, User.username, User.email, User.phone_number, User.full_name,
+    User.avatar_url, User.is_active, User.is_verified, User.profile_completed,
+    User.auth_providers, User.created_at, User.updated_at,
+).order_by(User.id).offset(bindparam("skip")).limit(bindparam("limit"))
+_profile_status = select(
+    User.username, User.email, User.phone_number, User.full_name,
+    User.profile_completed, User.auth_providers, User.is_active, User.row_version,
+).where(User.id == bindparam("user_id"))
+
 def get_user_by_any_identifier(db: Session, identifier: str) -> Optional[User]:
     """Get a user by any identifier (username, email, or phone)"""
-    return db.query(User).filter(
-        or_(
-            User.username == identifier,
-            User.email == identifier,
-            User.phone_number == identifier
-        )
-    ).first()
+    return db.scalars(_user_by_any_identifier, {"identifier": identifier}).first()
 
 def get_user_by_email(db: Session, email: str) -> Optional[User]:
-    return db.query(User).filter(User.email == email).first()
+    return db.scalars(_user_by_email, {"email": email}).first()
 
 def get_user_by_username(db: Session, username: str) -> Optional[User]:
-    return db.query(User).filter(User.username == username).first()
+    return db.scalars(_user_by_username, {"username": username}).first()
 
 def get_user_by_phone(db: Session, phone: str) -> Optional[User]:
-    return db.query(User).filter(User.phone_number == phone).first()
+    return db.scalars(_user_by_phone, {"phone": phone}).first()
+
+def get_user_by_firebase_uid(db: Session, firebase_uid: str) -> Optional[User]:
+    return db.scalars(_user_by_firebase_uid, {"firebase_uid": firebase_uid}).first()
+
+def get_user_by_google_id(db: Session, google_id: str) -> Optional[User]:
+    return db.scalars(_user_by_google_id, {"google_id": google_id}).first()
 
 def get_user(db: Session, user_id: int) -> User:
-    db_user = db.query(User).filter(User.id == user_id).first()
+    # Session.get answers from the identity map when the user is already loaded
+    db_user = db.get(User, user_id)
     if not db_user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     return db_user
 
+def commit_user_changes(db: Session) -> None:
+    """
+    Commit changes to loaded users.
+
+    Updates are guarded by row_version; when another request changed the
+    user first, nothing is written and the caller gets a 409 to retry.
+    """
+    try:
+        db.commit()
+    except StaleDataError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="User was modified by another request, please retry"
+        )
+
+def get_user_version(db: Session, user_id: int) -> Optional[int]:
+    """Return only the row version of a user, without loading the full entity"""
+    return db.scalar(_user_version, {"user_id": user_id})
+
 def get_users(db: Session, skip: int = 0, limit: int = 100) -> List[User]:
     """Retrieve a list of users with pagination."""
     return db.query(User).offset(skip).limit(limit).all()
 
+def get_user_rows(db: Session, skip: int = 0, limit: int = 100) -> List[Row]:
+    """Paginated users as read-only rows carrying the public User schema fields"""
+    return db.execute(_user_list, {"skip": skip, "limit": limit}).all()
+
+def get_profile_status_row(db: Session, user_id: int) -> Optional[Row]:
+    """Only the columns the profile status needs, including is_active and row_version"""
+    return db.execute(_profile_status, {"user_id": user_id}).first()
+
 def create_user(db: Session, user_create: UserCreate) -> User:
     """Create a new user with basic validation"""
     from app.services.auth_provider import validate_auth_providers
@@ -47,24 +108,13 @@ def create_user(db: Session, user_create: UserCreate) -> User:
             detail="Username already taken"
         )
     
-    # Check for existing email if provided
-    if user_create.email:
-        existing_email = get_user_by_email(db, user_create.email)
-        if existing_email:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
-            )
-    
-    # Validate authentication providers and get prepared user data
+    # Validate authentication providers (including email uniqueness) and get prepared user data
     user_data = validate_auth_providers(db, user_create)
     
     # Create user
     try:
-        db_user = User(**user_data)
-        db.add(db_user)
+        db_user = insert_returning(db, User, user_data)
         db.commit()
-        db.refresh(db_user)
         return db_user
     except Exception as e:
         db.rollback()
@@ -111,12 +161,11 @@ def update_user(db: Session, user_id: int, user_update_schema: UserUpdate) -> Us
         setattr(db_user, key, value)
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    commit_user_changes(db)
     return db_user
 
 def delete_user(db: Session, user_id: int) -> User:
     db_user = get_user(db, user_id) # get_user will raise 404 if not found
     db.delete(db_user)
-    db.commit()
+    commit_user_changes(db)
     return db_user
\ No newline at end of file
@@ -0,0 +1,89 @@
+"""
+Monthly spend by category from rollups versus GROUP BY over raw expenses.
+
+Fills one group with random expenses spread over several years, builds its
+rollups with app.services.analytics.backfill_group_rollups, then times a
+last-12-months chart and a full-history chart both ways, against an
+in-memory SQLite database.
+
+Run from the backend directory:
+    python -m benchmarks.bench_analytics [expenses]
+"""
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.models.expense import Expense
+from app.models.group import Group
+from app.models.user import User
+from app.services.analytics import backfill_group_rollups, get_group_spend
+
+MEMBERS = 20
+CATEGORIES = ["food", "transport", "housing", "utilities", "fun", "travel", "groceries", "other"]
+YEARS = 5
+ROUNDS = 20
+END = date(2026, 10, 31)
+
+def setup_session(expenses: int):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine, expire_on_commit=False)()
+    db.execute(insert(User), [{"username": f"user{i}"} for i in range(MEMBERS)])
+    group = Group(name="bench", currency="EUR", created_by=1)
+    db.add(group)
+    db.commit()
+
+    rng = random.Random(1)
+    start = datetime(END.year - YEARS, 11, 1, tzinfo=timezone.utc)
+    span = (datetime(END.year, END.month, END.day, tzinfo=timezone.utc) - start).total_seconds()
+    rows = [
+        {
+            "group_id": group.id, "paid_by": rng.randint(1, MEMBERS), "created_by": 1,
+            "description": "bench", "category": rng.choice(CATEGORIES), "currency": "EUR",
+            "amount_minor": rng.randint(100, 100000),
+            "created_at": start + timedelta(seconds=rng.random() * span),
+        }
+        for _ in range(expenses)
+    ]
+    for i in range(0, len(rows), 10000):
+        db.execute(insert(Expense), rows[i:i + 10000])
+    db.commit()
+    return db, group.id
+
+def raw_monthly_spend(db, group_id, start):
+    month = func.strftime("%Y-%m", Expense.created_at)
+    return db.execute(
+        select(month, Expense.category, func.sum(Expense.amount_minor), func.count())
+        .where(Expense.group_id == group_id, Expense.created_at >= start)
+        .group_by(month, Expense.category)
+    ).all()
+
+def measure(label, query):
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        query()
+    elapsed = (time.perf_counter() - started) / ROUNDS
+    print(f"{label:<34} {elapsed * 1000:8.2f} ms")
+    return elapsed
+
+def main(expenses: int = 200000):
+    db, group_id = setup_session(expenses)
+    started = time.perf_counter()
+    backfill_group_rollups(db, group_id)
+    print(f"{expenses} expenses over {YEARS} years, backfilled in {time.perf_counter() - started:.2f}s")
+
+    year_ago = date(END.year - 1, END.month + 1 if END.month < 12 else 1, 1)
+    history = date(END.year - YEARS, 11, 1)
+    raw = measure("last 12 months, raw GROUP BY", lambda: raw_monthly_spend(db, group_id, year_ago))
+    rolled = measure("last 12 months, rollups", lambda: get_group_spend(db, group_id, "month", year_ago, END))
+    measure("full history, raw GROUP BY", lambda: raw_monthly_spend(db, group_id, history))
+    measure("full history, rollups", lambda: get_group_spend(db, group_id, "month", history, END))
+    print(f"speedup for 12 months: {raw / rolled:.1f}x")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
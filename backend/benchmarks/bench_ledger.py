@@ -0,0 +1,75 @@
+"""
+Cost of rebuilding group balances from the ledger, with and without snapshots.
+
+Fills one group's ledger with random expense events through
+app.services.ledger.record_events (snapshotting every LEDGER_SNAPSHOT_EVERY
+events), then times balances_at for the latest state and for a point in the
+middle of the history, against an in-memory SQLite database.
+
+Run from the backend directory:
+    python -m benchmarks.bench_ledger [events]
+"""
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from freezegun import freeze_time
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db.base import Base
+from app.models.group import Group
+from app.models.user import User
+from app.services.balances import expense_deltas
+from app.services.ledger import PendingEvent, balances_at, record_events
+
+MEMBERS = 20
+BATCH = 100
+ROUNDS = 20
+
+def setup_session(events: int):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine, expire_on_commit=False)()
+    db.execute(insert(User), [{"username": f"user{i}"} for i in range(MEMBERS)])
+    group = Group(name="bench", created_by=1)
+    db.add(group)
+    db.commit()
+
+    rng = random.Random(1)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    for batch_start in range(0, events, BATCH):
+        pending = []
+        for i in range(batch_start, min(batch_start + BATCH, events)):
+            amount = rng.randint(100, 100000)
+            payer = rng.randint(1, MEMBERS)
+            shares = {user_id: amount // MEMBERS for user_id in range(1, MEMBERS + 1)}
+            shares[payer] += amount - sum(shares.values())
+            pending.append(PendingEvent("expense_created", i, {}, expense_deltas(payer, amount, shares)))
+        with freeze_time(start + timedelta(minutes=batch_start)):
+            record_events(db, group.id, 1, pending)
+        db.commit()
+    middle = start + timedelta(minutes=events // 2)
+    return db, group.id, middle
+
+def measure(label, db, group_id, at, use_snapshots):
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        balances_at(db, group_id, at, use_snapshots=use_snapshots)
+    elapsed = (time.perf_counter() - started) / ROUNDS
+    print(f"{label:<34} {elapsed * 1000:8.2f} ms")
+    return elapsed
+
+def main(events: int = 20000):
+    db, group_id, middle = setup_session(events)
+    print(f"{events} events, {MEMBERS} members, snapshot every {settings.LEDGER_SNAPSHOT_EVERY}")
+    full = measure("latest, full replay", db, group_id, None, False)
+    snap = measure("latest, from snapshot", db, group_id, None, True)
+    measure("midpoint, full replay", db, group_id, middle, False)
+    measure("midpoint, from snapshot", db, group_id, middle, True)
+    print(f"speedup at latest: {full / snap:.1f}x")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,44 @@
+"""
+Settle-up computation time across group sizes.
+
+Balances are random and sum to zero. The greedy pass is timed for every
+size, the exact solver only up to its member limit.
+
+Run from the backend directory:
+    python -m benchmarks.bench_settlement [rounds]
+"""
+import random
+import sys
+import time
+
+from app.services.settlement import (
+    EXACT_SOLVER_MAX_MEMBERS, simplify_debts_exact, simplify_debts_greedy
+)
+
+SIZES = [5, 10, 12, 100, 1000, 10000, 100000]
+
+def random_balances(members: int, rng: random.Random):
+    amounts = [rng.randint(-100000, 100000) for _ in range(members - 1)]
+    amounts.append(-sum(amounts))
+    return dict(enumerate(amounts, start=1))
+
+def measure(solver, balances, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        transfers = solver(balances)
+    return (time.perf_counter() - started) / rounds, len(transfers)
+
+def main(rounds: int = 5):
+    rng = random.Random(42)
+    print(f"{'members':>8} {'greedy ms':>10} {'transfers':>10} {'exact ms':>10} {'transfers':>10}")
+    for size in SIZES:
+        balances = random_balances(size, rng)
+        greedy_time, greedy_count = measure(simplify_debts_greedy, balances, rounds)
+        line = f"{size:>8} {greedy_time * 1000:>10.2f} {greedy_count:>10}"
+        if size <= EXACT_SOLVER_MAX_MEMBERS:
+            exact_time, exact_count = measure(simplify_debts_exact, balances, rounds)
+            line += f" {exact_time * 1000:>10.2f} {exact_count:>10}"
+        print(line)
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
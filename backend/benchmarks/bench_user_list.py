@@ -0,0 +1,71 @@
+"""
+Cost of listing users as ORM entities versus column rows.
+
+Both paths load a page of users and serialize it with the public User
+schema, as GET /api/users/ does. Time and peak allocated memory are
+reported per 1,000 users listed, against an in-memory SQLite database.
+
+Run from the backend directory:
+    python -m benchmarks.bench_user_list [rounds]
+"""
+import sys
+import time
+import tracemalloc
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.models.user import User
+from app.schemas.user import User as UserSchema
+from app.services.user import get_users, get_user_rows
+
+USERS = 1000
+
+serializer = TypeAdapter(List[UserSchema])
+
+def setup_sessionmaker():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+    with Session() as session:
+        session.add_all(
+            User(
+                username=f"user{i}", email=f"user{i}@example.com", full_name=f"User {i}",
+                auth_providers=["email"],
+            )
+            for i in range(USERS)
+        )
+        session.commit()
+    return Session
+
+def list_and_serialize(Session, load):
+    # A fresh session per round, like a request
+    with Session() as db:
+        return serializer.dump_json(serializer.validate_python(load(db, skip=0, limit=USERS), from_attributes=True))
+
+def measure(label, Session, load, rounds):
+    list_and_serialize(Session, load)  # warm caches
+    started = time.perf_counter()
+    for _ in range(rounds):
+        list_and_serialize(Session, load)
+    elapsed = (time.perf_counter() - started) / rounds
+
+    tracemalloc.start()
+    list_and_serialize(Session, load)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{label:<20} {elapsed * 1000:8.2f} ms  {peak / 1024:8.0f} KiB peak  per {USERS} users")
+    return elapsed, peak
+
+def main(rounds: int = 50):
+    Session = setup_sessionmaker()
+    orm_time, orm_peak = measure("ORM entities", Session, get_users, rounds)
+    row_time, row_peak = measure("column rows", Session, get_user_rows, rounds)
+    print(f"speedup: {orm_time / row_time:.2f}x, peak memory: {row_peak / orm_peak:.0%} of ORM")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
@@ -0,0 +1,64 @@
+"""
+Per-lookup Python overhead of user lookups.
+
+Compares the previous `db.query(User).filter(...).first()` pattern with the
+prebuilt statements in app.services.user against an in-memory SQLite
+database, so the numbers are dominated by ORM construction and compilation
+rather than I/O.
+
+Run from the backend directory:
+    python -m benchmarks.bench_user_lookups [iterations]
+"""
+import sys
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.models.user import User
+from app.services.user import get_user_by_email, get_user_by_any_identifier
+
+USERS = 1000
+
+def setup_session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all(
+        User(username=f"user{i}", email=f"user{i}@example.com", phone_number=f"+1555{i:07d}")
+        for i in range(USERS)
+    )
+    session.commit()
+    return engine, session
+
+def query_by_email(db, email):
+    return db.query(User).filter(User.email == email).first()
+
+def query_by_any_identifier(db, identifier):
+    return db.query(User).filter(
+        (User.username == identifier) | (User.email == identifier) | (User.phone_number == identifier)
+    ).first()
+
+def measure(label, lookup, db, iterations):
+    emails = [f"user{i % USERS}@example.com" for i in range(iterations)]
+    lookup(db, emails[0])  # warm the compiled cache
+    started = time.perf_counter()
+    for email in emails:
+        lookup(db, email)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<40} {elapsed / iterations * 1e6:8.1f} us/lookup")
+    return elapsed
+
+def main(iterations: int = 20000):
+    engine, db = setup_session()
+    print(f"{iterations} lookups over {USERS} users")
+    baseline = measure("query().filter() by email", query_by_email, db, iterations)
+    prebuilt = measure("prebuilt statement by email", get_user_by_email, db, iterations)
+    measure("query().filter() by any identifier", query_by_any_identifier, db, iterations)
+    measure("prebuilt statement by any identifier", get_user_by_any_identifier, db, iterations)
+    print(f"speedup by email: {baseline / prebuilt:.2f}x")
+    print(f"compiled cache entries: {len(engine._compiled_cache)}")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -47,7 +47,7 @@ def before_cursor_execute(conn, cursor, statement, params, context, executemany)
                 if isinstance(value, datetime):
                     params[i] = adapt_datetime_with_timezone(value)
 
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 @pytest.fixture(scope="function")
 def db():
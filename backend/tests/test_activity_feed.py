@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import status
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.models.activity_feed import ActivityFeedItem
+from app.schemas.user import UserCreate
+from app.services.activity_feed import FeedCursor, decode_cursor, encode_cursor, trim_feeds
+from app.services.user import create_user
+
+
+@pytest.fixture
+def other_user(db):
+    return create_user(db, UserCreate(username="otheruser", email="other@example.com", password="password123"))
+
+
+@pytest.fixture
+def other_headers(client, other_user):
+    token = client.post(
+        "/api/auth/email/login", data={"username": "otheruser", "password": "password123"}
+    ).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def make_group(client, name, member_ids=()):
+    group_id = client.post("/api/groups/", json={"name": name}).json()["id"]
+    for user_id in member_ids:
+        client.post(f"/api/groups/{group_id}/members", json={"user_id": user_id})
+    return group_id
+
+
+def add_expenses(client, group_id, *descriptions):
+    response = client.post(f"/api/groups/{group_id}/expenses/batch", json={
+        "expenses": [{"description": d, "amount_minor": 100} for d in descriptions]
+    })
+    assert response.status_code == status.HTTP_201_CREATED
+
+
+def read_all(client, limit, headers=None):
+    descriptions, before = [], None
+    while True:
+        params = {"limit": limit} if before is None else {"limit": limit, "before": before}
+        page = client.get("/api/feed/", params=params, headers=headers).json()
+        descriptions += [item["payload"]["description"] for item in page["items"]]
+        before = page["next_cursor"]
+        if before is None:
+            return descriptions
+
+
+class TestActivityFeed:
+    def test_small_groups_fan_out_to_members(self, authenticated_client, db, other_user, other_headers):
+        group_id = make_group(authenticated_client, "Flat", [other_user.id])
+        add_expenses(authenticated_client, group_id, "Rent", "Power", "Water")
+        add_expenses(authenticated_client, group_id, "Internet")
+
+        assert db.scalar(select(func.count()).select_from(ActivityFeedItem)) == 8
+        expected = ["Internet", "Water", "Power", "Rent"]
+        assert read_all(authenticated_client, limit=10) == expected
+        # Keyset pages split events recorded in one batch without gaps or repeats
+        assert read_all(authenticated_client, limit=1) == expected
+        assert read_all(authenticated_client, limit=3, headers=other_headers) == expected
+
+    def test_large_groups_merge_at_read_time(self, authenticated_client, db, other_user, monkeypatch):
+        small = make_group(authenticated_client, "Solo")
+        large = make_group(authenticated_client, "Club", [other_user.id])
+        monkeypatch.setattr(settings, "FEED_FANOUT_MAX_MEMBERS", 1)
+
+        add_expenses(authenticated_client, small, "Lunch")
+        add_expenses(authenticated_client, large, "Hall", "Drinks")
+        add_expenses(authenticated_client, small, "Dinner")
+
+        rows = db.execute(select(ActivityFeedItem.group_id, ActivityFeedItem.seq)).all()
+        assert rows == [(small, 1), (small, 2)]
+        assert read_all(authenticated_client, limit=2) == ["Dinner", "Drinks", "Hall", "Lunch"]
+
+        # The switch is one-way: shrinking the limit again does not duplicate events
+        monkeypatch.setattr(settings, "FEED_FANOUT_MAX_MEMBERS", 50)
+        add_expenses(authenticated_client, large, "Music")
+        assert read_all(authenticated_client, limit=50) == ["Music", "Dinner", "Drinks", "Hall", "Lunch"]
+
+    def test_members_only_see_events_since_joining(self, authenticated_client, db, other_user, other_headers):
+        group_id = make_group(authenticated_client, "Flat")
+        add_expenses(authenticated_client, group_id, "Deposit")
+        authenticated_client.post(f"/api/groups/{group_id}/members", json={"user_id": other_user.id})
+        add_expenses(authenticated_client, group_id, "Rent")
+        assert read_all(authenticated_client, limit=10, headers=other_headers) == ["Rent"]
+
+    def test_retention(self, authenticated_client, db, monkeypatch):
+        group_id = make_group(authenticated_client, "Flat")
+        add_expenses(authenticated_client, group_id, "Rent")
+        monkeypatch.setattr(settings, "FEED_RETENTION_DAYS", -1)
+        assert read_all(authenticated_client, limit=10) == []
+
+        assert trim_feeds(db, datetime.now(timezone.utc) - timedelta(days=1)) == 0
+        assert trim_feeds(db, datetime.now(timezone.utc) + timedelta(days=1)) == 1
+
+    def test_invalid_cursor(self, authenticated_client):
+        response = authenticated_client.get("/api/feed/", params={"before": "not-a-cursor"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_cursor_round_trip():
+    cursor = FeedCursor(datetime(2026, 1, 2, 3, 4, 5, 6, tzinfo=timezone.utc), 7, 8)
+    assert decode_cursor(encode_cursor(cursor)) == cursor
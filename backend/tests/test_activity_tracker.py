@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+
+from app.models.user import User
+from app.services.activity_tracker import ActivityBuffer
+
+
+def make_buffer(db):
+    return ActivityBuffer(db.get_bind(), flush_interval=3600)
+
+
+def test_updates_are_coalesced_per_user(db, test_user):
+    buffer = make_buffer(db)
+    login = datetime(2026, 1, 1, 12, 0)
+    buffer.record_login(test_user.id, at=login)
+    for minutes in range(1, 4):
+        buffer.record_seen(test_user.id, at=login + timedelta(minutes=minutes))
+
+    assert buffer.stats()["buffer_size"] == 1
+    assert buffer.flush() == 1
+
+    db.expire_all()
+    user = db.get(User, test_user.id)
+    assert user.last_login_at.replace(tzinfo=None) == login
+    assert user.last_seen_at.replace(tzinfo=None) == login + timedelta(minutes=3)
+
+
+def test_flush_batches_many_users(db, test_user, phone_auth_user):
+    buffer = make_buffer(db)
+    seen = datetime(2026, 1, 2, 8, 30)
+    buffer.record_seen(test_user.id, at=seen)
+    buffer.record_seen(phone_auth_user.id, at=seen)
+
+    assert buffer.flush() == 2
+    stats = buffer.stats()
+    assert stats["buffer_size"] == 0
+    assert stats["flushes"] == 1
+    assert stats["rows_flushed"] == 2
+
+    db.expire_all()
+    # Seeing a user must not overwrite their last login
+    assert db.get(User, test_user.id).last_login_at is None
+    assert db.get(User, phone_auth_user.id).last_seen_at.replace(tzinfo=None) == seen
+
+
+def test_stop_flushes_pending_activity(db, test_user):
+    buffer = make_buffer(db)
+    buffer.start()
+    buffer.record_seen(test_user.id, at=datetime(2026, 1, 3))
+    buffer.stop()
+
+    assert buffer.stats()["buffer_size"] == 0
+    db.expire_all()
+    assert db.get(User, test_user.id).last_seen_at is not None
@@ -0,0 +1,118 @@
+from datetime import date, datetime, timezone
+
+import pytest
+from fastapi import status
+from sqlalchemy import select
+
+from app.models.spend_rollup import SpendRollup
+from app.schemas.user import UserCreate
+from app.services.analytics import backfill_group_rollups
+from app.services.user import create_user
+
+
+@pytest.fixture
+def other_user(db):
+    return create_user(db, UserCreate(username="otheruser", email="other@example.com", password="password123"))
+
+
+@pytest.fixture
+def group_id(authenticated_client, other_user):
+    group_id = authenticated_client.post("/api/groups/", json={"name": "Flat", "currency": "EUR"}).json()["id"]
+    authenticated_client.post(f"/api/groups/{group_id}/members", json={"user_id": other_user.id})
+    return group_id
+
+
+def this_month():
+    return datetime.now(timezone.utc).date().replace(day=1)
+
+
+def rollups(db):
+    db.expire_all()
+    return sorted(
+        (r.period, r.period_start, r.category, r.paid_by, r.amount_minor, r.expense_count)
+        for r in db.scalars(select(SpendRollup)) if r.expense_count
+    )
+
+
+class TestSpendRollups:
+    def test_maintained_on_writes_and_equal_to_backfill(self, authenticated_client, db, group_id, test_user, other_user):
+        url = f"/api/groups/{group_id}/expenses"
+        authenticated_client.post(f"{url}/batch", json={"expenses": [
+            {"description": "Pizza", "category": "Food", "amount_minor": 2000},
+            {"description": "Bus", "category": "transport", "amount_minor": 300},
+            {"description": "Sushi", "category": "food", "amount_minor": 1000, "paid_by": other_user.id},
+        ]})
+        bus_id = authenticated_client.get(url).json()[1]["id"]
+        authenticated_client.put(f"{url}/{bus_id}", json={"description": "Taxi", "category": "transport", "amount_minor": 900})
+        taxi = authenticated_client.post(url, json={"description": "Taxi", "amount_minor": 500}).json()
+        assert taxi["category"] == "other"
+        authenticated_client.delete(f"{url}/{taxi['id']}")
+
+        month = this_month()
+        assert [row for row in rollups(db) if row[0] == "month"] == [
+            ("month", month, "food", test_user.id, 2000, 1),
+            ("month", month, "food", other_user.id, 1000, 1),
+            ("month", month, "transport", test_user.id, 900, 1),
+        ]
+        incremental = rollups(db)
+        assert backfill_group_rollups(db, group_id, chunk_size=2) == 3
+        assert rollups(db) == incremental
+
+    def test_group_spend_endpoints(self, authenticated_client, group_id, test_user, other_user):
+        authenticated_client.post(f"/api/groups/{group_id}/expenses/batch", json={"expenses": [
+            {"description": "Pizza", "category": "food", "amount_minor": 2000},
+            {"description": "Sushi", "category": "food", "amount_minor": 1000, "paid_by": other_user.id},
+            {"description": "Bus", "category": "transport", "amount_minor": 300},
+        ]})
+        month = this_month().isoformat()
+        spend = authenticated_client.get(f"/api/analytics/groups/{group_id}/spend").json()
+        assert spend["currency"] == "EUR"
+        assert [(r["period_start"], r["category"], r["amount_minor"], r["expense_count"]) for r in spend["rows"]] == [
+            (month, "food", 3000, 2), (month, "transport", 300, 1)
+        ]
+
+        by_payer = authenticated_client.get(
+            f"/api/analytics/groups/{group_id}/spend", params={"period": "day", "group_by": "paid_by"}
+        ).json()["rows"]
+        assert [(r["paid_by"], r["amount_minor"], r["category"]) for r in by_payer] == [
+            (test_user.id, 2300, None), (other_user.id, 1000, None)
+        ]
+
+        mine = authenticated_client.get("/api/analytics/me/spend").json()
+        assert [(r["currency"], r["category"], r["amount_minor"]) for r in mine] == [
+            ("EUR", "food", 2000), ("EUR", "transport", 300)
+        ]
+
+        trend = authenticated_client.get(f"/api/analytics/groups/{group_id}/trend", params={"months": 3}).json()
+        assert [(p["amount_minor"], p["change_minor"]) for p in trend["months"]] == [(0, None), (0, 0), (3300, 3300)]
+        assert trend["months"][-1]["period_start"] == month
+
+    def test_recurring_occurrences_count_on_their_day(self, authenticated_client, db, group_id, test_user):
+        from sqlalchemy.orm import sessionmaker
+        from app.db.advisory_lock import AdvisoryLeaderLock
+        from app.services.recurring import RecurringScheduler
+
+        authenticated_client.post(f"/api/groups/{group_id}/recurring-expenses", json={
+            "description": "Rent", "category": "housing", "amount_minor": 50000, "start_on": "2026-01-31",
+            "ends_on": "2026-02-28",
+        })
+        scheduler = RecurringScheduler(
+            sessionmaker(bind=db.get_bind(), expire_on_commit=False), AdvisoryLeaderLock(db.get_bind(), key=1),
+            interval=3600, horizon=300, batch_size=10,
+        )
+        scheduler.tick(datetime(2026, 3, 1, tzinfo=timezone.utc))
+        assert [row for row in rollups(db) if row[0] == "month"] == [
+            ("month", date(2026, 1, 1), "housing", test_user.id, 50000, 1),
+            ("month", date(2026, 2, 1), "housing", test_user.id, 50000, 1),
+        ]
+
+    def test_range_validation(self, authenticated_client, group_id):
+        url = f"/api/analytics/groups/{group_id}/spend"
+        response = authenticated_client.get(url, params={"start": "2026-02-01", "end": "2026-01-01"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        response = authenticated_client.get(url, params={"period": "day", "start": "2024-01-01", "end": "2026-01-01"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_non_member(self, authenticated_client):
+        response = authenticated_client.get("/api/analytics/groups/9999/spend")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
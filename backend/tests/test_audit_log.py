@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta, timezone
+
+from app.models.auth_event import AuthEvent
+from app.services.audit_log import AuditLog, purge_auth_events, query_auth_events
+
+
+def make_log(db, max_queue=100, batch_size=10):
+    return AuditLog(db.get_bind(), max_queue=max_queue, batch_size=batch_size, flush_interval=3600)
+
+
+def test_events_are_batch_written(db, test_user):
+    log = make_log(db, batch_size=2)
+    log.record("login", user_id=test_user.id, provider="email", ip_address="127.0.0.1")
+    log.record("login_failed", provider="email", identifier="testuser")
+    log.record("link", user_id=test_user.id, provider="phone")
+
+    assert log.flush() == 3
+    assert log.stats()["written"] == 3
+    assert db.query(AuthEvent).count() == 3
+
+
+def test_full_queue_drops_and_counts(db):
+    log = make_log(db, max_queue=2)
+    assert log.record("login", user_id=1)
+    assert log.record("login", user_id=2)
+    assert not log.record("login", user_id=3)
+
+    stats = log.stats()
+    assert stats["queue_size"] == 2
+    assert stats["dropped"] == 1
+
+
+def test_query_by_time_range_and_type(db, test_user):
+    log = make_log(db)
+    log.record("login", user_id=test_user.id)
+    log.record("login_failed", identifier="testuser")
+    log.flush()
+
+    now = datetime.now(timezone.utc)
+    events = query_auth_events(db, now - timedelta(minutes=5), now + timedelta(minutes=5), event_type="login")
+    assert [event.user_id for event in events] == [test_user.id]
+    assert query_auth_events(db, now + timedelta(minutes=1), now + timedelta(minutes=5)) == []
+
+
+def test_purge_removes_old_events(db):
+    log = make_log(db)
+    log.record("login", user_id=1)
+    log.flush()
+
+    assert purge_auth_events(db, datetime.now(timezone.utc) - timedelta(days=1)) == 0
+    assert purge_auth_events(db, datetime.now(timezone.utc) + timedelta(minutes=1)) == 1
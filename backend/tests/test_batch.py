@@ -0,0 +1,136 @@
+import anyio
+import pytest
+from fastapi import FastAPI, status
+
+from app.core.config import settings
+from app.schemas.batch import BatchSubRequest
+from app.services.batch import run_batch
+
+
+@pytest.fixture(autouse=True)
+def serial_reads(monkeypatch):
+    # The test client shares one session between all requests
+    monkeypatch.setattr(settings, "BATCH_READ_CONCURRENCY", 1)
+
+
+def batch(client, *requests):
+    response = client.post("/api/batch/", json={"requests": list(requests)})
+    assert response.status_code == status.HTTP_200_OK, response.text
+    return response.json()["responses"]
+
+
+class TestBatch:
+    def test_app_start_in_one_round_trip(self, authenticated_client, test_user):
+        group = authenticated_client.post("/api/groups/", json={"name": "Flat", "currency": "EUR"}).json()
+        me, profile, groups = batch(
+            authenticated_client,
+            {"id": "me", "path": "/users/me"},
+            {"id": "profile", "path": "/users/me/profile-status"},
+            {"id": "groups", "path": "/groups/"},
+        )
+        assert (me["id"], me["status"], me["body"]["id"]) == ("me", 200, test_user.id)
+        assert me["headers"]["etag"].startswith('W/"user-')
+        assert profile["status"] == 200 and profile["body"]["has_email"] is True
+        assert [g["id"] for g in groups["body"]] == [group["id"]]
+
+    def test_writes_run_in_order(self, authenticated_client):
+        group_id = authenticated_client.post("/api/groups/", json={"name": "Flat", "currency": "EUR"}).json()["id"]
+        url = f"/groups/{group_id}/expenses"
+        first, second, listed = batch(
+            authenticated_client,
+            {"method": "POST", "path": url, "body": {"description": "Pizza", "amount_minor": 2000}},
+            {"method": "POST", "path": url, "body": {"description": "Bus", "amount_minor": 300}},
+            {"path": f"{url}?limit=10"},
+        )
+        assert first["status"] == second["status"] == status.HTTP_201_CREATED
+        assert [e["description"] for e in listed["body"]] == ["Bus", "Pizza"]
+
+    def test_failures_are_per_sub_request(self, authenticated_client):
+        missing, invalid, me = batch(
+            authenticated_client,
+            {"path": "/groups/9999"},
+            {"method": "POST", "path": "/groups/", "body": {"currency": "EUR"}},
+            {"path": "/users/me"},
+        )
+        assert missing["status"] == status.HTTP_404_NOT_FOUND
+        assert missing["body"] == {"detail": "Group not found"}
+        assert invalid["status"] == status.HTTP_422_UNPROCESSABLE_CONTENT
+        assert me["status"] == status.HTTP_200_OK
+
+    def test_sub_request_headers(self, authenticated_client):
+        etag = authenticated_client.get("/api/users/me").headers["etag"]
+        [response] = batch(authenticated_client, {"path": "/users/me", "headers": {"If-None-Match": etag}})
+        assert response["status"] == status.HTTP_304_NOT_MODIFIED
+        assert response["body"] is None
+
+    def test_requires_authentication(self, client):
+        response = client.post("/api/batch/", json={"requests": [{"path": "/users/me"}]},
+                               headers={"Authorization": ""})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_rejects_nested_and_oversized_batches(self, authenticated_client):
+        nested = authenticated_client.post("/api/batch/", json={"requests": [{"method": "POST", "path": "/batch/"}]})
+        assert nested.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+        too_many = [{"path": "/users/me"}] * (settings.BATCH_MAX_REQUESTS + 1)
+        oversized = authenticated_client.post("/api/batch/", json={"requests": too_many})
+        assert oversized.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+
+class TestConcurrency:
+    def test_reads_overlap_and_writes_do_not(self, monkeypatch):
+        monkeypatch.setattr(settings, "BATCH_READ_CONCURRENCY", 4)
+        app = FastAPI()
+        running, log = [0], []
+
+        async def track(name):
+            running[0] += 1
+            log.append((name, running[0]))
+            await anyio.sleep(0.05)
+            running[0] -= 1
+            return {"name": name}
+
+        @app.get("/api/read/{name}")
+        async def read(name: str):
+            return await track(name)
+
+        @app.post("/api/write/{name}")
+        async def write(name: str):
+            return await track(name)
+
+        requests = [
+            BatchSubRequest(path="/read/a"), BatchSubRequest(path="/read/b"), BatchSubRequest(path="/read/c"),
+            BatchSubRequest(method="POST", path="/write/d"),
+            BatchSubRequest(path="/read/e"),
+        ]
+        scope = {"type": "http", "headers": [], "client": ("127.0.0.1", 1), "server": ("test", 80)}
+        responses = anyio.run(run_batch, app, scope, "/api", requests, None, None)
+
+        assert [r["body"]["name"] for r in responses] == ["a", "b", "c", "d", "e"]
+        concurrency = dict(log)
+        assert concurrency["c"] == 3
+        assert concurrency["d"] == concurrency["e"] == 1
+
+    def test_only_reads_time_out(self, monkeypatch):
+        monkeypatch.setattr(settings, "BATCH_SUBREQUEST_TIMEOUT_SECONDS", 0.05)
+        app = FastAPI()
+
+        @app.get("/api/slow")
+        async def slow_read():
+            await anyio.sleep(0.2)
+            return {}
+
+        @app.post("/api/slow")
+        async def slow_write():
+            await anyio.sleep(0.2)
+            return {"written": True}
+
+        requests = [
+            BatchSubRequest(method="POST", path="/slow"),
+            BatchSubRequest(path="/slow"), BatchSubRequest(path="/slow"),
+        ]
+        scope = {"type": "http", "headers": [], "client": ("127.0.0.1", 1), "server": ("test", 80)}
+        write, *reads = anyio.run(run_batch, app, scope, "/api", requests, None, None)
+
+        # A write may commit before any timeout could cancel it; it always runs to the end
+        assert (write["status"], write["body"]) == (200, {"written": True})
+        assert [read["status"] for read in reads] == [504, 504]
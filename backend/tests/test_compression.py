@@ -0,0 +1,136 @@
+import gzip
+
+import pytest
+from fastapi import Depends, FastAPI, Response, status
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.compression import CompressionCache, CompressionMiddleware, compression, negotiate
+from app.core.config import settings
+
+BODY = "a fairly repetitive line of text\n" * 200
+
+
+@pytest.fixture
+def cache():
+    return CompressionCache(max_bytes=1024 * 1024)
+
+
+@pytest.fixture
+def app_client(cache):
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500, levels={"gzip": 6}, cache=cache)
+
+    @app.get("/text")
+    def text():
+        return PlainTextResponse(BODY)
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("tiny")
+
+    @app.get("/tagged")
+    def tagged():
+        return PlainTextResponse(BODY, headers={"ETag": 'W/"text-1-v1"'})
+
+    @app.get("/fast", dependencies=[Depends(compression(gzip=1))])
+    def fast():
+        return PlainTextResponse(BODY)
+
+    @app.get("/off", dependencies=[Depends(compression(enabled=False))])
+    def off():
+        return PlainTextResponse(BODY)
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse((f"row {i}\n" for i in range(500)), media_type="text/csv")
+
+    @app.get("/events")
+    def events():
+        return StreamingResponse(iter([BODY]), media_type="text/event-stream")
+
+    @app.get("/binary")
+    def binary():
+        return Response(BODY.encode(), media_type="application/octet-stream")
+
+    return TestClient(app)
+
+
+def get(client, path, accept="gzip"):
+    return client.get(path, headers={"Accept-Encoding": accept})
+
+
+class TestNegotiation:
+    def test_client_weights_then_server_order(self):
+        assert negotiate("gzip, br, zstd", ["zstd", "br", "gzip"]) == "zstd"
+        assert negotiate("gzip;q=1.0, br;q=0.5", ["zstd", "br", "gzip"]) == "gzip"
+        assert negotiate("*;q=0.1, gzip;q=0", ["gzip"]) is None
+        assert negotiate("*", ["br", "gzip"]) == "br"
+        assert negotiate("identity", ["gzip"]) is None
+        assert negotiate("", ["gzip"]) is None
+
+
+class TestCompressionMiddleware:
+    def test_compresses_large_bodies(self, app_client):
+        response = get(app_client, "/text")
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert int(response.headers["content-length"]) < len(BODY) // 10
+        assert response.text == BODY
+
+    def test_leaves_small_and_unsuitable_bodies(self, app_client):
+        for path in ("/small", "/events", "/binary", "/off"):
+            assert "content-encoding" not in get(app_client, path).headers, path
+        assert "content-encoding" not in get(app_client, "/text", accept="identity").headers
+
+    def test_route_levels(self, app_client):
+        def xfl(path):
+            # Byte 8 of a gzip member: 4 for the fastest level, 0 otherwise
+            with app_client.stream("GET", path, headers={"Accept-Encoding": "gzip"}) as response:
+                return b"".join(response.iter_raw())[8]
+
+        assert (xfl("/text"), xfl("/fast")) == (0, 4)
+
+    def test_streams_chunk_by_chunk(self, app_client):
+        with app_client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+            assert response.headers["content-encoding"] == "gzip"
+            assert "content-length" not in response.headers
+            raw = b"".join(response.iter_raw())
+        assert gzip.decompress(raw).decode() == "".join(f"row {i}\n" for i in range(500))
+
+    def test_etagged_bodies_are_compressed_once(self, app_client, cache):
+        first = get(app_client, "/tagged")
+        second = get(app_client, "/tagged")
+        assert first.content == second.content
+        assert cache.stats() == {"entries": 1, "bytes": int(first.headers["content-length"]), "hits": 1, "misses": 1}
+
+        get(app_client, "/text")
+        assert cache.stats()["entries"] == 1
+
+
+class TestCompressionCache:
+    def test_evicts_least_recently_used(self):
+        cache = CompressionCache(max_bytes=10)
+        keys = [cache.key("gzip", 6, body) for body in (b"a", b"b", b"c")]
+        cache.put(keys[0], b"1234")
+        cache.put(keys[1], b"1234")
+        assert cache.get(keys[0]) == b"1234"
+        cache.put(keys[2], b"1234")
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[0]) == cache.get(keys[2]) == b"1234"
+        assert cache.stats()["bytes"] == 8
+
+
+class TestAppCompression:
+    def test_group_export_is_compressed(self, authenticated_client, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "EXPORT_CACHE_DIR", str(tmp_path))
+        group_id = authenticated_client.post("/api/groups/", json={"name": "Flat", "currency": "EUR"}).json()["id"]
+        authenticated_client.post(f"/api/groups/{group_id}/expenses/batch", json={"expenses": [
+            {"description": f"Item {i}", "amount_minor": 100 + i} for i in range(50)
+        ]})
+        response = authenticated_client.get(
+            f"/api/groups/{group_id}/export.csv", headers={"Accept-Encoding": "gzip"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.text.count("Item ") == 50
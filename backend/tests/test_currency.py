@@ -0,0 +1,114 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from fastapi import status
+
+from app.core.config import settings
+from app.schemas.user import UserCreate
+from app.services.currency import convert_amounts, convert_minor, load_rates_file, rate_cache
+from app.services.user import create_user
+
+RATES = """date,currency,rate
+2026-10-16,USD,1.1000
+2026-10-16,JPY,160.00
+2026-10-19,USD,1.2500
+"""
+
+
+@pytest.fixture
+def rates(db):
+    load_rates_file(db, RATES)
+    yield
+    rate_cache.clear()
+
+
+def test_convert_minor_handles_exponents():
+    # 1000 JPY at 0.01 USD per yen is 10.00 USD
+    assert convert_minor(1000, "JPY", "USD", Decimal("0.01")) == 1000
+    assert convert_minor(1005, "USD", "JPY", Decimal("1")) == 10
+
+
+def test_batch_uses_latest_rate_on_or_before_the_day(db, rates):
+    assert settings.FX_BASE_CURRENCY == "EUR"
+    converted = convert_amounts(db, [(1250, "USD"), (16000, "JPY"), (500, "EUR")], "EUR", day=date(2026, 10, 19))
+    assert [amount for amount, _ in converted] == [1000, 10000, 500]
+    # Friday's JPY rate carries over; one query for the whole batch
+    assert rate_cache.stats()["misses"] == 1
+
+    convert_amounts(db, [(100, "USD")], "EUR", day=date(2026, 10, 19))
+    assert rate_cache.stats()["hits"] == 1
+
+
+def test_missing_rate(db, rates):
+    with pytest.raises(Exception) as error:
+        convert_amounts(db, [(100, "GBP")], "EUR", day=date(2026, 10, 19))
+    assert "GBP" in error.value.detail
+
+
+def test_invalid_file_line(db):
+    with pytest.raises(ValueError, match="line 2"):
+        load_rates_file(db, "date,currency,rate\n2026-10-16,USD,-1\n")
+
+
+def test_foreign_expense_stores_rate(authenticated_client, db, test_user, monkeypatch):
+    monkeypatch.setattr("app.services.currency.date", type("FixedDate", (date,), {"today": staticmethod(lambda: date(2026, 10, 19))}))
+    load_rates_file(db, RATES)
+    rate_cache.clear()
+    other = create_user(db, UserCreate(username="other", email="other@example.com", password="password123"))
+
+    group_id = authenticated_client.post("/api/groups/", json={"name": "Trip", "currency": "EUR"}).json()["id"]
+    authenticated_client.post(f"/api/groups/{group_id}/members", json={"user_id": other.id})
+    response = authenticated_client.post(f"/api/groups/{group_id}/expenses/batch", json={"expenses": [
+        {"description": "Taxi", "amount_minor": 1001, "currency": "USD"},
+        {"description": "Lunch", "amount_minor": 3000},
+    ]})
+    assert response.status_code == status.HTTP_201_CREATED
+    taxi, lunch = response.json()
+    assert taxi["currency"] == "EUR"
+    assert taxi["amount_minor"] == 801
+    assert taxi["original_amount_minor"] == 1001
+    assert Decimal(taxi["fx_rate"]) == Decimal("0.8")
+    assert sum(share["amount_minor"] for share in taxi["shares"]) == 801
+    assert lunch["fx_rate"] is None
+
+    balances = authenticated_client.get(f"/api/groups/{group_id}/summary").json()["balances"]
+    assert {b["user_id"]: b["balance_minor"] for b in balances} == {test_user.id: 400 + 1500, other.id: -400 - 1500}
+    rate_cache.clear()
+
+
+def test_editing_keeps_the_recorded_rate(authenticated_client, db, monkeypatch):
+    def today_is(day):
+        monkeypatch.setattr("app.services.currency.date", type("FixedDate", (date,), {"today": staticmethod(lambda: day)}))
+        rate_cache.clear()
+
+    load_rates_file(db, RATES)
+    today_is(date(2026, 10, 19))
+    group_id = authenticated_client.post("/api/groups/", json={"name": "Trip", "currency": "EUR"}).json()["id"]
+    url = f"/api/groups/{group_id}/expenses"
+    taxi = authenticated_client.post(url, json={"description": "Taxi", "amount_minor": 1001, "currency": "USD"}).json()
+
+    # A week later USD is at 1.1; only a changed amount is converted at it
+    load_rates_file(db, "date,currency,rate\n2026-10-26,USD,1.1000\n")
+    today_is(date(2026, 10, 26))
+    renamed = authenticated_client.put(f"{url}/{taxi['id']}", json={
+        "description": "Airport taxi", "amount_minor": 1001, "currency": "USD"
+    }).json()
+    assert (renamed["amount_minor"], Decimal(renamed["fx_rate"])) == (801, Decimal("0.8"))
+    changed = authenticated_client.put(f"{url}/{taxi['id']}", json={
+        "description": "Airport taxi", "amount_minor": 1100, "currency": "USD"
+    }).json()
+    assert changed["amount_minor"] == 1000
+    rate_cache.clear()
+
+
+def test_admin_upload(authenticated_client, test_user, monkeypatch):
+    upload = {"file": ("rates.csv", RATES, "text/csv")}
+    monkeypatch.setattr(settings, "admin_email", "test@example.com", raising=False)
+    response = authenticated_client.post("/api/internal/exchange-rates", files=upload)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    monkeypatch.setattr(settings, "ADMIN_USER_IDS", str(test_user.id))
+    response = authenticated_client.post("/api/internal/exchange-rates", files=upload)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"loaded": 3}
@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+from fastapi import status
+
+from app.core.config import settings
+from app.services.event_broker import Broker, InProcessBroker, broker, group_topic
+from app.services.group_events import group_event_stream
+
+
+class FakeRequest:
+    def __init__(self, disconnect_after: int = 1):
+        self.checks = 0
+        self.disconnect_after = disconnect_after
+
+    async def is_disconnected(self):
+        self.checks += 1
+        return self.checks >= self.disconnect_after
+
+
+class TestBroker:
+    def test_delivers_events_published_from_other_threads(self):
+        async def run():
+            local = InProcessBroker(max_queue=10)
+            subscription = local.subscribe("group:1")
+            assert local.has_subscribers("group:1")
+            await asyncio.to_thread(local.publish, "group:1", {"type": "expense_added"})
+            event = await subscription.next_event(timeout=1)
+            subscription.close()
+            return local, event
+
+        local, event = asyncio.run(run())
+        assert event == {"type": "expense_added"}
+        assert not local.has_subscribers("group:1")
+        assert local.stats() == {"topics": 0, "subscribers": 0, "published": 1, "evicted": 0}
+
+    def test_slow_subscriber_is_evicted(self):
+        async def run():
+            local = InProcessBroker(max_queue=2)
+            slow = local.subscribe("group:1")
+            for i in range(3):
+                local.publish("group:1", {"n": i})
+            await asyncio.sleep(0)
+            return local, slow, await slow.next_event(timeout=1)
+
+        local, slow, event = asyncio.run(run())
+        assert slow.evicted and event is None
+        assert local.stats()["evicted"] == 1
+        assert not local.has_subscribers("group:1")
+
+    def test_incomplete_brokers_cannot_be_created(self):
+        class PublishOnly(Broker):
+            def publish(self, topic, event):
+                pass
+
+        with pytest.raises(TypeError):
+            PublishOnly()
+
+
+class TestGroupEventStream:
+    @pytest.fixture
+    def group_id(self, authenticated_client):
+        return authenticated_client.post("/api/groups/", json={"name": "Flat"}).json()["id"]
+
+    def test_requires_a_token(self, client, group_id):
+        url = f"/api/groups/{group_id}/events"
+        no_header = {"Authorization": ""}
+        assert client.get(url, headers=no_header).status_code == status.HTTP_401_UNAUTHORIZED
+        response = client.get(url, headers=no_header, params={"access_token": "garbage"})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_query_token_is_accepted(self, authenticated_client):
+        token = authenticated_client.headers["Authorization"].split()[1]
+        response = authenticated_client.get(
+            "/api/groups/9999/events", headers={"Authorization": ""}, params={"access_token": token}
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_stream_carries_balances_and_heartbeats(self, authenticated_client, group_id, monkeypatch, test_user):
+        monkeypatch.setattr(settings, "EVENT_STREAM_HEARTBEAT_SECONDS", 0.05)
+
+        async def run():
+            stream = group_event_stream(FakeRequest(disconnect_after=2), group_id)
+            chunks = [await stream.__anext__()]
+            assert broker.has_subscribers(group_topic(group_id))
+            response = await asyncio.to_thread(
+                authenticated_client.post,
+                f"/api/groups/{group_id}/expenses",
+                json={"description": "Rent", "amount_minor": 500},
+            )
+            assert response.status_code == status.HTTP_201_CREATED
+            chunks += [chunk async for chunk in stream]
+            return chunks
+
+        chunks = asyncio.run(run())
+        assert chunks[0].startswith("retry:")
+        assert chunks[1].startswith("event: expense_added\ndata: ")
+        assert f'"balances":{{"{test_user.id}":0}}' in chunks[1]
+        assert chunks[2] == ": ping\n\n"
+        assert not broker.has_subscribers(group_topic(group_id))
+
+    def test_publishing_without_listeners_skips_balances(self, authenticated_client, group_id, monkeypatch):
+        monkeypatch.setattr(
+            "app.services.group_events.get_group_balances",
+            lambda db, group_id: pytest.fail("balances loaded with no subscribers"),
+        )
+        response = authenticated_client.post(
+            f"/api/groups/{group_id}/expenses", json={"description": "Rent", "amount_minor": 500}
+        )
+        assert response.status_code == status.HTTP_201_CREATED
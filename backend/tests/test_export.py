@@ -0,0 +1,134 @@
+import csv
+import io
+import re
+import time
+
+import pytest
+from fastapi import status
+
+from app.core.config import settings
+from app.schemas.user import UserCreate
+from app.services.export import csv_chunks, open_snapshot
+from app.services.user import create_user
+
+
+@pytest.fixture(autouse=True)
+def export_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def other_user(db):
+    return create_user(db, UserCreate(username="otheruser", email="other@example.com", password="password123"))
+
+
+@pytest.fixture
+def group_id(authenticated_client, other_user):
+    group_id = authenticated_client.post("/api/groups/", json={"name": "Flat", "currency": "EUR"}).json()["id"]
+    authenticated_client.post(f"/api/groups/{group_id}/members", json={"user_id": other_user.id})
+    return group_id
+
+
+def add_history(client, group_id, other_user):
+    client.post(f"/api/groups/{group_id}/expenses/batch", json={"expenses": [
+        {"description": "Pizza", "category": "food", "amount_minor": 2050},
+        {"description": "=HYPERLINK(\"x\")", "amount_minor": 300, "paid_by": other_user.id},
+    ]})
+    client.post(f"/api/groups/{group_id}/settlements", json={"to_user_id": other_user.id, "amount_minor": 875})
+
+
+def wait_for_pdf(client, url, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        response = client.get(url)
+        if response.status_code != status.HTTP_202_ACCEPTED or time.monotonic() > deadline:
+            return response
+        time.sleep(0.02)
+
+
+class TestCsvExport:
+    def test_statement_rows(self, authenticated_client, group_id, other_user):
+        add_history(authenticated_client, group_id, other_user)
+        response = authenticated_client.get(f"/api/groups/{group_id}/export.csv")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/csv")
+        assert "attachment" in response.headers["content-disposition"]
+
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [(r["type"], r["description"], r["paid_by"], r["paid_to"], r["amount"]) for r in rows] == [
+            ("expense", "Pizza", "testuser", "", "20.50"),
+            ("expense", "'=HYPERLINK(\"x\")", "otheruser", "", "3.00"),
+            ("settlement", "", "testuser", "otheruser", "8.75"),
+        ]
+        assert {r["currency"] for r in rows} == {"EUR"}
+
+    def test_cached_per_ledger_version(self, authenticated_client, group_id, other_user, export_dir):
+        add_history(authenticated_client, group_id, other_user)
+        url = f"/api/groups/{group_id}/export.csv"
+        first = authenticated_client.get(url)
+        assert [p.name for p in export_dir.iterdir()] == [f"group-{group_id}-v3.csv"]
+
+        again = authenticated_client.get(url)
+        assert again.content == first.content
+        assert again.headers["etag"] == first.headers["etag"]
+        not_modified = authenticated_client.get(url, headers={"If-None-Match": first.headers["etag"]})
+        assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+
+        authenticated_client.post(f"/api/groups/{group_id}/expenses", json={"description": "Bread", "amount_minor": 250})
+        changed = authenticated_client.get(url, headers={"If-None-Match": first.headers["etag"]})
+        assert changed.status_code == status.HTTP_200_OK
+        assert changed.text.count("\n") == 5
+        # The older version is pruned once the new one is written
+        assert [p.name for p in export_dir.iterdir()] == [f"group-{group_id}-v4.csv"]
+
+    def test_abandoned_download_leaves_no_cache(self, authenticated_client, group_id, other_user, db, export_dir):
+        add_history(authenticated_client, group_id, other_user)
+        chunks = csv_chunks(open_snapshot(db.get_bind()), group_id, 3)
+        next(chunks)
+        chunks.close()
+        assert list(export_dir.iterdir()) == []
+
+    def test_not_a_member(self, client, db, group_id, other_user):
+        outsider = create_user(db, UserCreate(username="outsider", email="out@example.com", password="password123"))
+        token = client.post("/api/auth/email/login", data={"username": "outsider", "password": "password123"}).json()["access_token"]
+        response = client.get(f"/api/groups/{group_id}/export.csv", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+class TestPdfExport:
+    def test_rendered_in_background_then_served(self, authenticated_client, group_id, other_user):
+        add_history(authenticated_client, group_id, other_user)
+        url = f"/api/groups/{group_id}/export.pdf"
+        pending = authenticated_client.get(url)
+        assert pending.status_code == status.HTTP_202_ACCEPTED
+        assert pending.headers["retry-after"]
+
+        response = wait_for_pdf(authenticated_client, url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "application/pdf"
+        body = response.content
+        assert body.startswith(b"%PDF-1.4") and body.rstrip().endswith(b"%%EOF")
+        assert b"(Page 1 of 1) Tj" in body
+        assert b"Pizza" in body and b"20.50" in body
+
+        not_modified = authenticated_client.get(url, headers={"If-None-Match": response.headers["etag"]})
+        assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_paginated_with_valid_xref(self, authenticated_client, group_id, monkeypatch):
+        monkeypatch.setattr(settings, "EXPORT_CHUNK_ROWS", 7)
+        authenticated_client.post(f"/api/groups/{group_id}/expenses/batch", json={"expenses": [
+            {"description": f"Item (#{i})", "amount_minor": 100 + i} for i in range(150)
+        ]})
+        url = f"/api/groups/{group_id}/export.pdf"
+        authenticated_client.get(url)
+        body = wait_for_pdf(authenticated_client, url).content
+
+        assert body.count(b"/Type /Page ") == 3
+        assert b"(Page 3 of 3) Tj" in body
+        assert b"Item \\(#149\\)" in body
+        # Every xref entry points at its object
+        xref_at = int(re.search(rb"startxref\n(\d+)", body).group(1))
+        entries = re.findall(rb"(\d{10}) 00000 n", body[xref_at:])
+        for obj_id, offset in enumerate(entries, start=1):
+            assert body[int(offset):].startswith(b"%d 0 obj" % obj_id)
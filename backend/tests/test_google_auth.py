@@ -1,6 +1,6 @@
 import pytest
 from fastapi import HTTPException
-from app.services.google_auth import verify_google_token
+from app.services.google_auth import GOOGLE_CERTS_URL, CachingRequest, verify_google_token
 
 # Patch the actual Google function from the oauth2 lib
 from google.oauth2 import id_token as google_id_token
@@ -68,3 +68,27 @@ def test_verify_token_verification_failure(mocker):
 
     assert exc_info.value.status_code == 401
     assert "Token expired" in exc_info.value.detail
+
+# ✅ Test: Certificates are fetched once while fresh
+def test_certificates_are_cached():
+    class FakeResponse:
+        def __init__(self, cache_control):
+            self.status = 200
+            self.headers = {"cache-control": cache_control}
+            self.data = b"{}"
+
+    calls = []
+
+    def fetch(url, method="GET", **kwargs):
+        calls.append((method, url))
+        return FakeResponse("public, max-age=3600" if "certs" in url else "no-store")
+
+    request = CachingRequest(fetch)
+    assert request(GOOGLE_CERTS_URL) is request(GOOGLE_CERTS_URL)
+    request("https://example.com/other")
+    request("https://example.com/other")
+    request(GOOGLE_CERTS_URL, method="POST", body=b"x")
+    assert calls == [
+        ("GET", GOOGLE_CERTS_URL), ("GET", "https://example.com/other"), ("GET", "https://example.com/other"),
+        ("POST", GOOGLE_CERTS_URL),
+    ]
@@ -13,6 +13,7 @@ class FakeUser:
         self.email = email
         self.google_id = google_id
         self.full_name = full_name
+        self.is_active = True
         self.auth_providers = ["google"]  # Add auth_providers for serialization
 
 # ✅ Test: New user registration
@@ -25,8 +26,7 @@ def test_google_auth_registers_new_user(monkeypatch):
 
     # This is the module path actually used in your application
     monkeypatch.setattr("app.api.endpoints.social_auth.verify_google_token", lambda token: mock_token_data)
-    monkeypatch.setattr("app.api.endpoints.social_auth.authenticate_user", lambda db, _, provider, auth_id: None)
-    monkeypatch.setattr("app.api.endpoints.social_auth.create_user", lambda db, user_create: FakeUser())
+    monkeypatch.setattr("app.api.endpoints.social_auth.find_or_create_google_user", lambda db, **kwargs: (FakeUser(), False))
     monkeypatch.setattr("app.api.endpoints.social_auth.create_access_token", lambda data, expires_delta: "fake-token")
 
     response = client.post("/api/auth/social/google", json={
@@ -49,7 +49,7 @@ def test_google_auth_existing_user(monkeypatch):
     }
 
     monkeypatch.setattr("app.api.endpoints.social_auth.verify_google_token", lambda token: mock_token_data)
-    monkeypatch.setattr("app.api.endpoints.social_auth.authenticate_user", lambda db, _, provider, auth_id: FakeUser())
+    monkeypatch.setattr("app.api.endpoints.social_auth.find_or_create_google_user", lambda db, **kwargs: (FakeUser(), True))
     monkeypatch.setattr("app.api.endpoints.social_auth.create_access_token", lambda data, expires_delta: "existing-token")
 
     response = client.post("/api/auth/social/google", json={
@@ -85,7 +85,7 @@ def test_google_auth_registration_disabled(monkeypatch):
     }
 
     monkeypatch.setattr("app.api.endpoints.social_auth.verify_google_token", lambda token: mock_token_data)
-    monkeypatch.setattr("app.api.endpoints.social_auth.authenticate_user", lambda db, _, provider, auth_id: None)
+    monkeypatch.setattr("app.api.endpoints.social_auth.find_or_create_google_user", lambda db, **kwargs: (None, False))
 
     response = client.post("/api/auth/social/google", json={
         "token": "valid-token",
@@ -103,7 +103,7 @@ def test_google_auth_missing_username(monkeypatch):
     }
 
     monkeypatch.setattr("app.api.endpoints.social_auth.verify_google_token", lambda token: mock_token_data)
-    monkeypatch.setattr("app.api.endpoints.social_auth.authenticate_user", lambda db, _, provider, auth_id: None)
+    monkeypatch.setattr("app.api.endpoints.social_auth.find_or_create_google_user", lambda db, **kwargs: (None, False))
 
     response = client.post("/api/auth/social/google", json={
         "token": "valid-token",
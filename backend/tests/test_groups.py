@@ -0,0 +1,212 @@
+import pytest
+from fastapi import status
+
+from app.schemas.user import UserCreate
+from app.services.user import create_user
+from app.services.expense import split_equally
+
+
+@pytest.fixture
+def other_user(db):
+    return create_user(db, UserCreate(username="otheruser", email="other@example.com", password="password123"))
+
+
+@pytest.fixture
+def group(authenticated_client, other_user):
+    response = authenticated_client.post("/api/groups/", json={"name": "Trip", "currency": "eur"})
+    assert response.status_code == status.HTTP_201_CREATED
+    group = response.json()
+    response = authenticated_client.post(f"/api/groups/{group['id']}/members", json={"user_id": other_user.id})
+    assert response.status_code == status.HTTP_201_CREATED
+    return group
+
+
+def test_split_equally_distributes_remainder():
+    assert split_equally(1000, [3, 1, 2]) == {1: 334, 2: 333, 3: 333}
+
+
+class TestGroups:
+    def test_create_and_list(self, authenticated_client, group, test_user):
+        assert group["currency"] == "EUR"
+        assert group["created_by"] == test_user.id
+        groups = authenticated_client.get("/api/groups/").json()
+        assert [g["id"] for g in groups] == [group["id"]]
+
+        members = authenticated_client.get(f"/api/groups/{group['id']}/members").json()
+        assert [m["role"] for m in members] == ["owner", "member"]
+
+    def test_add_member_twice(self, authenticated_client, group, other_user):
+        response = authenticated_client.post(f"/api/groups/{group['id']}/members", json={"user_id": other_user.id})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_non_member_cannot_see_group(self, client, db):
+        create_user(db, UserCreate(username="owner", email="owner@example.com", password="password123"))
+        token = client.post("/api/auth/email/login", data={"username": "owner", "password": "password123"}).json()["access_token"]
+        group_id = client.post(
+            "/api/groups/", json={"name": "Private"}, headers={"Authorization": f"Bearer {token}"}
+        ).json()["id"]
+
+        create_user(db, UserCreate(username="outsider", email="out@example.com", password="password123"))
+        token = client.post("/api/auth/email/login", data={"username": "outsider", "password": "password123"}).json()["access_token"]
+        response = client.get(f"/api/groups/{group_id}", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+class TestExpenses:
+    def test_equal_split(self, authenticated_client, group, test_user, other_user):
+        response = authenticated_client.post(
+            f"/api/groups/{group['id']}/expenses", json={"description": "Dinner", "amount_minor": 1001}
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        expense = response.json()
+        assert expense["paid_by"] == test_user.id
+        assert expense["currency"] == "EUR"
+        assert expense["created_at"] is not None
+        assert {s["user_id"]: s["amount_minor"] for s in expense["shares"]} == {
+            test_user.id: 501, other_user.id: 500
+        }
+
+    def test_shares_must_add_up(self, authenticated_client, group, test_user, other_user):
+        response = authenticated_client.post(f"/api/groups/{group['id']}/expenses", json={
+            "description": "Taxi", "amount_minor": 1000,
+            "shares": [{"user_id": test_user.id, "amount_minor": 300}, {"user_id": other_user.id, "amount_minor": 600}],
+        })
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_shares_must_be_members(self, authenticated_client, group, test_user):
+        response = authenticated_client.post(f"/api/groups/{group['id']}/expenses", json={
+            "description": "Taxi", "amount_minor": 1000,
+            "shares": [{"user_id": test_user.id, "amount_minor": 500}, {"user_id": 9999, "amount_minor": 500}],
+        })
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "9999" in response.json()["detail"]
+
+    def test_summary_balances_and_settlement(self, authenticated_client, group, test_user, other_user):
+        url = f"/api/groups/{group['id']}"
+        authenticated_client.post(f"{url}/expenses", json={"description": "Hotel", "amount_minor": 10000})
+        authenticated_client.post(f"{url}/expenses", json={
+            "description": "Fuel", "amount_minor": 3000, "paid_by": other_user.id,
+            "shares": [{"user_id": test_user.id, "amount_minor": 3000}],
+        })
+
+        summary = authenticated_client.get(f"{url}/summary").json()
+        assert summary["expense_count"] == 2
+        assert summary["total_minor"] == 13000
+        balances = {b["user_id"]: b["balance_minor"] for b in summary["balances"]}
+        assert balances == {test_user.id: 2000, other_user.id: -2000}
+
+        response = authenticated_client.post(f"{url}/settlements", json={
+            "from_user_id": other_user.id, "to_user_id": test_user.id, "amount_minor": 2000
+        })
+        assert response.status_code == status.HTTP_201_CREATED
+        balances = {b["user_id"]: b["balance_minor"] for b in authenticated_client.get(f"{url}/summary").json()["balances"]}
+        assert balances == {test_user.id: 0, other_user.id: 0}
+
+    def test_list_newest_first_and_delete(self, authenticated_client, group):
+        url = f"/api/groups/{group['id']}/expenses"
+        ids = [
+            authenticated_client.post(url, json={"description": f"Item {i}", "amount_minor": 100}).json()["id"]
+            for i in range(3)
+        ]
+        listed = authenticated_client.get(url, params={"limit": 2}).json()
+        assert [e["id"] for e in listed] == ids[::-1][:2]
+
+        response = authenticated_client.delete(f"{url}/{ids[0]}")
+        assert response.status_code == status.HTTP_200_OK
+        summary = authenticated_client.get(f"/api/groups/{group['id']}/summary").json()
+        assert summary["expense_count"] == 2
+        assert sum(b["balance_minor"] for b in summary["balances"]) == 0
+
+
+def test_settle_up(authenticated_client, group, test_user, other_user):
+    url = f"/api/groups/{group['id']}"
+    authenticated_client.post(f"{url}/expenses", json={"description": "Hotel", "amount_minor": 10000})
+    response = authenticated_client.get(f"{url}/settle-up")
+    assert response.status_code == status.HTTP_200_OK
+    body = response.json()
+    assert body["exact"] is True
+    assert body["transfers"] == [
+        {"from_user_id": other_user.id, "to_user_id": test_user.id, "amount_minor": 5000}
+    ]
+
+
+class TestGroupBalances:
+    def test_writes_keep_balances_in_sync(self, authenticated_client, group, db, test_user, other_user):
+        from app.services.balances import find_balance_drift, get_group_balances
+
+        url = f"/api/groups/{group['id']}"
+        expense = authenticated_client.post(f"{url}/expenses", json={"description": "Hotel", "amount_minor": 10000}).json()
+        response = authenticated_client.put(f"{url}/expenses/{expense['id']}", json={
+            "description": "Hotel", "amount_minor": 9000, "paid_by": other_user.id,
+            "shares": [{"user_id": test_user.id, "amount_minor": 9000}],
+        })
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["shares"] == [{"user_id": test_user.id, "amount_minor": 9000}]
+        authenticated_client.post(f"{url}/expenses", json={"description": "Fuel", "amount_minor": 3001})
+        authenticated_client.post(f"{url}/settlements", json={"to_user_id": other_user.id, "amount_minor": 500})
+
+        assert find_balance_drift(db, group["id"]) == {}
+        assert get_group_balances(db, group["id"]) == {test_user.id: -9000 + 1500 + 500, other_user.id: 9000 - 1500 - 500}
+
+        authenticated_client.delete(f"{url}/expenses/{expense['id']}")
+        assert find_balance_drift(db, group["id"]) == {}
+
+    def test_verify_and_rebuild(self, authenticated_client, group, db, test_user):
+        from sqlalchemy import update
+        from app.models.group_balance import GroupBalance
+        from app.services.balances import find_balance_drift, rebuild_group_balances
+
+        authenticated_client.post(f"/api/groups/{group['id']}/expenses", json={"description": "Hotel", "amount_minor": 10000})
+        db.execute(update(GroupBalance).where(GroupBalance.user_id == test_user.id).values(net_minor=1))
+        db.commit()
+        assert find_balance_drift(db, group["id"]) == {test_user.id: 1 - 5000}
+
+        rebuild_group_balances(db, group["id"])
+        assert find_balance_drift(db, group["id"]) == {}
+
+
+class TestLedger:
+    def test_events_and_time_travel(self, authenticated_client, group, db, test_user, other_user):
+        from datetime import datetime, timezone
+        from freezegun import freeze_time
+
+        url = f"/api/groups/{group['id']}"
+        with freeze_time("2026-01-01 12:00:00"):
+            expense = authenticated_client.post(f"{url}/expenses", json={"description": "Hotel", "amount_minor": 10000}).json()
+        with freeze_time("2026-01-02 12:00:00"):
+            authenticated_client.put(f"{url}/expenses/{expense['id']}", json={"description": "Hotel", "amount_minor": 6000})
+        with freeze_time("2026-01-03 12:00:00"):
+            authenticated_client.delete(f"{url}/expenses/{expense['id']}")
+
+        events = authenticated_client.get(f"{url}/ledger").json()
+        assert [(e["seq"], e["event_type"]) for e in events] == [
+            (1, "expense_created"), (2, "expense_updated"), (3, "expense_deleted")
+        ]
+        assert events[1]["payload"]["amount_minor"] == 6000
+        assert events[1]["deltas"] == {str(test_user.id): 3000 - 5000, str(other_user.id): 5000 - 3000}
+
+        def balances_at(at):
+            body = authenticated_client.get(f"{url}/balances", params={"at": at}).json()
+            return body["seq"], {b["user_id"]: b["balance_minor"] for b in body["balances"]}
+
+        assert balances_at("2025-12-31T00:00:00") == (0, {})
+        assert balances_at("2026-01-01T18:00:00") == (1, {test_user.id: 5000, other_user.id: -5000})
+        assert balances_at("2026-01-02T18:00:00") == (2, {test_user.id: 3000, other_user.id: -3000})
+        assert balances_at("2026-01-04T00:00:00") == (3, {})
+
+    def test_snapshots_every_n_events(self, authenticated_client, group, db, monkeypatch, test_user):
+        from app.core.config import settings
+        from app.models.ledger import LedgerSnapshot
+        from app.services.ledger import balances_at
+
+        monkeypatch.setattr(settings, "LEDGER_SNAPSHOT_EVERY", 3)
+        url = f"/api/groups/{group['id']}/expenses"
+        authenticated_client.post(f"{url}/batch", json={"expenses": [
+            {"description": f"Item {i}", "amount_minor": 100 + i} for i in range(4)
+        ]})
+        authenticated_client.post(url, json={"description": "Another", "amount_minor": 301})
+
+        snapshots = db.query(LedgerSnapshot).filter(LedgerSnapshot.group_id == group["id"]).all()
+        assert [s.seq for s in snapshots] == [4]
+        assert balances_at(db, group["id"]) == balances_at(db, group["id"], use_snapshots=False)
+        assert balances_at(db, group["id"])[0] == 5
@@ -59,4 +59,68 @@ def test_phone_auth_existing_user(client, db):
         
         data = response.json()
         assert data["user_exists"] is True
-        assert "access_token" in data
\ No newline at end of file
+        assert "access_token" in data
+
+def test_find_or_create_user_inserts_then_finds(db):
+    from app.services.phone_auth import find_or_create_user
+
+    user, existed = find_or_create_user(db, "+15550001", "uid-upsert-1", username="upsertuser")
+    assert existed is False
+    assert user.id is not None
+    assert user.created_at is not None
+    assert user.auth_providers == ["phone"]
+
+    again, existed = find_or_create_user(db, "+15550001", "uid-upsert-1", username="upsertuser")
+    assert existed is True
+    assert again.id == user.id
+
+def test_find_or_create_user_username_conflict(db, test_user):
+    from fastapi import HTTPException
+    from app.services.phone_auth import find_or_create_user
+
+    with pytest.raises(HTTPException) as exc:
+        find_or_create_user(db, "+15550002", "uid-upsert-2", username=test_user.username)
+    assert exc.value.status_code == status.HTTP_409_CONFLICT
+
+def test_find_or_create_google_user_is_idempotent(db):
+    from app.services.google_auth import find_or_create_google_user
+
+    user, existed = find_or_create_google_user(
+        db, google_id="google-upsert", email="g@example.com", full_name="G User", username="guser"
+    )
+    assert existed is False
+    assert user.profile_completed is True
+
+    again, existed = find_or_create_google_user(
+        db, google_id="google-upsert", email="g@example.com", full_name="G User", username="guser"
+    )
+    assert existed is True
+    assert again.id == user.id
+
+def test_returning_login_does_not_insert(db):
+    from sqlalchemy import event
+    from app.services.phone_auth import find_or_create_user
+
+    find_or_create_user(db, "+15550003", "uid-upsert-3", username="returning")
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement.split()[0].upper())
+
+    event.listen(db.get_bind(), "before_cursor_execute", record)
+    try:
+        user, existed = find_or_create_user(db, "+15550003", "uid-upsert-3", username="returning")
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", record)
+    assert existed is True
+    assert statements == ["SELECT"]
+
+def test_find_or_create_google_user_email_conflict(db, test_user):
+    from fastapi import HTTPException
+    from app.services.google_auth import find_or_create_google_user
+
+    with pytest.raises(HTTPException) as exc:
+        find_or_create_google_user(
+            db, google_id="google-taken-email", email=test_user.email, full_name="G", username="fresh"
+        )
+    assert exc.value.status_code == status.HTTP_409_CONFLICT
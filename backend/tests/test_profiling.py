@@ -0,0 +1,56 @@
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.profiling import ProfilingMiddleware, create_profile_token
+
+
+def make_client(tmp_path, sample_every=0):
+    app = FastAPI()
+    app.add_middleware(
+        ProfilingMiddleware, output_dir=str(tmp_path), interval_ms=1, sample_every=sample_every
+    )
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int):
+        deadline = time.perf_counter() + 0.05
+        while time.perf_counter() < deadline:
+            pass
+        return {"id": item_id}
+
+    return TestClient(app)
+
+
+def test_requests_without_token_are_not_profiled(tmp_path):
+    client = make_client(tmp_path)
+    assert client.get("/items/1").status_code == 200
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_invalid_token_is_ignored(tmp_path):
+    client = make_client(tmp_path)
+    client.get("/items/1", headers={"X-Profile-Token": "forged"})
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_signed_token_writes_collapsed_stacks(tmp_path):
+    client = make_client(tmp_path)
+    response = client.get("/items/1", headers={"X-Profile-Token": create_profile_token()})
+    assert response.json() == {"id": 1}
+
+    [profile] = list(tmp_path.iterdir())
+    assert "GET-items_item_id" in profile.name
+    assert profile.name.endswith("ms.collapsed")
+    lines = profile.read_text().splitlines()
+    assert lines
+    assert any("read_item" in line for line in lines)
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+
+
+def test_one_in_n_sampling(tmp_path):
+    client = make_client(tmp_path, sample_every=2)
+    for item_id in range(4):
+        client.get(f"/items/{item_id}")
+    assert len(list(tmp_path.iterdir())) == 2
@@ -0,0 +1,79 @@
+import pytest
+
+from app.db.query_log import SlowQueryLog, param_shape
+from app.services.user import get_user_by_email
+
+
+@pytest.fixture
+def slow_log(db):
+    log = SlowQueryLog(threshold_ms=0, buffer_size=3)
+    log.install(db.get_bind())
+    yield log
+    log.uninstall(db.get_bind())
+
+
+def test_records_statement_shape_and_caller(db, slow_log):
+    get_user_by_email(db, "secret@example.com")
+
+    [entry] = slow_log.recent()
+    assert entry["statement"].startswith("SELECT")
+    assert entry["caller"] == "app.services.user.get_user_by_email"
+    assert "secret@example.com" not in str(entry["params"])
+    assert "str" in str(entry["params"])
+    # EXPLAIN capture is PostgreSQL-only
+    assert entry["plan"] is None
+
+
+def test_ring_buffer_is_bounded(db, slow_log):
+    for i in range(5):
+        get_user_by_email(db, f"user{i}@example.com")
+    assert len(slow_log.recent()) == 3
+
+
+def test_threshold_filters_fast_queries(db):
+    log = SlowQueryLog(threshold_ms=60_000)
+    log.install(db.get_bind())
+    try:
+        get_user_by_email(db, "fast@example.com")
+    finally:
+        log.uninstall(db.get_bind())
+    assert log.recent() == []
+
+
+def test_param_shape_for_executemany():
+    shape = param_shape([{"a": 1, "b": "x"}, {"a": 2, "b": "y"}], executemany=True)
+    assert shape == {"rows": 2, "row": {"a": "int", "b": "str"}}
+
+
+class RecordingCursor:
+    def __init__(self, fail_on=None):
+        self.executed = []
+        self.fail_on = fail_on
+        self.connection = self
+
+    def cursor(self):
+        return self
+
+    def execute(self, statement, parameters=None):
+        self.executed.append(statement.split(" (")[0])
+        if self.fail_on and statement.startswith(self.fail_on):
+            raise RuntimeError("canceling statement due to statement timeout")
+
+    def fetchall(self):
+        return [("Seq Scan on users",)]
+
+    def close(self):
+        pass
+
+
+def test_explain_runs_in_a_savepoint():
+    cursor = RecordingCursor()
+    assert SlowQueryLog(threshold_ms=0)._explain(cursor, "SELECT 1", {}) == "Seq Scan on users"
+    assert cursor.executed == ["SAVEPOINT slow_query_explain", "EXPLAIN", "RELEASE SAVEPOINT slow_query_explain"]
+
+
+def test_failed_explain_leaves_the_transaction_usable():
+    cursor = RecordingCursor(fail_on="EXPLAIN")
+    plan = SlowQueryLog(threshold_ms=0)._explain(cursor, "SELECT 1", {})
+    assert plan.startswith("EXPLAIN failed")
+    assert cursor.executed[-1] == "ROLLBACK TO SAVEPOINT slow_query_explain"
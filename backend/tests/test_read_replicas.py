@@ -0,0 +1,93 @@
+import pytest
+from fastapi import Response
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.routing import ReplicaPool, RoutingSession, StickyWrites
+from app.models.user import User
+
+
+@pytest.fixture
+def engines(tmp_path):
+    """A primary and a second local database standing in for a replica"""
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    for engine in (primary, replica):
+        Base.metadata.create_all(bind=engine)
+    # Seed diverging rows so we can tell which database served a read
+    with sessionmaker(bind=primary)() as s:
+        s.add(User(id=1, username="on-primary"))
+        s.commit()
+    with sessionmaker(bind=replica)() as s:
+        s.add(User(id=1, username="on-replica"))
+        s.commit()
+    yield primary, replica
+    primary.dispose()
+    replica.dispose()
+
+
+def make_session_factory(primary, replicas, sticky=None, lag_probe=lambda engine: 0.0):
+    pool = ReplicaPool(replicas, max_lag_seconds=5, check_interval_seconds=0, lag_probe=lag_probe)
+    return sessionmaker(
+        class_=RoutingSession, bind=primary, replicas=pool,
+        sticky_writes=sticky or StickyWrites(60, "secret"),
+    )
+
+
+def username(session):
+    return session.query(User.username).filter(User.id == 1).scalar()
+
+
+def test_reads_use_primary_unless_marked_read_only(engines):
+    primary, replica = engines
+    with make_session_factory(primary, [replica])() as session:
+        assert username(session) == "on-primary"
+
+
+def test_read_only_session_uses_replica(engines):
+    primary, replica = engines
+    with make_session_factory(primary, [replica])() as session:
+        session.info["read_only"] = True
+        assert username(session) == "on-replica"
+
+
+def test_recent_writer_sticks_to_primary(engines):
+    primary, replica = engines
+    sticky = StickyWrites(60, "secret")
+    factory = make_session_factory(primary, [replica], sticky=sticky)
+    response = Response()
+    with factory() as session:
+        session.info.update(user_id=None, response=response)
+        session.add(User(username="new"))
+        session.commit()
+    cookie = response.headers["set-cookie"].split(";")[0].split("=", 1)[1]
+
+    # Written before signing in: holds for the token the client gets next
+    with factory() as session:
+        session.info.update(read_only=True, sticky=sticky.is_sticky(cookie, 7))
+        assert username(session) == "on-primary"
+
+    with factory() as session:
+        session.info.update(read_only=True, sticky=sticky.is_sticky(None, 7))
+        assert username(session) == "on-replica"
+
+
+def test_sticky_cookie_is_signed_and_expires():
+    sticky = StickyWrites(5, "secret")
+    cookie = sticky.cookie(7, now=1000)
+    assert sticky.is_sticky(cookie, 7, now=1004)
+    assert not sticky.is_sticky(cookie, 7, now=1005)
+    assert not sticky.is_sticky(cookie, 8, now=1001)
+    assert not sticky.is_sticky(cookie.replace("7.", "8.", 1), 8, now=1001)
+    assert not StickyWrites(5, "other").is_sticky(cookie, 7, now=1001)
+    assert not sticky.is_sticky("garbage", 7)
+
+
+def test_lagging_replica_removed_from_rotation(engines):
+    primary, replica = engines
+    factory = make_session_factory(primary, [replica], lag_probe=lambda engine: 30.0)
+    with factory() as session:
+        session.info["read_only"] = True
+        assert username(session) == "on-primary"
+
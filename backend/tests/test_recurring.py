@@ -0,0 +1,147 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from fastapi import status
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db.advisory_lock import AdvisoryLeaderLock
+from app.models.expense import Expense
+from app.models.recurring_expense import RecurringExpense
+from app.schemas.user import UserCreate
+from app.services.balances import get_group_balances
+from app.services.currency import load_rates_file, rate_cache
+from app.services.recurring import RecurringScheduler, occurrence_on, post_due_occurrences
+from app.services.user import create_user
+
+NOW = datetime(2026, 5, 10, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def other_user(db):
+    return create_user(db, UserCreate(username="otheruser", email="other@example.com", password="password123"))
+
+
+@pytest.fixture
+def group_id(authenticated_client, other_user):
+    group_id = authenticated_client.post("/api/groups/", json={"name": "Flat"}).json()["id"]
+    authenticated_client.post(f"/api/groups/{group_id}/members", json={"user_id": other_user.id})
+    return group_id
+
+
+@pytest.fixture
+def scheduler(db):
+    return RecurringScheduler(
+        sessionmaker(bind=db.get_bind(), expire_on_commit=False),
+        AdvisoryLeaderLock(db.get_bind(), key=1),
+        interval=3600, horizon=300, batch_size=10,
+    )
+
+
+def add_template(client, group_id, **fields):
+    response = client.post(f"/api/groups/{group_id}/recurring-expenses", json={
+        "description": "Rent", "amount_minor": 1000, "start_on": "2026-01-31", **fields
+    })
+    assert response.status_code == status.HTTP_201_CREATED, response.json()
+    return response.json()
+
+
+def posted(db):
+    return db.execute(
+        select(Expense.recurring_id, Expense.occurrence_on).order_by(Expense.occurrence_on)
+    ).all()
+
+
+def test_monthly_occurrences_clamp_to_month_end():
+    start = date(2026, 1, 31)
+    assert [occurrence_on(start, "month", 1, i) for i in range(4)] == [
+        date(2026, 1, 31), date(2026, 2, 28), date(2026, 3, 31), date(2026, 4, 30)
+    ]
+    assert occurrence_on(start, "month", 12, 2) == date(2028, 1, 31)
+    assert occurrence_on(date(2026, 1, 1), "week", 2, 3) == date(2026, 2, 12)
+
+
+class TestRecurringExpenses:
+    def test_create_list_and_stop(self, authenticated_client, group_id):
+        template = add_template(authenticated_client, group_id, interval_unit="week")
+        assert template["next_run_at"].startswith("2026-01-31T00:00:00")
+        listed = authenticated_client.get(f"/api/groups/{group_id}/recurring-expenses").json()
+        assert [t["id"] for t in listed] == [template["id"]]
+
+        response = authenticated_client.delete(f"/api/groups/{group_id}/recurring-expenses/{template['id']}")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["active"] is False
+
+    def test_rejects_invalid_templates(self, authenticated_client, group_id):
+        url = f"/api/groups/{group_id}/recurring-expenses"
+        response = authenticated_client.post(url, json={
+            "description": "Rent", "amount_minor": 1000, "start_on": "2026-02-01", "ends_on": "2026-01-01"
+        })
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+        response = authenticated_client.post(url, json={
+            "description": "Rent", "amount_minor": 1000, "start_on": "2026-02-01", "paid_by": 9999
+        })
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_catch_up_posts_missed_occurrences_once(self, authenticated_client, db, group_id, scheduler, test_user, other_user):
+        template = add_template(authenticated_client, group_id)
+        assert scheduler.tick(NOW) == 1
+        assert [day for _, day in posted(db)] == [
+            date(2026, 1, 31), date(2026, 2, 28), date(2026, 3, 31), date(2026, 4, 30)
+        ]
+        assert get_group_balances(db, group_id) == {test_user.id: 2000, other_user.id: -2000}
+
+        # Nothing more is due until the end of May
+        assert scheduler.tick(NOW) == 0
+        db.expire_all()
+        assert db.get(RecurringExpense, template["id"]).next_run_at.date() == date(2026, 5, 31)
+        assert post_due_occurrences(db, template["id"], NOW) is None
+        assert len(posted(db)) == 4
+
+        ledger = authenticated_client.get(f"/api/groups/{group_id}/ledger").json()
+        assert [event["event_type"] for event in ledger] == ["expense_created"] * 4
+
+    def test_backlog_is_worked_off_in_batches(self, authenticated_client, db, group_id, scheduler, monkeypatch):
+        monkeypatch.setattr(settings, "RECURRING_MAX_CATCHUP", 3)
+        add_template(authenticated_client, group_id, interval_unit="day", start_on="2026-05-01")
+        add_template(authenticated_client, group_id, interval_unit="day", start_on="2026-05-09", ends_on="2026-05-09")
+
+        assert scheduler.tick(NOW) == 2
+        assert len(posted(db)) == 4
+        # The first template is still behind and stays at the top of the heap
+        assert scheduler.stats()["scheduled"] == 1
+        while scheduler.tick(NOW):
+            pass
+        assert len(posted(db)) == 11
+        assert scheduler.stats()["reloads"] == 1
+
+    def test_catch_up_converts_at_each_occurrence_day(self, authenticated_client, db, group_id, scheduler):
+        load_rates_file(db, "date,currency,rate\n2026-01-30,USD,1.2500\n2026-03-15,USD,2.0000\n")
+        rate_cache.clear()
+        # EUR rent in a USD group
+        add_template(authenticated_client, group_id, currency="EUR")
+        assert scheduler.tick(NOW) == 1
+        amounts = db.scalars(select(Expense.amount_minor).order_by(Expense.occurrence_on)).all()
+        assert amounts == [1250, 1250, 2000, 2000]
+        rate_cache.clear()
+
+    def test_template_that_cannot_post_is_paused(self, authenticated_client, db, group_id, scheduler):
+        template = add_template(authenticated_client, group_id, currency="JPY")
+        assert scheduler.tick(NOW) == 1
+        assert posted(db) == []
+        db.expire_all()
+        paused = db.get(RecurringExpense, template["id"])
+        assert paused.active is False
+        assert paused.last_error.startswith("No exchange rate for JPY")
+
+    def test_occurrence_is_unique(self, authenticated_client, db, group_id, scheduler):
+        template = add_template(authenticated_client, group_id, interval_unit="day", start_on="2026-05-10")
+        scheduler.tick(NOW)
+        # Rewinding the template cannot post the same day twice
+        db.execute(RecurringExpense.__table__.update().values(next_index=0, next_run_at=NOW - timedelta(hours=12)))
+        db.commit()
+        assert post_due_occurrences(db, template["id"], NOW) is None
+        assert db.scalar(select(func.count()).select_from(Expense)) == 1
+        db.expire_all()
+        assert db.get(RecurringExpense, template["id"]).last_error == "Occurrence already posted"
@@ -0,0 +1,52 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+from app import server
+from app.server import Supervisor, available_cpus, shared_state_warning, warm_pool, worker_count
+
+
+class TestWorkerCount:
+    @pytest.mark.parametrize("cpus,share,workers", [
+        (1, 0.25, 1), (2, 0.25, 1), (4, 0.25, 3), (8, 0.25, 6), (8, 0.0, 8), (2.5, 0.0, 2),
+    ])
+    def test_leaves_cpus_for_hashing(self, cpus, share, workers):
+        assert worker_count(cpus, share) == workers
+
+    def test_cgroup_quota_caps_cpus(self, tmp_path, monkeypatch):
+        cpu_max = tmp_path / "cpu.max"
+        monkeypatch.setattr(server, "CGROUP_CPU_MAX", str(cpu_max))
+        cpu_max.write_text("max 100000\n")
+        unlimited = available_cpus()
+        cpu_max.write_text("50000 100000\n")
+        assert available_cpus() == min(unlimited, 0.5)
+
+
+class TestWarmUp:
+    def test_opens_the_whole_pool(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'warm.db'}", poolclass=QueuePool, pool_size=3)
+        assert engine.pool.checkedin() == 0
+        assert warm_pool(engine) == 3
+        assert engine.pool.checkedin() == 3
+        engine.dispose()
+
+
+class TestSupervisor:
+    def test_in_process_broker_needs_one_worker(self):
+        assert shared_state_warning(1) is None
+        assert "EVENT_BROKER_CLASS" in shared_state_warning(4)
+
+    def test_no_respawn_after_sigterm_during_back_off(self, monkeypatch):
+        supervisor = Supervisor(config=None, sock=None, workers=1, graceful_timeout=1)
+        supervisor.children = {123: server.time.monotonic()}
+        exits = iter([(123, 256), (0, 0)])
+        spawned = []
+
+        def sigterm_while_sleeping(seconds):
+            supervisor.stopping = True
+
+        monkeypatch.setattr(server.os, "waitpid", lambda pid, options: next(exits))
+        monkeypatch.setattr(server.time, "sleep", sigterm_while_sleeping)
+        monkeypatch.setattr(supervisor, "_spawn", lambda: spawned.append(True))
+        supervisor._reap()
+        assert spawned == []
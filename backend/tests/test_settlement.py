@@ -0,0 +1,46 @@
+import random
+
+import pytest
+
+from app.services.settlement import (
+    EXACT_SOLVER_MAX_MEMBERS, simplify_debts, simplify_debts_exact, simplify_debts_greedy
+)
+
+
+def apply(balances, transfers):
+    remaining = dict(balances)
+    for transfer in transfers:
+        assert transfer.amount_minor > 0
+        remaining[transfer.from_user_id] += transfer.amount_minor
+        remaining[transfer.to_user_id] -= transfer.amount_minor
+    return remaining
+
+
+# {2, 5} and {1, 3, 4} both sum to zero, so 3 transfers suffice; greedy needs 4
+SPLITTABLE = {1: 4, 2: 3, 3: -2, 4: -2, 5: -3}
+
+
+def test_greedy_settles_with_at_most_n_minus_one_transfers():
+    rng = random.Random(7)
+    amounts = [rng.randint(-10000, 10000) for _ in range(499)]
+    balances = dict(enumerate(amounts + [-sum(amounts)]))
+    transfers = simplify_debts_greedy(balances)
+    assert all(amount == 0 for amount in apply(balances, transfers).values())
+    assert len(transfers) <= len(balances) - 1
+
+
+def test_exact_finds_fewer_transfers_than_greedy():
+    assert len(simplify_debts_greedy(SPLITTABLE)) == 4
+    transfers = simplify_debts_exact(SPLITTABLE)
+    assert len(transfers) == 3
+    assert all(amount == 0 for amount in apply(SPLITTABLE, transfers).values())
+
+
+def test_exact_ignores_settled_members_and_rejects_large_groups():
+    assert simplify_debts_exact({1: 0, 2: 0}) == []
+    too_many = {i: 1 for i in range(EXACT_SOLVER_MAX_MEMBERS)}
+    too_many[EXACT_SOLVER_MAX_MEMBERS] = -EXACT_SOLVER_MAX_MEMBERS
+    with pytest.raises(ValueError):
+        simplify_debts_exact(too_many)
+    # The dispatcher falls back to greedy instead
+    assert len(simplify_debts(too_many)) == EXACT_SOLVER_MAX_MEMBERS
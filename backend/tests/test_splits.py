@@ -0,0 +1,144 @@
+import numpy as np
+from fastapi import status
+from hypothesis import given, settings, strategies as st
+
+from app.schemas.split import Receipt
+from app.services.split_engine import allocate_rows, largest_remainder, split_receipt
+
+PARTICIPANTS = ["ana", "ben", "cy", "dee", "eli"]
+
+amounts = st.integers(min_value=0, max_value=10 ** 13)
+weight_lists = st.lists(st.integers(min_value=0, max_value=10 ** 6), min_size=1, max_size=8).filter(any)
+
+
+@st.composite
+def rules(draw, participants):
+    method = draw(st.sampled_from(["equal", "subset", "shares", "percentages"]))
+    if method == "equal":
+        return {"method": "equal"}
+    chosen = draw(st.lists(st.sampled_from(participants), min_size=1, unique=True))
+    if method == "subset":
+        return {"method": "equal", "participants": chosen}
+    if method == "shares":
+        return {"method": "shares", "weights": {p: draw(st.integers(1, 100)) for p in chosen}}
+    # Whole-number percentages that add up to 100
+    cuts = sorted(draw(st.lists(st.integers(0, 100), min_size=len(chosen) - 1, max_size=len(chosen) - 1)))
+    bounds = [0] + cuts + [100]
+    return {"method": "percentages", "weights": {p: bounds[i + 1] - bounds[i] for i, p in enumerate(chosen)}}
+
+
+@st.composite
+def receipts(draw):
+    participants = PARTICIPANTS[:draw(st.integers(1, len(PARTICIPANTS)))]
+    items = []
+    for _ in range(draw(st.integers(1, 30))):
+        amount = draw(st.integers(0, 10 ** 7))
+        if draw(st.booleans()):
+            # Exact amounts: cut the item into pieces for random participants
+            chosen = draw(st.lists(st.sampled_from(participants), min_size=1, unique=True))
+            cuts = sorted(draw(st.lists(st.integers(0, amount), min_size=len(chosen) - 1, max_size=len(chosen) - 1)))
+            bounds = [0] + cuts + [amount]
+            split = {"method": "exact", "weights": {p: bounds[i + 1] - bounds[i] for i, p in enumerate(chosen)}}
+        else:
+            split = draw(rules(participants))
+        items.append({"amount_minor": amount, "split": split})
+    return Receipt(
+        participants=participants, items=items,
+        tax_minor=draw(st.integers(0, 10 ** 6)), tip_minor=draw(st.integers(0, 10 ** 6)),
+    )
+
+
+@given(amount=amounts, weights=weight_lists)
+def test_largest_remainder_is_exact_and_fair(amount, weights):
+    allocation = largest_remainder(amount, weights)
+    assert sum(allocation) == amount
+    total = sum(weights)
+    for share, weight in zip(allocation, weights):
+        # Never more than one unit away from the exact quota
+        assert abs(share * total - amount * weight) < total
+
+
+@settings(max_examples=50)
+@given(rows=st.lists(st.tuples(amounts, st.lists(st.integers(0, 10 ** 6), min_size=4, max_size=4).filter(any)), min_size=1, max_size=20))
+def test_vectorized_rows_match_reference(rows):
+    amount_array = np.array([amount for amount, _ in rows], dtype=np.int64)
+    weight_matrix = np.array([weights for _, weights in rows], dtype=np.int64)
+    allocation = allocate_rows(amount_array, weight_matrix)
+    for (amount, weights), row in zip(rows, allocation.tolist()):
+        assert row == largest_remainder(amount, weights)
+
+
+@settings(max_examples=100)
+@given(receipt=receipts())
+def test_receipt_totals_reconcile(receipt):
+    result = split_receipt(receipt)
+    for item, row in zip(receipt.items, result["allocations"]):
+        assert sum(row) == item.amount_minor
+        assert min(row) >= 0
+    totals = result["participants"]
+    assert sum(p["tax_minor"] for p in totals) == receipt.tax_minor
+    assert sum(p["tip_minor"] for p in totals) == receipt.tip_minor
+    assert sum(p["total_minor"] for p in totals) == result["total_minor"]
+
+
+def test_tax_and_tip_follow_subtotals():
+    result = split_receipt(Receipt(
+        participants=["ana", "ben"],
+        items=[
+            {"amount_minor": 3000, "split": {"method": "equal", "participants": ["ana"]}},
+            {"amount_minor": 1000, "split": {"method": "equal", "participants": ["ben"]}},
+        ],
+        tax_minor=401, tip_minor=800,
+    ))
+    assert [(p["tax_minor"], p["tip_minor"]) for p in result["participants"]] == [(301, 600), (100, 200)]
+
+
+def test_compute_endpoint(authenticated_client):
+    response = authenticated_client.post("/api/splits/compute", json={"receipts": [
+        {"participants": ["ana", "ben", "cy"], "items": [{"amount_minor": 1000}]},
+        {"participants": ["ana", "ben"], "items": [
+            {"amount_minor": 999, "split": {"method": "percentages", "weights": {"ana": 33.3333, "ben": 66.6667}}}
+        ]},
+    ]})
+    assert response.status_code == status.HTTP_200_OK
+    first, second = response.json()["results"]
+    assert first["allocations"] == [[334, 333, 333]]
+    assert second["allocations"] == [[333, 666]]
+
+
+def test_compute_endpoint_rejects_bad_exact_amounts(authenticated_client):
+    response = authenticated_client.post("/api/splits/compute", json={"receipts": [
+        {"participants": ["ana", "ben"], "items": [
+            {"amount_minor": 1000, "split": {"method": "exact", "weights": {"ana": 600, "ben": 300}}}
+        ]},
+    ]})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "add up" in response.json()["detail"]
+
+
+def test_compute_endpoint_rejects_huge_weights(authenticated_client):
+    def compute(weights):
+        return authenticated_client.post("/api/splits/compute", json={"receipts": [
+            {"participants": ["ana", "ben"], "items": [
+                {"amount_minor": 1000, "split": {"method": "shares", "weights": weights}}
+            ]},
+        ]})
+
+    assert compute({"ana": 1e30, "ben": 1}).status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+    response = compute({"ana": 10 ** 13, "ben": 10 ** 13})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "at most" in response.json()["detail"]
+
+
+def test_compute_endpoint_rejects_oversized_requests(authenticated_client):
+    participants = [f"p{i}" for i in range(200)]
+    receipt = {"participants": participants, "items": [{"amount_minor": 100}] * 5000}
+    # One cell over the cap across the request
+    extra = {"participants": ["ana"], "items": [{"amount_minor": 100}]}
+    response = authenticated_client.post("/api/splits/compute", json={"receipts": [receipt, extra]})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+    receipt["participants"] = participants + ["one-too-many"]
+    receipt["items"] = [{"amount_minor": 100}]
+    response = authenticated_client.post("/api/splits/compute", json={"receipts": [receipt]})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
@@ -0,0 +1,190 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import status
+from sqlalchemy import select
+
+from app.db.change_tracking import install_change_tracking
+from app.models.expense import Expense
+from app.models.sync import SyncTombstone
+from app.schemas.user import UserCreate
+from app.services import sync as sync_service
+from app.services.sync import decode_token, get_changes, prune_tombstones
+from app.services.user import create_user
+
+
+@pytest.fixture
+def other_user(db):
+    return create_user(db, UserCreate(username="otheruser", email="other@example.com", password="password123"))
+
+
+@pytest.fixture
+def group_id(authenticated_client, other_user):
+    group_id = authenticated_client.post("/api/groups/", json={"name": "Flat", "currency": "EUR"}).json()["id"]
+    authenticated_client.post(f"/api/groups/{group_id}/members", json={"user_id": other_user.id})
+    return group_id
+
+
+def sync(client, token=None, **params):
+    if token is not None:
+        params["since"] = token
+    response = client.get("/api/sync/", params=params)
+    assert response.status_code == status.HTTP_200_OK
+    return response.json()
+
+
+def ids(page, kind):
+    return sorted(item["id"] if "id" in item else item["user_id"] for item in page[kind])
+
+
+class TestChangeTracking:
+    def test_writes_are_stamped_in_order(self, authenticated_client, db, group_id):
+        url = f"/api/groups/{group_id}/expenses"
+        first = authenticated_client.post(url, json={"description": "Pizza", "amount_minor": 2000}).json()
+        second = authenticated_client.post(url, json={"description": "Bus", "amount_minor": 300}).json()
+        seqs = dict(db.execute(select(Expense.id, Expense.change_seq)).all())
+        assert 0 < seqs[first["id"]] < seqs[second["id"]]
+
+        authenticated_client.put(f"{url}/{first['id']}", json={"description": "Pizza", "amount_minor": 2400})
+        assert db.scalar(select(Expense.change_seq).where(Expense.id == first["id"])) > seqs[second["id"]]
+
+    def test_delete_leaves_a_tombstone(self, authenticated_client, db, group_id):
+        url = f"/api/groups/{group_id}/expenses"
+        expense = authenticated_client.post(url, json={"description": "Pizza", "amount_minor": 2000}).json()
+        authenticated_client.delete(f"{url}/{expense['id']}")
+        [tombstone] = db.scalars(select(SyncTombstone)).all()
+        assert (tombstone.entity, tombstone.entity_id, tombstone.group_id) == ("expense", expense["id"], group_id)
+
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar(self):
+        return self.value
+
+
+class FakePostgresConnection:
+    class dialect:
+        name = "postgresql"
+
+    def __init__(self, installed):
+        self.installed = installed
+        self.executed = []
+
+    def exec_driver_sql(self, statement):
+        self.executed.append(statement)
+        # The offset query answers 7
+        return FakeResult(self.installed if "to_regprocedure" in statement else 7)
+
+
+class TestPostgresInstall:
+    def test_installs_functions_and_triggers_when_missing(self):
+        connection = FakePostgresConnection(installed=False)
+        install_change_tracking(None, connection)
+        assert any("pg_current_xact_id()::text::bigint + 7" in s for s in connection.executed)
+        assert any("CREATE OR REPLACE TRIGGER users_change_seq" in s for s in connection.executed)
+
+    def test_leaves_installed_functions_alone(self):
+        connection = FakePostgresConnection(installed=True)
+        install_change_tracking(None, connection)
+        assert not any("CREATE" in s for s in connection.executed)
+
+
+class TestSync:
+    def test_full_then_deltas(self, authenticated_client, group_id, test_user, other_user):
+        url = f"/api/groups/{group_id}/expenses"
+        pizza = authenticated_client.post(url, json={"description": "Pizza", "amount_minor": 2000}).json()
+        page = sync(authenticated_client)
+        assert not page["has_more"] and not page["reset"]
+        assert ids(page, "users") == sorted([test_user.id, other_user.id])
+        assert ids(page, "groups") == [group_id]
+        assert ids(page, "group_members") == sorted([test_user.id, other_user.id])
+        assert ids(page, "expenses") == [pizza["id"]]
+
+        # Nothing changed
+        assert sync(authenticated_client, page["token"])["expenses"] == []
+
+        bus = authenticated_client.post(url, json={"description": "Bus", "amount_minor": 300}).json()
+        authenticated_client.delete(f"{url}/{pizza['id']}")
+        authenticated_client.put("/api/users/me", json={"full_name": "Renamed User"})
+        delta = sync(authenticated_client, page["token"])
+        assert ids(delta, "expenses") == [bus["id"]]
+        assert [(d["entity"], d["entity_id"]) for d in delta["deleted"]] == [("expense", pizza["id"])]
+        assert [u["full_name"] for u in delta["users"]] == ["Renamed User"]
+        assert delta["groups"] == [] and delta["group_members"] == []
+        assert decode_token(delta["token"]) > decode_token(page["token"])
+
+    def test_share_changes_resend_the_expense(self, authenticated_client, group_id, other_user):
+        url = f"/api/groups/{group_id}/expenses"
+        expense = authenticated_client.post(url, json={"description": "Pizza", "amount_minor": 2000}).json()
+        token = sync(authenticated_client)["token"]
+        authenticated_client.put(f"{url}/{expense['id']}", json={
+            "description": "Pizza", "amount_minor": 2000,
+            "shares": [{"user_id": other_user.id, "amount_minor": 2000}],
+        })
+        [synced] = sync(authenticated_client, token)["expenses"]
+        assert synced["shares"] == [{"user_id": other_user.id, "amount_minor": 2000}]
+
+    def test_pages_never_skip_changes(self, authenticated_client, group_id, other_user):
+        authenticated_client.post(f"/api/groups/{group_id}/expenses/batch", json={"expenses": [
+            {"description": f"Item {i}", "amount_minor": 100 + i} for i in range(7)
+        ]})
+        authenticated_client.post(f"/api/groups/{group_id}/settlements", json={
+            "to_user_id": other_user.id, "amount_minor": 50
+        })
+        seen, token, calls = [], None, 0
+        while True:
+            page = sync(authenticated_client, token, limit=2)
+            seen += [e["description"] for e in page["expenses"]]
+            token, calls = page["token"], calls + 1
+            if not page["has_more"]:
+                break
+        assert sorted(seen) == sorted(f"Item {i}" for i in range(7))
+        assert calls >= 4
+
+    def test_joining_a_group_brings_its_history(self, authenticated_client, db, group_id, test_user):
+        authenticated_client.post(f"/api/groups/{group_id}/expenses", json={"description": "Old", "amount_minor": 900})
+        newcomer = create_user(db, UserCreate(username="newcomer", email="new@example.com", password="password123"))
+        token = get_changes(db, newcomer.id)["token"]
+
+        authenticated_client.post(f"/api/groups/{group_id}/members", json={"user_id": newcomer.id})
+        page = get_changes(db, newcomer.id, since=decode_token(token))
+        assert [g.id for g in page["groups"]] == [group_id]
+        assert [e.description for e in page["expenses"]] == ["Old"]
+        assert test_user.id in [u.id for u in page["users"]]
+
+    def test_changes_in_progress_are_held_back(self, authenticated_client, db, group_id, monkeypatch):
+        url = f"/api/groups/{group_id}/expenses"
+        expense = authenticated_client.post(url, json={"description": "Pizza", "amount_minor": 2000}).json()
+        seq = db.scalar(select(Expense.change_seq).where(Expense.id == expense["id"]))
+
+        # As if the transaction writing the expense were still running
+        monkeypatch.setattr(sync_service, "stable_through", lambda db: seq - 1)
+        page = sync(authenticated_client)
+        assert page["expenses"] == [] and decode_token(page["token"]) == seq - 1
+
+        monkeypatch.undo()
+        assert ids(sync(authenticated_client, page["token"]), "expenses") == [expense["id"]]
+
+    def test_other_groups_are_invisible(self, authenticated_client, db, group_id):
+        outsider = create_user(db, UserCreate(username="outsider", email="out@example.com", password="password123"))
+        page = get_changes(db, outsider.id)
+        assert [u.id for u in page["users"]] == [outsider.id]
+        assert page["groups"] == page["expenses"] == page["deleted"] == []
+
+    def test_pruned_tombstones_force_a_reset(self, authenticated_client, db, group_id):
+        url = f"/api/groups/{group_id}/expenses"
+        expense = authenticated_client.post(url, json={"description": "Pizza", "amount_minor": 2000}).json()
+        token = sync(authenticated_client)["token"]
+        authenticated_client.delete(f"{url}/{expense['id']}")
+        assert prune_tombstones(db, datetime.now(timezone.utc) + timedelta(days=1)) == 1
+
+        page = sync(authenticated_client, token)
+        assert page["reset"] is True
+        assert ids(page, "groups") == [group_id]
+        assert page["deleted"] == []
+
+    def test_invalid_token(self, authenticated_client):
+        response = authenticated_client.get("/api/sync/", params={"since": "not-a-token"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
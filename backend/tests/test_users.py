@@ -0,0 +1,133 @@
+from fastapi import status
+
+
+class TestUserETags:
+    def test_me_returns_weak_etag(self, authenticated_client):
+        response = authenticated_client.get("/api/users/me")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["etag"].startswith('W/"user-')
+
+    def test_me_not_modified(self, authenticated_client):
+        etag = authenticated_client.get("/api/users/me").headers["etag"]
+        response = authenticated_client.get("/api/users/me", headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_etag_changes_after_update(self, authenticated_client):
+        etag = authenticated_client.get("/api/users/me").headers["etag"]
+        authenticated_client.put("/api/users/me", json={"full_name": "Renamed User"})
+        response = authenticated_client.get("/api/users/me", headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["etag"] != etag
+        assert response.json()["full_name"] == "Renamed User"
+
+    def test_user_by_id_not_modified(self, authenticated_client, test_user):
+        url = f"/api/users/{test_user.id}"
+        etag = authenticated_client.get(url).headers["etag"]
+        response = authenticated_client.get(url, headers={"If-None-Match": f'"other", {etag}'})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_user_by_id_missing(self, authenticated_client):
+        response = authenticated_client.get("/api/users/9999")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_profile_status_not_modified(self, authenticated_client):
+        first = authenticated_client.get("/api/users/me/profile-status")
+        assert first.status_code == status.HTTP_200_OK
+        response = authenticated_client.get(
+            "/api/users/me/profile-status",
+            headers={"If-None-Match": first.headers["etag"]}
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_concurrent_update_conflicts(self, authenticated_client, test_user, db):
+        from sqlalchemy import update
+        from app.models.user import User
+
+        # Another request updates the user after this one loaded it
+        db.execute(
+            update(User).where(User.id == test_user.id).values(row_version=User.row_version + 1),
+            execution_options={"synchronize_session": False},
+        )
+        response = authenticated_client.put("/api/users/me", json={"full_name": "Lost Update"})
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+        # Nothing was written; a retry against the current version succeeds
+        retry = authenticated_client.put("/api/users/me", json={"full_name": "Retried"})
+        assert retry.status_code == status.HTTP_200_OK
+        assert retry.json()["full_name"] == "Retried"
+
+
+class TestWriteRoundTrips:
+    @staticmethod
+    def capture_statements(db):
+        from sqlalchemy import event
+
+        statements = []
+
+        def record(conn, cursor, statement, params, context, executemany):
+            statements.append(statement.split()[0].upper())
+
+        event.listen(db.get_bind(), "before_cursor_execute", record)
+        return statements, lambda: event.remove(db.get_bind(), "before_cursor_execute", record)
+
+    def test_update_is_a_single_write_without_reload(self, authenticated_client, db):
+        statements, stop = self.capture_statements(db)
+        try:
+            response = authenticated_client.put("/api/users/me", json={"full_name": "One Trip"})
+        finally:
+            stop()
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["updated_at"] is not None
+
+        writes = [i for i, s in enumerate(statements) if s in ("INSERT", "UPDATE", "DELETE")]
+        assert len(writes) == 1
+        # Nothing is re-read after the write
+        assert "SELECT" not in statements[writes[0] + 1:]
+
+    def test_signup_returns_server_defaults_without_reload(self, client, db):
+        statements, stop = self.capture_statements(db)
+        try:
+            response = client.post("/api/auth/email/signup", json={
+                "username": "onetrip", "email": "onetrip@example.com", "password": "password123"
+            })
+        finally:
+            stop()
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["user"]["created_at"] is not None
+        assert statements.count("INSERT") == 1
+        assert statements[-1] == "INSERT"
+
+
+class TestReadModels:
+    def test_list_users_returns_rows_not_entities(self, authenticated_client, test_user, db):
+        from app.services.user import get_user_rows
+
+        rows = get_user_rows(db, limit=10)
+        assert [row.id for row in rows] == [test_user.id]
+        # Rows are not tracked by the session
+        assert all(not hasattr(row, "_sa_instance_state") for row in rows)
+
+        response = authenticated_client.get("/api/users/")
+        assert response.status_code == status.HTTP_200_OK
+        [user] = response.json()
+        assert user["username"] == test_user.username
+        assert user["auth_providers"] == test_user.auth_providers
+        assert "hashed_password" not in user
+
+    def test_profile_status_reads_a_single_row(self, authenticated_client, db):
+        statements, stop = TestWriteRoundTrips.capture_statements(db)
+        try:
+            response = authenticated_client.get("/api/users/me/profile-status")
+        finally:
+            stop()
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["has_email"] is True
+        assert statements == ["SELECT"]
+
+    def test_profile_status_inactive_user(self, authenticated_client, test_user, db):
+        test_user.is_active = False
+        db.commit()
+        response = authenticated_client.get("/api/users/me/profile-status")
+        assert response.status_code == status.HTTP_403_FORBIDDEN